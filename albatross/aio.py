@@ -0,0 +1,163 @@
+"""
+Provides an asyncio interface for WIND Toolkit requests.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from . import requests
+
+DEFAULT_MAX_CONCURRENCY = 8
+"""Default upper bound on the number of HSDS requests in flight at the same time."""
+
+
+class AsyncClient:
+    """
+    Awaitable versions of the blocking `albatross.requests` functions, for use from an
+    asyncio event loop.
+
+    Requests are run on a thread pool sized to `max_concurrency`, so any number of
+    coroutines can await requests without a thread each: once `max_concurrency`
+    requests are in flight, the rest wait their turn without blocking the event loop.
+
+    If a request takes longer than its timeout, `asyncio.TimeoutError` is raised to the
+    caller. A read that is already underway cannot be interrupted, so it keeps its slot
+    until it finishes, which stops timed out requests from piling up on HSDS.
+
+    Example:
+      .. code-block:: python
+
+        async with AsyncClient(max_concurrency=16, timeout=60) as client:
+            data, meta = await client.request_wtk_point_data(lat_lon, 2012, params)
+    """
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=None):
+        """
+        Args:
+          max_concurrency (int, optional): Maximum number of requests run at once.
+          timeout (float, optional): Default per-request timeout (seconds). By
+            default, requests never time out.
+        """
+        msg = '"max_concurrency" must be a positive int'
+        assert isinstance(max_concurrency, int) and max_concurrency > 0, msg
+
+        _check_timeout(timeout)
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._loop = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shuts down the thread pool, once any running requests have finished."""
+        self._executor.shutdown(wait=False)
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Runs a blocking function on the client's thread pool, within the concurrency
+        limit.
+
+        Args:
+          func (callable): The function to run.
+          args: Positional arguments for `func`.
+          timeout (float, optional): Timeout (seconds), overriding the client's
+            default `timeout`.
+          kwargs: Keyword arguments for `func`.
+
+        Returns:
+          The return value of `func`.
+        """
+        _check_timeout(timeout)
+
+        timeout = timeout if timeout is not None else self.timeout
+        loop = asyncio.get_running_loop()
+
+        # a semaphore belongs to the loop it was first used on, so the client gets a new
+        # one whenever it is used from a new loop (e.g. another `asyncio.run`)
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        semaphore = self._semaphore
+        await semaphore.acquire()
+
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # release the slot when the read actually finishes, even if it has timed out
+        future.add_done_callback(partial(_release, loop, semaphore))
+
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    async def identify_regions(self, lat_lon, coordinates=False, timeout=None):
+        """
+        Awaitable version of `albatross.requests.identify_regions`.
+
+        Args:
+          timeout (float, optional): Timeout (seconds), overriding the client's
+            default `timeout`.
+        """
+        return await self.run(requests.identify_regions, lat_lon, coordinates=coordinates,
+                              timeout=timeout)
+
+    async def request_wtk_point_data(self, lat_lon, year, params, timeout=None, **kwargs):
+        """
+        Awaitable version of `albatross.requests.request_wtk_point_data`, accepting the
+        same arguments.
+
+        Args:
+          timeout (float, optional): Timeout (seconds), overriding the client's
+            default `timeout`.
+        """
+        return await self.run(requests.request_wtk_point_data, lat_lon, year, params,
+                              timeout=timeout, **kwargs)
+
+    async def request_wtk_multi_point_data(self, lat_lons, year, params, timeout=None,
+                                           **kwargs):
+        """
+        Awaitable version of `albatross.requests.request_wtk_multi_point_data`,
+        accepting the same arguments.
+
+        Args:
+          timeout (float, optional): Timeout (seconds), overriding the client's
+            default `timeout`.
+        """
+        return await self.run(requests.request_wtk_multi_point_data, lat_lons, year, params,
+                              timeout=timeout, **kwargs)
+
+    async def request_wtk_box_data(self, bbox, year, params, timeout=None, **kwargs):
+        """
+        Awaitable version of `albatross.requests.request_wtk_box_data`, accepting the
+        same arguments.
+
+        Args:
+          timeout (float, optional): Timeout (seconds), overriding the client's
+            default `timeout`.
+        """
+        return await self.run(requests.request_wtk_box_data, bbox, year, params,
+                              timeout=timeout, **kwargs)
+
+
+def _release(loop, semaphore, future):
+    """Releases `semaphore` on `loop`, from the thread that finished `future`."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # the loop has closed since the request timed out, taking the semaphore with it
+        pass
+
+
+def _check_timeout(timeout):
+    msg = '"timeout" must be a positive number or None'
+    assert timeout is None or (isinstance(timeout, (int, float)) and timeout > 0), msg
@@ -1,25 +1,56 @@
 """
 Provides analysis tools for wind data.
+
+Plotting libraries (matplotlib, windrose) are imported when a function first needs
+them, so the numeric tools can be used without loading them.
 """
 
-import matplotlib.pyplot as plt
+import warnings
+
 import pandas
-from pandas import DataFrame, Grouper
-from windrose import WindroseAxes
-from scipy import stats
+from pandas import DataFrame
 import numpy as np
 
 from .classes import WindTurbine
 
 
-def boxplot(data, fields=None, labels=None, **box_kwargs):
+def _column(data, name):
+    """
+    Returns the `name` column of `data`, unscaled if it holds raw values read with
+    `keep_scaled=True` (see `albatross.requests.read_wtk_point_data`).
+    """
+    column = data[name]
+    factor = data.attrs.get('scale_factors', {}).get(name)
+
+    if factor is not None:
+        column = column / factor
+
+    return column
+
+
+def _subplots(ax=None):
+    """Returns `(fig, ax)` for `ax`, or for a new figure if it is None."""
+    if ax is not None:
+        return ax.figure, ax
+
+    import matplotlib.pyplot as plt
+
+    return plt.subplots()
+
+
+def boxplot(data, fields=None, labels=None, ax=None, whis=1.5, max_fliers=None, stats=None,
+            **box_kwargs):
     """
     Draws boxplots of wind speeds.
 
+    The quartiles, whiskers and fliers of every field are computed in one vectorized
+    pass (see `boxplot_stats`) and drawn with `matplotlib.axes.Axes.bxp`, so the raw
+    samples are never handed to matplotlib.
+
     .. image:: ../docs/boxplot.jpg
 
     Args:
-      data (DataFrame): wind data
+      data (DataFrame): wind data, which may be None if `stats` are given
       fields (:obj:`list` of :obj:`str`, optional): a list of columns to include from the
         given `data`. If none are provided, these will be inferred using any columns in
         `data` with the prefix `'windspeed_'`.
@@ -27,12 +58,102 @@ def boxplot(data, fields=None, labels=None, **box_kwargs):
         provided, they will use the same names as `fields`. If no `fields` or `labels`
         are provided, they will both be inferred using the same strategy as `fields`, but
         taking the suffix after `'windspeed_'`. e.g. `'windspeed_90m'` -> `'90m'`
-      box_kwargs (dict, optional): additional parameters for `matplotlib.pyplot.boxplot`
+      ax (:obj:`matplotlib.axes.Axes`, optional): axes to draw on, by default a new
+        figure is created
+      whis (Union[float, tuple], optional): whisker reach, as a multiple of the
+        interquartile range, or a `(low, high)` pair of percentiles, by default 1.5
+      max_fliers (int, optional): maximum number of fliers to draw per box, by default
+        all of them
+      stats (:obj:`list` of :obj:`dict`, optional): precomputed box statistics to draw
+        instead of `data`, e.g. from `boxplot_stats`
+      box_kwargs (dict, optional): additional parameters for `matplotlib.axes.Axes.bxp`.
+        `notch` and `sym` are accepted as they are by `matplotlib.axes.Axes.boxplot`.
 
     Returns:
       tuple: A tuple (fig, ax) consisting of a `matplotlib.figure.Figure` and
       `matplotlib.axes.Axes`.
     """
+    for key in _BOXPLOT_ONLY_KWARGS:
+        msg = '"%s" is not supported, precomputed "stats" may be given instead' % key
+        assert key not in box_kwargs, msg
+
+    if stats is None:
+        stats = boxplot_stats(data, fields=fields, labels=labels, whis=whis,
+                              max_fliers=max_fliers)
+    else:
+        assert isinstance(stats, list), '"stats" must be a list or None'
+
+    # `Axes.boxplot` arguments, which `Axes.bxp` names differently
+    if 'notch' in box_kwargs:
+        box_kwargs['shownotches'] = box_kwargs.pop('notch')
+
+    flierprops = dict(marker='_', markeredgecolor='red')
+    sym = box_kwargs.pop('sym', None)
+
+    if sym == '':
+        box_kwargs['showfliers'] = False
+    elif sym is not None:
+        flierprops.update(_sym_props(sym))
+
+    flierprops.update(box_kwargs.pop('flierprops', None) or {})
+    boxprops = {'color': 'blue', **(box_kwargs.pop('boxprops', None) or {})}
+    medianprops = {'color': 'red', **(box_kwargs.pop('medianprops', None) or {})}
+
+    fig, ax = _subplots(ax)
+    ax.bxp(stats, flierprops=flierprops, boxprops=boxprops, medianprops=medianprops,
+           **box_kwargs)
+    ax.set_ylabel('Wind Speed (m/s)', fontsize='large')
+    ax.set_xlabel('Elevation (m)', fontsize='large')
+
+    return fig, ax
+
+
+_BOXPLOT_ONLY_KWARGS = ('bootstrap', 'usermedians', 'conf_intervals', 'autorange')
+
+
+def _sym_props(sym):
+    """
+    Returns the flier marker properties of a `matplotlib.axes.Axes.boxplot` `sym`
+    format string, e.g. `'b+'`, `'o'` or `'red'`.
+    """
+    from matplotlib.colors import is_color_like
+    from matplotlib.lines import Line2D
+
+    # the color comes first, as in `Axes.plot` format strings
+    for i in range(len(sym) + 1):
+        color, marker = sym[:i], sym[i:]
+
+        if (not color or is_color_like(color)) and (not marker or marker in Line2D.markers):
+            props = {'marker': marker} if marker else {}
+
+            if color:
+                props.update(color=color, markerfacecolor=color, markeredgecolor=color)
+
+            return props
+
+    assert False, 'unrecognized "sym" format string: %s' % sym
+
+
+def boxplot_stats(data, fields=None, labels=None, whis=1.5, max_fliers=None):
+    """
+    Returns the box statistics of each field for `matplotlib.axes.Axes.bxp`, computed
+    for every field in one vectorized pass. These match `matplotlib.cbook.boxplot_stats`,
+    ignoring NaNs, apart from the optional cap on the number of fliers.
+
+    Args:
+      data (DataFrame): wind data
+      fields (:obj:`list` of :obj:`str`, optional): columns to include, see `boxplot`
+      labels (:obj:`list` of :obj:`str`, optional): labels to use, see `boxplot`
+      whis (Union[float, tuple], optional): whisker reach, as a multiple of the
+        interquartile range, or a `(low, high)` pair of percentiles, by default 1.5
+      max_fliers (int, optional): maximum number of fliers to keep per field, spread
+        evenly over the sorted fliers (including the most extreme), by default all of
+        them
+
+    Returns:
+      list: A dict of statistics (`med`, `q1`, `q3`, `whislo`, `whishi`, `mean`, `iqr`,
+      `cilo`, `cihi`, `fliers` and `label`) for each field.
+    """
     assert isinstance(data, DataFrame), '"data" must be a DataFrame'
 
     if fields:
@@ -47,74 +168,266 @@ def boxplot(data, fields=None, labels=None, **box_kwargs):
     else:
         labels = fields
 
-    if not fields and not labels:
+    if not fields:
         fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
-        labels = [field.split('_')[1] for field in fields]
-
-    x = [list(data[field]) for field in fields]
-    fig, ax = plt.subplots()
-    ax.boxplot(
-        x,
-        labels=labels,
-        flierprops=dict(marker='_', markeredgecolor='red'),
-        boxprops=dict(color='blue'),
-        medianprops=dict(color='red'), **box_kwargs)
-    ax.set_ylabel('Wind Speed (m/s)', fontsize='large')
-    ax.set_xlabel('Elevation (m)', fontsize='large')
+        labels = labels or [field.split('_')[1] for field in fields]
 
-    return fig, ax
+    if np.iterable(whis):
+        msg = '"whis" must be a float or a (low, high) pair of percentiles'
+        assert len(whis) == 2 and 0 <= whis[0] <= whis[1] <= 100, msg
+    else:
+        assert np.isreal(whis), '"whis" must be a float or a (low, high) pair of percentiles'
+
+    msg = '"max_fliers" must be a non-negative int or None'
+    assert max_fliers is None or (isinstance(max_fliers, int) and max_fliers >= 0), msg
 
+    # one contiguous row per field, so that each is partitioned in place
+    x = np.vstack([_column(data, field).to_numpy(dtype=np.float64) for field in fields])
+    nans = np.isnan(x)
+    n = (~nans).sum(axis=1)
 
-def plot_windrose(data, speed=None, direction=None, **wr_kwargs):
+    percentile = np.nanpercentile if nans.any() else np.percentile
+    q1, med, q3 = percentile(x, [25, 50, 75], axis=1)[:, :, None]
+    iqr = q3 - q1
+    notch = 1.57 * iqr[:, 0] / np.sqrt(n)
+
+    if np.iterable(whis):
+        low, high = percentile(x, list(whis), axis=1)[:, :, None]
+    else:
+        low, high = q1 - whis * iqr, q3 + whis * iqr
+
+    with np.errstate(invalid='ignore'):
+        inside = (x >= low) & (x <= high)
+        outside = ~inside & ~nans
+
+    # whiskers end at the furthest samples within reach, or at the box if there are none
+    whislo = np.min(x, axis=1, where=inside, initial=np.inf)
+    whishi = np.max(x, axis=1, where=inside, initial=-np.inf)
+    q1, med, q3, iqr = q1[:, 0], med[:, 0], q3[:, 0], iqr[:, 0]
+    whislo = np.where(np.isfinite(whislo), np.minimum(whislo, q1), q1)
+    whishi = np.where(np.isfinite(whishi), np.maximum(whishi, q3), q3)
+
+    stats = []
+    for i, label in enumerate(labels):
+        fliers = np.sort(x[i, outside[i]])
+
+        if max_fliers is not None and len(fliers) > max_fliers:
+            fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).round().astype(int)]
+
+        stats.append({
+            'label': label,
+            'mean': np.nanmean(x[i]),
+            'iqr': iqr[i],
+            'cilo': med[i] - notch[i],
+            'cihi': med[i] + notch[i],
+            'whislo': whislo[i],
+            'whishi': whishi[i],
+            'fliers': fliers,
+            'q1': q1[i],
+            'med': med[i],
+            'q3': q3[i],
+        })
+
+    return stats
+
+
+def windrose_table(data, speed=None, direction=None, sectors=16, speed_bins=6,
+                   normed=True):
     """
-    Generates a windrose plot from the given data.
+    Returns the frequency of wind from each direction sector within each speed bin, as
+    drawn by `plot_windrose`, binned in a single vectorized pass over one or many sites.
 
-    .. image:: ../docs/windrose.png
+    Sectors are centred on north, as in `windrose`, and the last speed bin is open
+    ended.
 
     Args:
-      data (DataFrame): Wind data
+      data (:obj:`DataFrame` or :obj:`dict`): Wind data, or a dict of site names mapped
+        to their wind data.
       speed (str, optional): Wind speed column name. If not provided, it will be inferred
         from `data`. It will take the first column containing the string 'windspeed'.
       direction (str, optional): Wind direction column name. If not provided, it will be
-        inferred from `data`. It will take the first column containing the string `winddirection`.
-      wr_kwargs (dict, optional): Additional windrose parameters. See
-        https://windrose.readthedocs.io for more info.
+        inferred from `data`. It will take the first column containing the string
+        `winddirection`.
+      sectors (int, optional): number of direction sectors, by default 16
+      speed_bins (:obj:`int` or :obj:`list` of :obj:`float`, optional): lower edges of
+        the speed bins, or a number of evenly spaced bins between the lowest and
+        highest speed of every site, by default 6
+      normed (:obj:`bool`, optional): return percentages of each site's samples rather
+        than counts, by default True
 
     Returns:
-      WindroseAxes: A `WindroseAxes` instance.
+      DataFrame: A DataFrame indexed by the centre of each direction sector (degrees),
+      or by `(site, direction)` for a dict of sites, with a column for the lower edge
+      of each speed bin (m/s).
     """
+    sites = data if isinstance(data, dict) else None
+
+    if sites is None:
+        assert isinstance(data, DataFrame), '"data" must be a DataFrame or dict'
+        sites = {None: data}
+
+    assert len(sites) > 0, '"data" must not be empty'
+    assert isinstance(sectors, int) and sectors > 0, '"sectors" must be a positive int'
+
+    columns = [_windrose_columns(site, speed, direction) for site in sites.values()]
+    ws = [np.asarray(_column(site, s), dtype=np.float64)
+          for site, (s, _) in zip(sites.values(), columns)]
+    wd = [np.asarray(_column(site, d), dtype=np.float64)
+          for site, (_, d) in zip(sites.values(), columns)]
+
+    if isinstance(speed_bins, int):
+        assert speed_bins > 0, '"speed_bins" must be a positive int or a list'
+        speed_bins = np.linspace(min(np.nanmin(x) for x in ws), max(np.nanmax(x) for x in ws),
+                                 speed_bins)
+    else:
+        assert isinstance(speed_bins, (list, tuple, np.ndarray)), (
+            '"speed_bins" must be a positive int or a list')
+        speed_bins = np.asarray(speed_bins, dtype=np.float64)
+        assert (np.diff(speed_bins) > 0).all(), '"speed_bins" must be increasing'
+
+    n_bins = len(speed_bins)
+    site_codes = np.repeat(np.arange(len(sites)), [len(x) for x in ws])
+    ws, wd = np.concatenate(ws), np.concatenate(wd)
+
+    angle = 360.0 / sectors
+    valid = ~(np.isnan(ws) | np.isnan(wd))
+
+    # speeds below the first bin are not counted, as in `windrose`
+    speed_codes = np.searchsorted(speed_bins, ws, side='right') - 1
+    counted = valid & (speed_codes >= 0)
+
+    sector_codes = np.floor((wd[counted] % 360 + angle / 2) / angle).astype(np.int64) % sectors
+    keys = (site_codes[counted] * sectors + sector_codes) * n_bins + speed_codes[counted]
+
+    table = np.bincount(keys, minlength=len(sites) * sectors * n_bins).astype(np.float64)
+    table = table.reshape(len(sites), sectors, n_bins)
+
+    if normed:
+        samples = np.bincount(site_codes[valid], minlength=len(sites))
+        table *= 100 / np.maximum(samples, 1)[:, None, None]
+
+    centres = pandas.Index(np.arange(sectors) * angle, name='direction')
+    edges = pandas.Index(speed_bins, name='speed')
+
+    if None in sites:
+        return DataFrame(table[0], index=centres, columns=edges)
+
+    rows = pandas.MultiIndex.from_product([list(sites), centres], names=['site', 'direction'])
+
+    return DataFrame(table.reshape(-1, n_bins), index=rows, columns=edges)
+
+
+def _windrose_columns(data, speed=None, direction=None):
+    """Returns the `(speed, direction)` columns of `data`, see `plot_windrose`."""
     assert isinstance(data, DataFrame), '"data" must be a DataFrame'
 
     if speed:
         assert isinstance(speed, str), '"speed" must be a string'
         assert speed in data, "column not found: %s" % speed
-        ws = list(data[speed])
-    if direction:
-        assert isinstance(direction, str), '"direction" must be a string'
-        assert direction in data, 'column not found: %s' % direction
-        wd = list(data[direction])
-
-    if not speed:
+    else:
         fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
         assert len(fields) > 0, 'unable to infer wind speed data column'
-        ws_field = fields[0]
-        ws = list(data[ws_field])
+        speed = fields[0]
 
-    if not direction:
+    if direction:
+        assert isinstance(direction, str), '"direction" must be a string'
+        assert direction in data, 'column not found: %s' % direction
+    else:
         fields = list(filter(lambda x: 'winddirection' in x, data.columns[:]))
         assert len(fields) > 0, 'unable to infer wind direction data column'
-        wd_field = fields[0]
-        wd = list(data[wd_field])
+        direction = fields[0]
+
+    return speed, direction
+
+
+def plot_windrose(data, speed=None, direction=None, fig=None, table=None, **wr_kwargs):
+    """
+    Generates a windrose plot from the given data.
+
+    .. image:: ../docs/windrose.png
+
+    Args:
+      data (DataFrame): Wind data
+      speed (str, optional): Wind speed column name. If not provided, it will be inferred
+        from `data`. It will take the first column containing the string 'windspeed'.
+      direction (str, optional): Wind direction column name. If not provided, it will be
+        inferred from `data`. It will take the first column containing the string `winddirection`.
+      fig (:obj:`matplotlib.figure.Figure`, optional): figure to draw on, by default a
+        new figure is created
+      table (DataFrame, optional): a precomputed table for a single site (see
+        `windrose_table`) to draw instead of binning `data`, which may then be None.
+        Only the `colors`, `cmap`, `opening` and `edgecolor` parameters apply.
+      wr_kwargs (dict, optional): Additional windrose parameters. See
+        https://windrose.readthedocs.io for more info.
+
+    Returns:
+      WindroseAxes: A `WindroseAxes` instance.
+    """
+    if table is None:
+        speed, direction = _windrose_columns(data, speed, direction)
+        ws = _column(data, speed).to_numpy()
+        wd = _column(data, direction).to_numpy()
+    else:
+        assert isinstance(table, DataFrame), '"table" must be a DataFrame'
+        assert table.index.nlevels == 1, '"table" must hold a single site'
+
+    from windrose import WindroseAxes
 
     # NOTE: this is a workaround for a current bug in the `windrose` package
-    ax = WindroseAxes.from_ax(theta_labels=["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"])
-    ax.bar(wd, ws, normed=True, opening=0.8, edgecolor='white', **wr_kwargs)
-    ax.set_legend()
+    ax = WindroseAxes.from_ax(fig=fig,
+                              theta_labels=["E", "N-E", "N", "N-W", "W", "S-W", "S", "S-E"])
+
+    if table is None:
+        ax.bar(wd, ws, normed=True, opening=0.8, edgecolor='white', **wr_kwargs)
+        ax.set_legend()
+    else:
+        _bar_table(ax, table, **wr_kwargs)
 
     return ax
 
 
-def pdf(data, speed=None, hist_kwargs=None, plot_kwargs=None):
+def _bar_table(ax, table, colors=None, cmap=None, opening=0.8, edgecolor='white'):
+    """
+    Draws a `windrose_table` on a `WindroseAxes`, as `WindroseAxes.bar` and
+    `WindroseAxes.set_legend` would, through matplotlib's public `Axes` API rather than
+    `windrose`'s internals. `WindroseAxes` overrides `bar` and `legend` to bin raw data,
+    so their `Axes` implementations are called directly.
+    """
+    import matplotlib
+    from matplotlib.axes import Axes
+    from matplotlib.patches import Rectangle
+
+    values = table.to_numpy().T
+    n_bins, sectors = values.shape
+
+    if colors is None:
+        cmap = cmap or matplotlib.colormaps[matplotlib.rcParams['image.cmap']]
+        colors = [cmap(x) for x in np.linspace(0, 1, n_bins)]
+    elif isinstance(colors, str):
+        colors = [colors] * n_bins
+
+    # sectors are centred on north and run clockwise
+    angles = np.arange(0, -2 * np.pi, -2 * np.pi / sectors) + np.pi / 2
+    origins = np.cumsum(values, axis=0) - values
+
+    for i in range(n_bins):
+        # below the grid, as `windrose` draws them
+        Axes.bar(ax, angles, values[i], width=2 * np.pi / sectors * opening,
+                 bottom=origins[i], color=colors[i], edgecolor=edgecolor, zorder=-i)
+
+    ax.set_rmax(values.sum(axis=0).max())
+    ax.set_radii_angle()
+
+    # labelled as `WindroseAxes.legend` labels the speed bins
+    edges = ['%.1f' % edge for edge in table.columns]
+    labels = ['[%s : %s)' % pair for pair in zip(edges[:-1], edges[1:])] + ['>%s' % edges[-1]]
+    handles = [Rectangle((0, 0), 0.2, 0.2, facecolor=color, edgecolor='black')
+               for color in colors]
+
+    Axes.legend(ax, handles, labels, loc='lower left', borderaxespad=-0.10, fontsize=8)
+
+
+def pdf(data, speed=None, hist_kwargs=None, plot_kwargs=None, ax=None):
     """
     Generates a Weibull probability density plot from the given data.
 
@@ -126,11 +439,14 @@ def pdf(data, speed=None, hist_kwargs=None, plot_kwargs=None):
         from `data`. It will take the first column containing the string 'windspeed'.
       hist_kwargs (dict, optional): Additional histogram parameters.
       plot_kwargs (dict, optional): Additional plot parameters.
+      ax (:obj:`matplotlib.axes.Axes`, optional): axes to draw on, by default a new
+        figure is created
 
     Returns:
       tuple: (fig, ax, params) consisting of a `matplotlib.figure.Figure`,
       `matplotlib.axes.Axes`, and 4-element tuple of floats/ints representing
-      shape (2), location, and scale.
+      shape (2), location, and scale, in the order of `scipy.stats.exponweib` (see
+      `fit_weibull`).
     """
     assert isinstance(data, DataFrame), '"data" must be a DataFrame'
 
@@ -143,29 +459,30 @@ def pdf(data, speed=None, hist_kwargs=None, plot_kwargs=None):
     if speed:
         assert isinstance(speed, str), '"speed" must be a string'
         assert speed in data, "column not found: %s" % speed
-        ws = list(data[speed])
+        ws = _column(data, speed).to_numpy(dtype=np.float64)
     else:
         fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
         assert len(fields) > 0, 'unable to infer wind speed data column'
         ws_field = fields[0]
-        ws = list(data[ws_field])
+        ws = _column(data, ws_field).to_numpy(dtype=np.float64)
 
     # Fit Weibull function
-    params = stats.exponweib.fit(ws, floc=0, f0=1)
+    k, c = fit_weibull(ws)
+    params = (1, float(k[0]), 0, float(c[0]))
 
     # Plotting
 
-    fig, ax = plt.subplots()
+    fig, ax = _subplots(ax)
 
     # Histogram
-    bins = round(max(ws))+5
+    bins = round(np.nanmax(ws))+5
     values, bins, hist = ax.hist(ws, bins=bins, density=True, lw=1, ec='black', **hist_kwargs)
     center = (bins[:-1] + bins[1:]) / 2.
 
     # Using all params and the `pdf` function
     ax.plot(
         center,
-        stats.exponweib.pdf(center, *params),
+        weibull_pdf(center, params[1], params[3]),
         lw=2, label='Weibull', color='r', **plot_kwargs)
 
     ax.set_xlabel('Wind Speed (m/s)', fontsize='large')
@@ -175,7 +492,107 @@ def pdf(data, speed=None, hist_kwargs=None, plot_kwargs=None):
     return fig, ax, params
 
 
-def get_diurnal_stats(data, speed=None):
+def fit_weibull(data, fields=None, tol=1e-10, max_iter=50):
+    """
+    Fits a 2-parameter Weibull distribution to every column of `data` at once, by
+    maximum likelihood, with a Newton solver for the shape of all columns in parallel.
+    This is equivalent to `scipy.stats.exponweib.fit(ws, floc=0, f0=1)`, without the
+    general purpose optimizer.
+
+    Values that are not positive (calms) or NaN are ignored, as the likelihood is not
+    defined for them.
+
+    Args:
+      data (:obj:`DataFrame` or :obj:`numpy.ndarray`): Wind data, or a (samples,) or
+        (samples, columns) array of wind speeds, e.g. one column per site.
+      fields (:obj:`list` of :obj:`str`, optional): columns of a `DataFrame` to fit. If
+        none are provided, every column containing the string 'windspeed' is fit.
+      tol (float, optional): relative tolerance of the shape parameter
+      max_iter (int, optional): maximum number of Newton iterations
+
+    Returns:
+      tuple: A tuple `(k, c)` of arrays holding the shape and scale (m/s) of each column.
+    """
+    if isinstance(data, DataFrame):
+        if fields:
+            assert isinstance(fields, list), '"fields" must be a list or None'
+
+            for field in fields:
+                assert field in data, 'column not found: %s' % field
+        else:
+            fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
+            assert len(fields) > 0, 'unable to infer wind speed data column'
+
+        x = np.column_stack([_column(data, field).to_numpy(dtype=np.float64)
+                             for field in fields])
+    else:
+        assert isinstance(data, np.ndarray), '"data" must be a DataFrame or ndarray'
+        assert data.ndim in (1, 2), '"data" must have 1 or 2 dimensions'
+
+        x = np.asarray(data, dtype=np.float64).reshape(len(data), -1)
+
+    with np.errstate(invalid='ignore'):
+        valid = x > 0
+
+    n = valid.sum(axis=0)
+    assert (n > 1).all(), 'at least 2 positive values are required in every column'
+
+    # the fit is scale invariant, so scale each column to a max of 1 to avoid overflow.
+    # Ignored values are zeroed in both `x` and `log_x`, so they drop out of every sum.
+    x_max = np.where(valid, x, 0).max(axis=0)
+    x = np.where(valid, x / x_max, 0)
+    log_x = np.log(x, out=np.zeros_like(x), where=valid)
+    mean_log = log_x.sum(axis=0) / n
+
+    # start from the moment estimate k = (std / mean) ** -1.086
+    mean = x.sum(axis=0) / n
+    std = np.sqrt(np.maximum(np.einsum('ij,ij->j', x, x) / n - mean ** 2, 0) * n / (n - 1))
+    k = np.clip((std / mean) ** -1.086, 0.1, 50)
+
+    for _ in range(max_iter):
+        x_k = x ** k
+        x_k_log = x_k * log_x
+        s_0 = x_k.sum(axis=0)
+        s_1 = x_k_log.sum(axis=0)
+        s_2 = np.einsum('ij,ij->j', x_k_log, log_x)
+
+        # root of the profile likelihood's derivative with respect to k
+        g = s_1 / s_0 - 1 / k - mean_log
+        dg = (s_2 * s_0 - s_1 ** 2) / s_0 ** 2 + 1 / k ** 2
+        step = g / dg
+
+        k = np.maximum(k - step, k / 2)
+
+        if (np.abs(step) <= tol * k).all():
+            break
+
+    c = ((x ** k).sum(axis=0) / n) ** (1 / k) * x_max
+
+    return k, c
+
+
+def weibull_pdf(ws, k, c):
+    """
+    Returns the probability density of a 2-parameter Weibull distribution.
+
+    Args:
+      ws (:obj:`numpy.ndarray`): wind speeds (m/s)
+      k (float): shape
+      c (float): scale (m/s)
+
+    Returns:
+      ndarray: The probability density at each wind speed.
+    """
+    ws = np.asarray(ws, dtype=np.float64)
+
+    return k / c * (ws / c) ** (k - 1) * np.exp(-(ws / c) ** k)
+
+
+DIURNAL_STATS = ['Mean', 'Mean+Std', 'Mean-Std', '10th Percentile', 'Median',
+                 '90th Percentile']
+
+
+def get_diurnal_stats(data, speed=None, by_month=False):
     """
     Returns basic relevant diurnal wind speed statistics for the given data.
 
@@ -183,37 +600,138 @@ def get_diurnal_stats(data, speed=None):
       data (DataFrame): Wind data
       speed (str, optional): Wind speed column name. If not provided, it will be inferred
         from `data`. It will take the first column containing the string 'windspeed'.
+      by_month (:obj:`bool`, optional): compute the statistics for every month and hour
+        (12x24) rather than every hour, by default False
 
     Returns:
-      DataFrame: A DataFrame consisting of an hourly time index, and columns representing
-      various diurnal wind speed statistics for the given wind speed.
+      DataFrame: A DataFrame consisting of an hourly time index (or a `(month, hour)`
+      index if `by_month` is True), and columns representing various diurnal wind speed
+      statistics for the given wind speed.
     """
     assert isinstance(data, DataFrame), '"data" must be a DataFrame'
     if speed:
         assert isinstance(speed, str), '"speed" must be a string'
         assert speed in data, "column not found: %s" % speed
-        ws = data[speed]
+        ws = _column(data, speed)
     else:
         fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
         assert len(fields) > 0, 'unable to infer wind speed data column'
         ws_field = fields[0]
-        ws = data[ws_field]
+        ws = _column(data, ws_field)
+
+    return _diurnal_stats(data.index, ws.to_numpy()[:, None], by_month).droplevel(0, axis=1)
+
+
+def get_diurnal_stats_many(data, fields=None, by_month=False):
+    """
+    Returns the diurnal statistics of `get_diurnal_stats` for many columns at once, e.g.
+    every height, or the same height at many sites, in a single pass over the data.
+
+    Args:
+      data (DataFrame): Wind data
+      fields (:obj:`list` of :obj:`str`, optional): columns to include. If none are
+        provided, every column containing the string 'windspeed' is included.
+      by_month (:obj:`bool`, optional): compute the statistics for every month and hour
+        (12x24) rather than every hour, by default False
+
+    Returns:
+      DataFrame: A DataFrame consisting of an hourly time index (or a `(month, hour)`
+      index if `by_month` is True), and `(field, statistic)` columns, with the same
+      statistics as `get_diurnal_stats` for each field.
+    """
+    assert isinstance(data, DataFrame), '"data" must be a DataFrame'
+
+    if fields:
+        assert isinstance(fields, list), '"fields" must be a list or None'
+        msg = '"fields" elements must be strings'
+        assert all([isinstance(f, str) for f in fields]), msg
+
+        for field in fields:
+            assert field in data, 'column not found: %s' % field
+    else:
+        fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
+        assert len(fields) > 0, 'unable to infer wind speed data column'
+
+    values = np.column_stack([_column(data, field).to_numpy(dtype=np.float64)
+                              for field in fields])
+
+    return _diurnal_stats(data.index, values, by_month, fields)
+
+
+def _diurnal_stats(index, values, by_month=False, fields=None):
+    """
+    Computes `DIURNAL_STATS` of every column of the (time, field) array `values`, grouped
+    by hour (or month and hour) of `index`. The rows are grouped with a single radix
+    sort shared by every column, and the percentiles of each group are found by
+    partitioning it, rather than sorting.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_groups = 12 * 24 if by_month else 24
+
+    order, bounds = _diurnal_groups(index, by_month)
+    grouped = values[order]
+
+    table = np.full((n_groups, values.shape[1], len(DIURNAL_STATS)), np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for group in range(n_groups):
+            rows = grouped[bounds[group]:bounds[group + 1]]
+
+            if not len(rows):
+                continue
+
+            # pandas skips NaNs, so the slower NaN-aware functions are only needed here
+            if np.isnan(rows).any():
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    mean, std = np.nanmean(rows, axis=0), np.nanstd(rows, axis=0, ddof=1)
+                    p_10, median, p_90 = np.nanquantile(rows, [.1, .5, .9], axis=0)
+            else:
+                mean, std = rows.mean(axis=0), rows.std(axis=0, ddof=1)
+                p_10, median, p_90 = np.quantile(rows, [.1, .5, .9], axis=0)
+
+            table[group] = np.column_stack(
+                [mean, mean + std, mean - std, p_10, median, p_90])
+
+    # only hours with data, as `groupby` would, labelled with the dtype of
+    # `DatetimeIndex.hour`
+    present = bounds[1:] > bounds[:-1]
+    table = table[present].reshape(int(present.sum()), -1)
+    groups = np.flatnonzero(present).astype(np.int32)
+
+    if by_month:
+        labels = pandas.MultiIndex.from_arrays([groups // 24 + 1, groups % 24],
+                                               names=['month', 'hour'])
+    else:
+        labels = pandas.Index(groups, name=index.name)
+
+    columns = pandas.MultiIndex.from_product([fields or [None], DIURNAL_STATS])
 
-    mean = ws.groupby(data.index.hour).mean()
-    plus_std = mean + ws.groupby(data.index.hour).std()
-    minus_std = mean - ws.groupby(data.index.hour).std()
-    p_10 = ws.groupby(data.index.hour).quantile(q=.1)
-    median = ws.groupby(data.index.hour).median()
-    p_90 = ws.groupby(data.index.hour).quantile(q=.9)
+    return DataFrame(table, index=labels, columns=columns)
 
-    df = pandas.concat([mean, plus_std, minus_std, p_10, median, p_90], axis=1)
 
-    df.columns = ['Mean', 'Mean+Std', 'Mean-Std', '10th Percentile', 'Median', '90th Percentile']
+def _diurnal_groups(index, by_month=False):
+    """
+    Groups the rows of `index` by hour (`h`), or by month and hour (`24 * (m - 1) + h`).
+
+    Returns:
+      tuple: The order that sorts the rows by group, and the `n_groups + 1` bounds of
+      each group's rows in that order.
+    """
+    n_groups = 12 * 24 if by_month else 24
 
-    return df
+    codes = np.asarray(index.hour, dtype=np.int16)
+    if by_month:
+        codes = codes + 24 * (np.asarray(index.month, dtype=np.int16) - 1)
 
+    # a stable sort of small ints is a radix sort
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_groups))])
 
-def plot_diurnal_stats(data, speed=None):
+    return order, bounds
+
+
+def plot_diurnal_stats(data, speed=None, ax=None):
     """
     Plots basic relevant diurnal wind speed statistics for the given data.
 
@@ -223,6 +741,8 @@ def plot_diurnal_stats(data, speed=None):
       data (DataFrame): Wind data
       speed (str, optional): Wind speed column name. If not provided, it will be inferred
         from `data`. It will take the first column containing the string 'windspeed'.
+      ax (:obj:`matplotlib.axes.Axes`, optional): axes to draw on, by default a new
+        figure is created
 
     Returns:
       tuple: A tuple (fig, ax, df) consisting of a `matplotlib.figure.Figure`,
@@ -234,7 +754,7 @@ def plot_diurnal_stats(data, speed=None):
 
     markers = ('+', '*', '.', '2', 'x', '')
 
-    fig, ax = plt.subplots()
+    fig, ax = _subplots(ax)
 
     for i, label in enumerate(stats_df):
         ax.plot(stats_df[label], label=label, marker=markers[i])
@@ -247,40 +767,263 @@ def plot_diurnal_stats(data, speed=None):
     return fig, ax, stats_df
 
 
+TURBULENCE_STATS = ['Mean', 'Std', 'TI']
+"""Measured statistics of each 10 minute window, see `get_turbulence_stats`."""
+
+REPRESENTATIVE_STATS = ['Count', 'Mean TI', 'Representative TI']
+"""Statistics of each wind speed bin, see `get_turbulence_stats`."""
+
+
 def turbulence_std(data, turbine, speed=None, b=5.6):
     """
-    Calculates the turbulence standard deviation.
+    Calculates the turbulence standard deviation of the Normal Turbulence Model, for one or
+    many turbines and wind speed columns at once.
 
     Args:
       data (Union[float, DataFrame]): Wind speed velocity (m/s) at hub height.
-      turbine (WindTurbine): A `WindTurbine` instance.
+      turbine (Union[WindTurbine, list]): A `WindTurbine` instance, or a list of them.
+      speed (Union[str, list], optional): Wind speed column name, or a list of them. If
+        not provided, it will be inferred from `data`. It will take the first column
+        containing the string 'windspeed'.
       b (float, optional): Additional adjustment parameter (m/s)
 
     Returns:
-      float: Turbulence standard deviation.
+      Union[float, ndarray, DataFrame]: Turbulence standard deviation. For a float `data`,
+      a float (or an array with one value per turbine). For a DataFrame, the standard
+      deviation of every 10 minute average wind speed: a single `turbulence_std` column
+      for one turbine and column, otherwise `(field, turbine name)` columns.
     """
     assert isinstance(data, (float, DataFrame)), '"data" must be a float or DataFrame'
-    assert isinstance(turbine, WindTurbine), '"turbine" must be a WindTurbine'
+
+    many = isinstance(turbine, list)
+    turbines = turbine if many else [turbine]
+    msg = '"turbine" must be a WindTurbine'
+    assert len(turbines) > 0 and all([isinstance(t, WindTurbine) for t in turbines]), msg
+
+    i_ref = np.array([t.i_ref for t in turbines])
 
     if isinstance(data, float):
-        return turbine.i_ref*(0.75*data + b)
+        sigma = i_ref * (0.75 * data + b)
+        return sigma if many else float(sigma[0])
 
-    if speed:
-        assert isinstance(speed, str), '"speed" must be a string'
-        assert speed in data, "column not found: %s" % speed
-        ws = data[speed]
+    fields = _turbulence_fields(data, speed)
+    index, _, mean, _ = _ten_minute_stats(data.index, _values(data, fields))
+
+    # (window, field, turbine), broadcast in one expression
+    sigma = i_ref * (0.75 * mean[:, :, None] + b)
+
+    if not many and not isinstance(speed, list):
+        return DataFrame(sigma[:, 0, 0], index=index, columns=['turbulence_std'])
+
+    columns = pandas.MultiIndex.from_product([fields, [t.name for t in turbines]])
+
+    return DataFrame(sigma.reshape(len(index), len(columns)), index=index, columns=columns)
+
+
+def get_turbulence_stats(data, turbines=None, fields=None, b=5.6, bin_width=1.0,
+                         quantile=0.9):
+    """
+    Characterises the measured turbulence of a site, for many wind speed columns at once,
+    and compares it with the Normal Turbulence Model of many turbines.
+
+    The data are grouped into 10 minute windows once, shared by every column, giving
+    the mean, standard deviation and turbulence intensity (TI, standard deviation over
+    mean) of each window. Windows are then binned by mean wind speed, and the
+    representative TI of each bin is its `quantile` (the 90th percentile by default), as
+    in IEC 61400-1.
+
+    Measured TI requires data at a finer resolution than 10 minutes, e.g. 5 minute data;
+    windows with fewer than two values have no TI.
+
+    Args:
+      data (DataFrame): Wind data, with a `DatetimeIndex`
+      turbines (:obj:`list` of :obj:`WindTurbine`, optional): turbines to model. If
+        provided, the NTM standard deviation of each window, and the NTM TI at the centre
+        of each bin, are included for each turbine.
+      fields (:obj:`list` of :obj:`str`, optional): wind speed columns to include. If
+        none are provided, every column containing the string 'windspeed' is included.
+      b (float, optional): Additional adjustment parameter (m/s) of the NTM
+      bin_width (float, optional): width of the wind speed bins (m/s), which are centred
+        on multiples of `bin_width`, by default 1
+      quantile (float, optional): quantile of TI for the representative TI, by default
+        0.9
+
+    Returns:
+      tuple: A tuple (windows, bins) of DataFrames. `windows` has a 10 minute time index
+      and `(field, statistic)` columns of `TURBULENCE_STATS`, followed by `NTM <name>`
+      for each turbine. `bins` has an index of bin centre speeds and `(field, statistic)`
+      columns of `REPRESENTATIVE_STATS`, followed by `NTM <name>` for each turbine
+      (which is NaN for the 0 m/s bin).
+    """
+    assert isinstance(data, DataFrame), '"data" must be a DataFrame'
+
+    turbines = turbines or []
+    assert isinstance(turbines, list), '"turbines" must be a list or None'
+    msg = '"turbines" elements must be WindTurbines'
+    assert all([isinstance(t, WindTurbine) for t in turbines]), msg
+
+    if fields:
+        assert isinstance(fields, list), '"fields" must be a list or None'
+        msg = '"fields" elements must be strings'
+        assert all([isinstance(f, str) for f in fields]), msg
+
+        for field in fields:
+            assert field in data, 'column not found: %s' % field
     else:
         fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
         assert len(fields) > 0, 'unable to infer wind speed data column'
-        ws_field = fields[0]
-        ws = data[ws_field]
 
-    # Group wind speeds by 10min averages, should work for any resolution
-    ws_avg = ws.groupby(Grouper(freq='10min')).mean()
-    df = DataFrame(ws_avg)
-    df.columns = ['turbulence_std']
+    assert bin_width > 0, '"bin_width" must be positive'
+    assert 0 <= quantile <= 1, '"quantile" must be between 0 and 1'
+
+    index, _, mean, std = _ten_minute_stats(data.index, _values(data, fields))
+    i_ref = np.array([t.i_ref for t in turbines])
+    ntm = [('NTM %s' % t.name) for t in turbines]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ti = std / mean
+
+        windows = np.concatenate([
+            np.stack([mean, std, ti], axis=2),
+            i_ref * (0.75 * mean[:, :, None] + b),
+        ], axis=2)
+
+        centres, count, ti_mean, ti_rep = _binned_quantile(mean, ti, bin_width, quantile)
+        speeds = centres * bin_width
+        bins = np.concatenate([
+            np.stack([count, ti_mean, ti_rep], axis=2),
+            # the NTM is undefined for the 0 m/s bin
+            np.broadcast_to(np.where(speeds[:, None, None] > 0,
+                                     i_ref * (0.75 + b / speeds[:, None, None]), np.nan),
+                            (len(speeds), len(fields), len(turbines))),
+        ], axis=2)
+
+    # (row, field, statistic) to (row, (field, statistic)), allowing for no rows
+    windows = DataFrame(
+        windows.reshape(len(index), len(fields) * windows.shape[2]), index=index,
+        columns=pandas.MultiIndex.from_product([fields, TURBULENCE_STATS + ntm]))
+    bins = DataFrame(
+        bins.reshape(len(speeds), len(fields) * bins.shape[2]),
+        index=pandas.Index(speeds, name='speed'),
+        columns=pandas.MultiIndex.from_product([fields, REPRESENTATIVE_STATS + ntm]))
+
+    return windows, bins
+
+
+def _turbulence_fields(data, speed=None):
+    """Returns the wind speed columns named by `speed` (a str or list), or inferred."""
+    if speed:
+        speeds = speed if isinstance(speed, list) else [speed]
+        msg = '"speed" must be a string'
+        assert all([isinstance(s, str) for s in speeds]), msg
+
+        for s in speeds:
+            assert s in data, "column not found: %s" % s
+
+        return speeds
+
+    assert speed is None, '"speed" must be a string'
+    fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
+    assert len(fields) > 0, 'unable to infer wind speed data column'
+
+    return fields[:1]
+
+
+def _values(data, fields):
+    """Returns the (time, field) float64 array of `fields` in `data`, unscaled."""
+    return np.column_stack([_column(data, field).to_numpy(dtype=np.float64)
+                            for field in fields])
+
 
-    # Apply std calc for every row
-    df = df.apply(lambda d: turbine.i_ref*(0.75*d + b))
+def _ten_minute_stats(index, values):
+    """
+    Groups the rows of the (time, field) array `values` into the 10 minute windows of
+    `index`, as `Grouper(freq='10min')` would (including empty windows), with one
+    `bincount` per statistic shared by every column. NaNs are skipped.
+
+    Returns:
+      tuple: The windows' `DatetimeIndex`, and (window, field) arrays of each window's
+      count, mean and standard deviation (`ddof=1`).
+    """
+    n_fields = values.shape[1]
+    floored = index.floor('10min')
+
+    if not len(index):
+        empty = np.empty((0, n_fields))
+        return pandas.DatetimeIndex(floored, name=index.name), empty, empty, empty
+
+    start = floored.min()
+    codes = np.asarray((floored - start) // pandas.Timedelta('10min'), dtype=np.int64)
+    n_windows = int(codes.max()) + 1
+
+    # offset each column's windows, so one bincount groups every column
+    keys = (codes[:, None] + n_windows * np.arange(n_fields)).ravel()
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0).ravel()
+
+    def total(weights):
+        return np.bincount(keys, weights=weights, minlength=n_windows * n_fields) \
+            .reshape(n_fields, n_windows).T
 
-    return df
+    with np.errstate(invalid='ignore', divide='ignore'):
+        count = total(valid.ravel().astype(np.float64))
+        mean = total(filled) / count
+
+        # deviations from each window's mean, rather than the less stable sum of squares
+        deviations = np.where(valid, values - mean[codes], 0).ravel()
+        std = np.sqrt(total(deviations ** 2) / (count - 1))
+        std[count < 2] = np.nan
+
+    windows = pandas.date_range(start, periods=n_windows, freq='10min', name=index.name)
+
+    return windows, count, mean, std
+
+
+def _binned_quantile(speed, ti, bin_width, quantile):
+    """
+    Bins the (window, field) TI array `ti` by the speed of each window, and returns the
+    sorted bin numbers found, and (bin, field) arrays of the count, mean and `quantile`
+    (interpolated as `numpy.quantile` is) of each bin. One sort orders the TI of every
+    field and bin at once.
+    """
+    n_fields = speed.shape[1]
+    valid = np.isfinite(ti) & np.isfinite(speed)
+
+    # bins are centred on multiples of `bin_width`
+    bins = np.floor(speed[valid] / bin_width + 0.5).astype(np.int64)
+    field = np.broadcast_to(np.arange(n_fields), speed.shape)[valid]
+    values = ti[valid]
+
+    centres, bins = np.unique(bins, return_inverse=True)
+    n_bins = len(centres)
+
+    # ordered by field, then bin, then TI: sorting by TI, then stably by group (a radix
+    # sort, while the groups fit in 16 bits) is much faster than `lexsort`
+    groups = field * n_bins + bins
+    if n_bins * n_fields <= np.iinfo(np.uint16).max:
+        groups = groups.astype(np.uint16)
+
+    order = np.argsort(values)
+    order = order[np.argsort(groups[order], kind='stable')]
+    values, groups = values[order], groups[order]
+
+    count = np.bincount(groups, minlength=n_bins * n_fields)
+    sums = np.bincount(groups, weights=values, minlength=n_bins * n_fields)
+    starts = np.concatenate([[0], np.cumsum(count)[:-1]])
+
+    # linear interpolation between the closest ranks of each group
+    position = starts + quantile * np.maximum(count - 1, 0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + count - 1)
+    fraction = position - lower
+
+    quantiles = np.full(n_bins * n_fields, np.nan)
+    present = count > 0
+    lo, hi = values[lower[present]], values[upper[present]]
+    quantiles[present] = lo + (hi - lo) * fraction[present]
+
+    def by_bin(a):
+        return a.reshape(n_fields, n_bins).T
+
+    return (centres.astype(np.float64), by_bin(count).astype(np.float64),
+            by_bin(sums / np.where(present, count, np.nan)), by_bin(quantiles))
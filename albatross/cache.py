@@ -0,0 +1,407 @@
+"""
+Provides persistent, on-disk caching for WIND Toolkit requests.
+"""
+
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover (Windows)
+    fcntl = None
+
+CACHE_ENV_VAR = 'ALBATROSS_CACHE_DIR'
+DEFAULT_MAX_SIZE = 2 * 1024 ** 3
+
+_DEFAULT_CACHE = None
+
+
+def get_cache_dir():
+    """
+    Returns the root directory used for albatross caches. This can be overridden with
+    the `ALBATROSS_CACHE_DIR` environment variable.
+
+    Returns:
+      str: The cache directory path.
+    """
+    default = os.path.join(os.path.expanduser('~'), '.cache', 'albatross')
+
+    return os.environ.get(CACHE_ENV_VAR, default)
+
+
+def get_default_cache():
+    """
+    Returns the shared `PointCache` instance used when requests are made with
+    `cache=True`.
+
+    Returns:
+      PointCache: The default point cache.
+    """
+    global _DEFAULT_CACHE
+
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = PointCache()
+
+    return _DEFAULT_CACHE
+
+
+def get_tree_path(name):
+    """
+    Returns the path of a cached cKDTree.
+
+    Args:
+      name (str): tree name, e.g. a region name.
+
+    Returns:
+      str: The `.pkl` file path (which may not exist yet).
+    """
+    return os.path.join(get_cache_dir(), 'trees', '%s_tree.pkl' % name)
+
+
+def get_coordinates_path(name):
+    """
+    Returns the path of a cached coordinates array.
+
+    Args:
+      name (str): array name, e.g. a region name.
+
+    Returns:
+      str: The `.npy` file path (which may not exist yet).
+    """
+    return os.path.join(get_cache_dir(), 'coordinates', '%s.npy' % name)
+
+
+def save_tree(tree, path):
+    """
+    Pickles a cKDTree to `path`. The file is written atomically, so workers building
+    the same tree at the same time never see a partial file.
+
+    Args:
+      tree (cKDTree): The tree to save.
+      path (str): The destination `.pkl` file path.
+    """
+    _write_atomic(path, lambda f: pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def save_array(array, path):
+    """
+    Saves an array to a `.npy` file at `path`, atomically (see `save_tree`).
+
+    Args:
+      array (ndarray): The array to save.
+      path (str): The destination `.npy` file path.
+    """
+    _write_atomic(path, lambda f: np.save(f, array, allow_pickle=False))
+
+
+def load_array(path):
+    """
+    Memory-maps a `.npy` file read-only, so the data is only read from disk (and
+    counted in memory) as it is used, and is shared between processes.
+
+    Args:
+      path (str): The `.npy` file path.
+
+    Returns:
+      memmap: The array.
+    """
+    return np.load(path, mmap_mode='r')
+
+
+def _write_atomic(path, write):
+    """Calls `write` with a temporary file object, and then moves that file to `path`."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=os.path.dirname(path))
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_tree(path):
+    """
+    Loads a pickled cKDTree. Trees are memoized per process, keyed by path and
+    modification time, so each process unpickles a tree once (and again only if the
+    file is rewritten). The returned tree is shared, and must not be modified.
+
+    Args:
+      path (str): The `.pkl` file path.
+
+    Returns:
+      cKDTree: The tree.
+    """
+    path = os.path.abspath(path)
+
+    return _load_tree(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_tree(path, mtime):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class PointCache:
+    """
+    A persistent cache of WIND Toolkit point reads.
+
+    Each entry is stored as a compressed, columnar `.npz` file, keyed by a hash of
+    the request (file path, gid, dataset, time slice and unscale flag). The total
+    size of the cache is capped at `max_size` bytes, with the least recently used
+    entries evicted first. Reads and writes take a shared/exclusive lock on the cache
+    directory, so several worker processes can safely share one cache, and the size is
+    tracked in a file in the directory, so the cap applies to all of them together.
+    """
+    def __init__(self, cache_dir=None, max_size=DEFAULT_MAX_SIZE):
+        """
+        Args:
+          cache_dir (str, optional): Directory to store entries in. By default, a
+            `points` directory inside of `get_cache_dir()`.
+          max_size (int, optional): Maximum total size of the cache (bytes).
+        """
+        assert isinstance(max_size, int) and max_size > 0, '"max_size" must be a positive int'
+
+        self.cache_dir = cache_dir or os.path.join(get_cache_dir(), 'points')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        # guards `hits` and `misses`, which threads sharing this instance update
+        self._counter_lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Builds a cache key from the given request parts, typically
+        `(wtk_file, gid, dataset, time_slice, unscale)`.
+
+        Returns:
+          str: A hex digest identifying the request.
+        """
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    @property
+    def size(self):
+        """int: Total size of all cache entries (bytes)."""
+        return sum(os.path.getsize(path) for path in self._entries())
+
+    def get(self, key):
+        """
+        Retrieves a cache entry, counting a hit or a miss.
+
+        Args:
+          key (str): A key built with `make_key`.
+
+        Returns:
+          DataFrame: The cached data, or None if the key is not in the cache.
+        """
+        path = self._path(key)
+
+        with self._lock():
+            try:
+                with np.load(path, allow_pickle=False) as npz:
+                    data = _npz_to_frame(npz)
+            except (FileNotFoundError, OSError, ValueError, KeyError):
+                with self._counter_lock:
+                    self.misses += 1
+
+                return None
+
+            # mark as recently used
+            with contextlib.suppress(OSError):
+                os.utime(path)
+
+        with self._counter_lock:
+            self.hits += 1
+
+        return data
+
+    def put(self, key, data):
+        """
+        Stores a cache entry, evicting the least recently used entries if the cache
+        grows beyond `max_size`.
+
+        Args:
+          key (str): A key built with `make_key`.
+          data (DataFrame): The data to store.
+        """
+        assert isinstance(data, pd.DataFrame), '"data" must be a DataFrame'
+
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=self.cache_dir)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **_frame_to_npz(data))
+
+            with self._lock(exclusive=True):
+                path = self._path(key)
+
+                # an overwritten entry no longer counts towards the size
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                size = self._tracked_size() - old_size
+
+                os.replace(tmp, path)
+                size += os.path.getsize(path)
+
+                if size > self.max_size:
+                    size = self._evict()
+
+                self._set_tracked_size(size)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def clear(self):
+        """Removes every entry from the cache and resets the hit/miss counters."""
+        with self._lock(exclusive=True):
+            for path in self._entries():
+                os.remove(path)
+
+            self._set_tracked_size(0)
+
+        with self._counter_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def _entries(self):
+        return [
+            entry.path for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith('.npz') and not entry.name.startswith('tmp')
+        ]
+
+    def _tracked_size(self):
+        """
+        Returns the size of the cache shared by every instance using the directory,
+        recomputing it if it hasn't been tracked yet. Must be called with the lock held.
+        """
+        try:
+            with open(os.path.join(self.cache_dir, '.size')) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return self.size
+
+    def _set_tracked_size(self, size):
+        """Records the shared size of the cache. Must be called with an exclusive lock."""
+        with open(os.path.join(self.cache_dir, '.size'), 'w') as f:
+            f.write(str(size))
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits `max_size`, and
+        returns the remaining size.
+        """
+        entries = []
+
+        for path in self._entries():
+            with contextlib.suppress(OSError):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        size = sum(s for _, s, _ in entries)
+
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                size -= entry_size
+
+        return size
+
+    @contextlib.contextmanager
+    def _lock(self, exclusive=False):
+        """
+        Holds a shared (or exclusive) lock on the cache directory. This is a no-op on
+        platforms without `fcntl`.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.cache_dir, '.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _to_npz_values(values):
+    """Converts column/index values into an array that can be stored without pickling."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(None).to_numpy(), str(values.dt.tz)
+
+    arr = values.to_numpy()
+
+    if arr.dtype == object or isinstance(values.dtype, pd.StringDtype):
+        kind = 'S' if len(arr) and isinstance(arr[0], bytes) else 'U'
+        arr = arr.astype(kind)
+
+    return arr, ''
+
+
+def _frame_to_npz(df):
+    """Converts a `DataFrame` into a dict of arrays for `np.savez`."""
+    out = {'__columns__': np.array([str(c) for c in df.columns], dtype='U')}
+
+    tzs = []
+    for i, col in enumerate(df.columns):
+        out['c%s' % i], tz = _to_npz_values(df[col])
+        tzs.append(tz)
+
+    if not isinstance(df.index, pd.RangeIndex):
+        out['__index__'], tz = _to_npz_values(df.index.to_series())
+        out['__index_name__'] = np.array([df.index.name or ''], dtype='U')
+        tzs.append(tz)
+
+    out['__tz__'] = np.array(tzs, dtype='U')
+
+    return out
+
+
+def _from_npz_values(arr, tz):
+    if tz:
+        return pd.DatetimeIndex(arr).tz_localize('UTC').tz_convert(tz)
+
+    if arr.dtype.kind == 'U':
+        return arr.astype(object)
+
+    return arr
+
+
+def _npz_to_frame(npz):
+    """Converts a loaded `.npz` file back into a `DataFrame`."""
+    columns = [str(c) for c in npz['__columns__']]
+    tzs = list(npz['__tz__'])
+
+    index = None
+    if '__index__' in npz.files:
+        index = pd.Index(_from_npz_values(npz['__index__'], tzs[-1]),
+                         name=str(npz['__index_name__'][0]) or None)
+
+    data = {
+        col: _from_npz_values(npz['c%s' % i], tzs[i]) for i, col in enumerate(columns)
+    }
+
+    return pd.DataFrame(data, index=index, columns=columns)
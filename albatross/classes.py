@@ -37,6 +37,12 @@ TURBULENCE_CLASSES = {
 }
 
 
+BYTES_PER_VALUE = 2
+"""Bytes per stored value; WTK resource datasets are stored as 16-bit integers."""
+
+_TIME_STEPS = {None: 'h', 'hourly': 'h', '5min': '5min'}
+
+
 class WindTurbine:
     """
     Represents a wind turbine that follows classification guidelines for IEC-61400, Section 6.2.
@@ -59,6 +65,7 @@ class WindTurbine:
 
         self.wind_speed_class = wind_speed_class
         self.turbulence_class = turbulence_class
+        self.name = wind_speed_class + turbulence_class
 
         self._set_turbine_data()
         self._set_turbulence_data()
@@ -98,19 +105,23 @@ class RequestParams:
     _HEIGHT_FIELDS = {
         'wind_speed': {
             'field': 'windspeed',
-            'height_range': range(10, 201)
+            'height_range': range(10, 201),
+            'stored_heights': [10, 40, 60, 80, 100, 120, 140, 160, 200]
         },
         'wind_direction': {
             'field': 'winddirection',
-            'height_range': range(10, 201)
+            'height_range': range(10, 201),
+            'stored_heights': [10, 40, 60, 80, 100, 120, 140, 160, 200]
         },
         'pressure': {
             'field': 'pressure',
-            'height_range': range(0, 201)
+            'height_range': range(0, 201),
+            'stored_heights': [0, 100, 200]
         },
         'temperature': {
             'field': 'temperature',
-            'height_range': range(2, 201)
+            'height_range': range(2, 201),
+            'stored_heights': [2, 10, 40, 60, 80, 100, 120, 140, 160, 200]
         }
     }
 
@@ -147,6 +158,22 @@ class RequestParams:
 
         return height + other
 
+    @classmethod
+    def get_stored_datasets(cls):
+        """
+        Returns the datasets stored in WIND Toolkit files. Other heights are
+        interpolated from these when they are read.
+
+        Returns:
+          list: A list of dataset names, e.g. `windspeed_100m`.
+        """
+        height = [
+            '%s_%sm' % (info['field'], h)
+            for info in cls._HEIGHT_FIELDS.values() for h in info['stored_heights']
+        ]
+
+        return height + list(cls._OTHER_FIELDS.values())
+
     def register(self, field, heights=None):
         """
         Registers a new request field.
@@ -181,3 +208,191 @@ class RequestParams:
                 self.params.append(f'{field_name}_{height}m')
         else:
             self.params.append(self._OTHER_FIELDS[field])
+
+    def plan(self, region, years, resolution=None, sites=1, start=None, end=None):
+        """
+        Plans a request of the registered params, without reading anything (see
+        `RequestPlan`).
+
+        Args:
+          region (str): region to request (see `albatross.requests.get_regions`)
+          years (:obj:`int` or :obj:`list` of :obj:`int`): year(s) to request
+          resolution (:obj:`str`, optional): data resolution
+          sites (int, optional): number of sites (gids) requested, by default 1
+          start (:obj:`datetime` or :obj:`str`, optional): start of the time window
+          end (:obj:`datetime` or :obj:`str`, optional): end of the time window
+
+        Returns:
+          RequestPlan: The request plan.
+        """
+        return RequestPlan(self.params, region, years, resolution=resolution, sites=sites,
+                           start=start, end=end)
+
+
+class RequestPlan:
+    """
+    Describes the HSDS reads that a request will make, before anything is read, so that
+    oversized requests can be rejected or split up before they tie up the shared HSDS
+    quota.
+
+    Params are deduplicated and grouped by the stored dataset(s) they are read from, so
+    heights that are interpolated (e.g. `windspeed_90m`) count the two stored heights
+    they are read from, and datasets shared between params are only counted once.
+
+    The estimates assume one HSDS call per stored dataset per file (or per `chunk_rows`
+    time steps), plus one call each for the `meta` and `time_index` of every file.
+
+    Attributes:
+      params (list): the requested params, without duplicates
+      files (list): the file read for each year
+      datasets (dict): the stored datasets that are read, mapped to the params that
+        need them
+      rows (int): number of time steps read per site, over every file
+      sites (int): number of sites (gids) read
+      bytes (int): estimated number of bytes transferred
+      calls (int): estimated number of HSDS calls
+    """
+    def __init__(self, params, region, years, resolution=None, sites=1, start=None,
+                 end=None, datasets=None, chunk_rows=None):
+        """
+        Args:
+          params (:obj:`list` of :obj:`str`): params to request
+          region (str): region to request (see `albatross.requests.get_regions`)
+          years (:obj:`int` or :obj:`list` of :obj:`int`): year(s) to request
+          resolution (:obj:`str`, optional): data resolution
+          sites (int, optional): number of sites (gids) requested, by default 1
+          start (:obj:`datetime` or :obj:`str`, optional): start of the time window
+          end (:obj:`datetime` or :obj:`str`, optional): end of the time window
+          datasets (:obj:`list` of :obj:`str`, optional): datasets stored in the
+            files, by default `RequestParams.get_stored_datasets()`
+          chunk_rows (int, optional): number of time steps read per call, by default
+            the whole time window is read in one call
+        """
+        from .requests import (_check_params, _check_time_window, _check_years,
+                               _height_sources, build_wtk_filepath)
+
+        _check_params(params)
+
+        years = [years] if isinstance(years, int) else years
+        _check_years(years)
+
+        assert isinstance(sites, int) and sites > 0, '"sites" must be a positive int'
+
+        msg = '"chunk_rows" must be a positive int or None'
+        assert chunk_rows is None or (isinstance(chunk_rows, int) and chunk_rows > 0), msg
+
+        start, end = _check_time_window(start, end)
+
+        self.region = region
+        self.years = list(years)
+        self.resolution = resolution
+        self.sites = sites
+        self.start = start
+        self.end = end
+        self.chunk_rows = chunk_rows
+        self._stored = datasets or RequestParams.get_stored_datasets()
+
+        self.params = list(dict.fromkeys(params))
+        self.files = [build_wtk_filepath(region, year, resolution) for year in self.years]
+
+        self.datasets = {}
+        for param in self.params:
+            # the readers always read these, so they are counted with every file
+            if param in ('time_index', 'meta', 'coordinates'):
+                continue
+
+            sources = _height_sources(param, self._stored)
+
+            assert sources, 'dataset not found: %s' % param
+
+            for dset, _ in sources:
+                self.datasets.setdefault(dset, []).append(param)
+
+        self._rows = [len(self._time_index(year)) for year in self.years]
+        self.rows = sum(self._rows)
+        self.bytes = self.rows * self.sites * len(self.datasets) * BYTES_PER_VALUE
+
+        self.calls = sum(
+            len(self.datasets) * (-(-rows // (chunk_rows or max(rows, 1)))) + 2
+            for rows in self._rows
+        )
+
+    def __repr__(self):
+        return '<RequestPlan %s files, %s datasets, %s rows x %s sites, %s bytes, %s calls>' % (
+            len(self.files), len(self.datasets), self.rows, self.sites, self.bytes,
+            self.calls)
+
+    def summary(self):
+        """
+        Returns the plan as a dict.
+
+        Returns:
+          dict: The `params`, `files`, `datasets`, `rows`, `sites`, `bytes` and `calls`
+          of the plan.
+        """
+        return {
+            'params': self.params,
+            'files': self.files,
+            'datasets': self.datasets,
+            'rows': self.rows,
+            'sites': self.sites,
+            'bytes': self.bytes,
+            'calls': self.calls,
+        }
+
+    def check(self, max_bytes=None, max_calls=None):
+        """
+        Rejects the request if it would exceed a transfer budget.
+
+        Args:
+          max_bytes (int, optional): maximum number of bytes to transfer
+          max_calls (int, optional): maximum number of HSDS calls to make
+        """
+        msg = 'request of %s bytes exceeds "max_bytes" (%s), see `RequestPlan.split`'
+        assert max_bytes is None or self.bytes <= max_bytes, msg % (self.bytes, max_bytes)
+
+        msg = 'request of %s calls exceeds "max_calls" (%s)'
+        assert max_calls is None or self.calls <= max_calls, msg % (self.calls, max_calls)
+
+    def split(self, max_bytes):
+        """
+        Splits the request into requests of at most `max_bytes` each, first by year and
+        then into consecutive time windows.
+
+        Args:
+          max_bytes (int): maximum number of bytes to transfer per request
+
+        Returns:
+          list: A list of `RequestPlan`, in time order. Their `years`, `start` and
+          `end` can be passed straight on to the request functions.
+        """
+        assert isinstance(max_bytes, int) and max_bytes > 0, '"max_bytes" must be a positive int'
+
+        row_bytes = self.sites * len(self.datasets) * BYTES_PER_VALUE
+        step = max_bytes // row_bytes if row_bytes else max(self._rows + [1])
+
+        msg = 'a single time step (%s bytes) exceeds "max_bytes"' % row_bytes
+        assert step > 0, msg
+
+        plans = []
+        for year in self.years:
+            time_index = self._time_index(year)
+
+            for i in range(0, len(time_index), step):
+                window = time_index[i:i + step]
+                plans.append(RequestPlan(
+                    self.params, self.region, year, resolution=self.resolution,
+                    sites=self.sites, start=window[0], end=window[-1],
+                    datasets=self._stored, chunk_rows=self.chunk_rows))
+
+        return plans
+
+    def _time_index(self, year):
+        """Returns the time steps of `year` that fall inside of the time window."""
+        import pandas as pd
+        from .requests import _time_slice
+
+        time_index = pd.date_range(str(year), str(year + 1), inclusive='left', tz='UTC',
+                                   freq=_TIME_STEPS[self.resolution])
+
+        return time_index[_time_slice(time_index, self.start, self.end)]
@@ -0,0 +1,255 @@
+"""
+Provides a local mirror of WIND Toolkit files, so that subsets of HSDS data which are
+used repeatedly can be read at local disk speed.
+
+Mirrored files are stored under the mirror directory with the same paths that
+`albatross.requests.build_wtk_filepath` produces, e.g.
+`<mirror>/nrel/wtk/conus/wtk_conus_2012.h5`, and contain a subset of the source gids
+and datasets. `request_wtk_point_data` reads from the mirror whenever it holds the
+requested point and datasets.
+"""
+
+import os
+
+import numpy as np
+
+from .cache import get_cache_dir
+
+MIRROR_ENV_VAR = 'ALBATROSS_MIRROR_DIR'
+
+# datasets describing the mirrored sites, rather than holding resource data
+_HEADER_DATASETS = ('meta', 'time_index', 'coordinates', 'source_gids')
+
+
+def get_mirror_dir():
+    """
+    Returns the root directory of the local mirror. This can be overridden with the
+    `ALBATROSS_MIRROR_DIR` environment variable.
+
+    Returns:
+      str: The mirror directory path.
+    """
+    return os.environ.get(MIRROR_ENV_VAR, os.path.join(get_cache_dir(), 'mirror'))
+
+
+def get_mirror_path(wtk_file, mirror_dir=None):
+    """
+    Returns the local mirror path of a WTK file.
+
+    Args:
+      wtk_file (str): HSDS file path (see `albatross.requests.build_wtk_filepath`)
+      mirror_dir (str, optional): mirror directory, by default `get_mirror_dir()`
+
+    Returns:
+      str: The `.h5` file path (which may not exist yet).
+    """
+    return os.path.join(mirror_dir or get_mirror_dir(), wtk_file.lstrip('/'))
+
+
+def mirror_wtk_data(region, years, params, gids=None, resolution=None, mirror_dir=None,
+                    overwrite=False):
+    """
+    Copies a subset of WIND Toolkit data from NREL HSDS into the local mirror.
+
+    Every dataset is copied one time chunk at a time, recording its progress as it goes,
+    so an interrupted mirror picks up where it left off when it is run again. Datasets
+    that are already mirrored are skipped, so more `params` can be added to a mirror
+    later on.
+
+    Args:
+        region (str): region to mirror (see `get_regions`)
+        years (:obj:`list` of :obj:`int`): years to mirror, e.g. `range(2007, 2015)`
+        params (:obj:`list` of :obj:`str`): A list of parameters to mirror. Heights
+          that are not stored (e.g. `windspeed_90m`) mirror the two stored heights they
+          are interpolated from
+        gids (:obj:`list` of :obj:`int`, optional): gids to mirror (see
+          `albatross.requests.identify_regions_many` and `read_wtk_box_data`), by
+          default every gid in the region
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        mirror_dir (:obj:`str`, optional): mirror directory, by default
+          `get_mirror_dir()`
+        overwrite (:obj:`bool`, optional): discard any existing mirror of these files
+          first, which is required to change the mirrored `gids`, by default False
+
+    Returns:
+        list: The local file paths, one per year.
+    """
+    from .requests import _check_params, _check_years, build_wtk_filepath
+    from .utils import get_catalog
+
+    _check_years(years)
+
+    _check_params(params)
+
+    paths = []
+
+    # validate every year before any requests are made
+    for wtk_file in [build_wtk_filepath(region, year, resolution) for year in years]:
+        path = get_mirror_path(wtk_file, mirror_dir)
+        _mirror_file(wtk_file, path, params, gids=gids, overwrite=overwrite,
+                     hsds=get_catalog()[region].hsds)
+        paths.append(path)
+
+    return paths
+
+
+def find_mirror(wtk_file, gid, params, mirror_dir=None):
+    """
+    Returns the mirror of `wtk_file` if it holds all of `params` for `gid`.
+
+    Args:
+      wtk_file (str): HSDS file path (see `albatross.requests.build_wtk_filepath`)
+      gid (int): gid of the site in the source file
+      params (:obj:`list` of :obj:`str`): parameters that will be read
+      mirror_dir (str, optional): mirror directory, by default `get_mirror_dir()`
+
+    Returns:
+      str: The local file path, or None if the mirror does not hold the data.
+    """
+    path = get_mirror_path(wtk_file, mirror_dir)
+
+    if not os.path.exists(path):
+        return None
+
+    import h5py
+    from .requests import _height_sources
+
+    try:
+        with h5py.File(path, 'r') as h:
+            if 'source_gids' not in h:
+                return None
+
+            gids = h['source_gids'][...]
+            i = np.searchsorted(gids, gid)
+
+            if i == len(gids) or gids[i] != gid:
+                return None
+
+            complete = _complete_datasets(h)
+            source = [name.decode() for name in h.attrs['source_datasets']]
+    except OSError:
+        return None
+
+    for param in params:
+        sources = _height_sources(param, source)
+
+        if not sources or any(dset not in complete for dset, _ in sources):
+            return None
+
+    return path
+
+
+def get_mirror_gids(path):
+    """
+    Returns the source gids of each site in a mirrored file.
+
+    Args:
+      path (str): The local file path.
+
+    Returns:
+      ndarray: The gids, in the order of the file's sites.
+    """
+    import h5py
+
+    with h5py.File(path, 'r') as h:
+        return h['source_gids'][...]
+
+
+def _mirror_file(wtk_file, path, params, gids=None, overwrite=False, hsds=True):
+    """Copies `params` for `gids` from `wtk_file` into the (new or partial) file `path`."""
+    import h5py
+    from rex import WindX
+
+    if overwrite and os.path.exists(path):
+        os.remove(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with WindX(wtk_file, hsds=hsds, unscale=False) as f, h5py.File(path, 'a') as h:
+        src = f.resource.h5
+        n_sites = src['meta'].shape[0]
+
+        if gids is None:
+            gids = np.arange(n_sites)
+        else:
+            gids = np.unique(np.asarray(gids, dtype=np.int64))
+
+            msg = 'gids must be between 0 and %s' % (n_sites - 1)
+            assert len(gids) and gids[0] >= 0 and gids[-1] < n_sites, msg
+
+        if 'source_gids' in h:
+            msg = 'mirror of %s holds different gids, use overwrite=True' % wtk_file
+            assert np.array_equal(h['source_gids'][...], gids), msg
+        else:
+            # a header left over from an interrupted mirror is rewritten from scratch
+            for name in list(h):
+                del h[name]
+
+            sites = slice(None) if len(gids) == n_sites else gids
+
+            h.attrs['source'] = wtk_file
+            h.attrs['source_datasets'] = np.array(sorted(f.datasets), dtype='S')
+            h.create_dataset('time_index', data=src['time_index'][...])
+            h.create_dataset('meta', data=src['meta'][sites])
+
+            if 'coordinates' in src:
+                h.create_dataset('coordinates', data=src['coordinates'][sites])
+
+            # written last, as it marks the header as complete
+            h.create_dataset('source_gids', data=gids)
+
+        for dset in _stored_datasets(f.datasets, params):
+            _mirror_dataset(f, h, dset, gids)
+
+
+def _mirror_dataset(f, h, dset, gids):
+    """Copies `dset` into `h` one time chunk at a time, resuming from any earlier run."""
+    n_time = h['time_index'].shape[0]
+
+    if dset not in h:
+        _, dtype, chunks = f.resource.get_dset_properties(dset)
+        chunks = chunks or (n_time, len(gids))
+        chunks = (min(chunks[0], n_time), min(chunks[1], len(gids)))
+
+        dst = h.create_dataset(dset, shape=(n_time, len(gids)), dtype=dtype, chunks=chunks)
+
+        for key, value in f.resource.h5[dset].attrs.items():
+            dst.attrs[key] = value
+
+        dst.attrs['mirrored_rows'] = 0
+
+    dst = h[dset]
+    step = dst.chunks[0]
+
+    for t0 in range(int(dst.attrs['mirrored_rows']), n_time, step):
+        t1 = min(t0 + step, n_time)
+        dst[t0:t1] = f[dset, t0:t1, gids].reshape(t1 - t0, -1)
+
+        # record progress, so an interrupted mirror resumes from here
+        dst.attrs['mirrored_rows'] = t1
+        h.flush()
+
+
+def _complete_datasets(h):
+    n_time = h['time_index'].shape[0]
+
+    return {
+        name for name in h
+        if name not in _HEADER_DATASETS and h[name].attrs.get('mirrored_rows') == n_time
+    }
+
+
+def _stored_datasets(datasets, params):
+    """Returns the stored datasets needed to read `params`, see `mirror_wtk_data`."""
+    from .requests import _height_sources
+
+    stored = []
+
+    for param in params:
+        sources = _height_sources(param, datasets)
+
+        assert sources, 'dataset not found: %s' % param
+
+        stored += [dset for dset, _ in sources if dset not in stored]
+
+    return stored
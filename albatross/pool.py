@@ -0,0 +1,179 @@
+"""
+Provides a pool of reusable WIND Toolkit resource handles.
+"""
+
+import contextlib
+import threading
+import time
+
+DEFAULT_MAX_SIZE = 16
+DEFAULT_IDLE_TIMEOUT = 300
+
+_DEFAULT_POOL = None
+
+
+def get_default_pool():
+    """
+    Returns the shared `HandlePool` instance used when requests are made with
+    `pool=True`.
+
+    Returns:
+      HandlePool: The default handle pool.
+    """
+    global _DEFAULT_POOL
+
+    if _DEFAULT_POOL is None:
+        _DEFAULT_POOL = HandlePool()
+
+    return _DEFAULT_POOL
+
+
+class HandlePool:
+    """
+    A pool of open `WindX` handles, keyed by file path and open arguments.
+
+    Opening a WTK file over HSDS means opening the domain, and each handle fetches the
+    metadata, time index and cKDTree lazily and then keeps them. Returning handles to
+    the pool lets back-to-back requests against the same file skip all of that.
+
+    A handle is checked out exclusively, so threads never share one; concurrent
+    requests for the same file open extra handles, which are pooled in turn. At most
+    `max_size` idle handles are kept open (least recently used are closed first), and
+    handles left idle for longer than `idle_timeout` seconds are closed, by a background
+    timer if the pool isn't used again.
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+          max_size (int, optional): Maximum number of idle handles to keep open.
+          idle_timeout (float, optional): Number of seconds an idle handle is kept
+            open for.
+        """
+        assert isinstance(max_size, int) and max_size > 0, '"max_size" must be a positive int'
+
+        msg = '"idle_timeout" must be a positive number'
+        assert isinstance(idle_timeout, (int, float)) and idle_timeout > 0, msg
+
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+
+        # (key, handle, last used) for each idle handle, least recently used first
+        self._idle = []
+        self._lock = threading.Lock()
+
+        # closes expired handles while the pool isn't in use, see `_schedule_reaper`
+        self._reaper = None
+
+    def __len__(self):
+        with self._lock:
+            expired = self._prune()
+
+        _close_all(expired)
+
+        return len(self._idle)
+
+    @contextlib.contextmanager
+    def handle(self, wtk_file, **kwargs):
+        """
+        Checks out an open `WindX` handle for `wtk_file`, opening one if none are idle.
+        The handle is returned to the pool on exit, unless an error was raised while it
+        was in use, in which case it is closed.
+
+        Args:
+          wtk_file (str): file path
+          kwargs (dict, optional): additional `WindX` parameters, e.g. `hsds=True`
+
+        Yields:
+          WindX: The open handle.
+        """
+        key = (wtk_file, tuple(sorted(kwargs.items())))
+        f = self._checkout(key)
+
+        if f is None:
+            from rex import WindX
+
+            f = WindX(wtk_file, **kwargs)
+
+        try:
+            yield f
+        except BaseException:
+            f.close()
+            raise
+
+        self._checkin(key, f)
+
+    def close(self):
+        """Closes every idle handle in the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+
+        for _, f, _ in idle:
+            f.close()
+
+    def _checkout(self, key):
+        with self._lock:
+            expired = self._prune()
+
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == key:
+                    f = self._idle.pop(i)[1]
+                    self.hits += 1
+                    break
+            else:
+                f = None
+                self.misses += 1
+
+        _close_all(expired)
+
+        return f
+
+    def _checkin(self, key, f):
+        with self._lock:
+            self._idle.append((key, f, time.monotonic()))
+            expired = self._prune()
+            self._schedule_reaper()
+
+        _close_all(expired)
+
+    def _schedule_reaper(self):
+        """
+        Starts a daemon timer to prune the pool when its least recently used handle
+        expires, unless one is already pending. Must be called with the lock held.
+        """
+        if self._reaper is not None or not self._idle:
+            return
+
+        delay = self._idle[0][2] + self.idle_timeout - time.monotonic()
+        self._reaper = threading.Timer(max(delay, 0) + 0.01, self._reap)
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def _reap(self):
+        with self._lock:
+            self._reaper = None
+            expired = self._prune()
+            self._schedule_reaper()
+
+        _close_all(expired)
+
+    def _prune(self):
+        """Removes (and returns) idle handles that have expired or exceed `max_size`."""
+        now = time.monotonic()
+        expired = [f for _, f, used in self._idle if now - used > self.idle_timeout]
+        self._idle = [entry for entry in self._idle if now - entry[2] <= self.idle_timeout]
+
+        while len(self._idle) > self.max_size:
+            expired.append(self._idle.pop(0)[1])
+
+        return expired
+
+
+def _close_all(handles):
+    for f in handles:
+        f.close()
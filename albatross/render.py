@@ -0,0 +1,144 @@
+"""
+Renders analysis plots for many sites at once, headless and in parallel.
+
+Each worker process draws with the Agg backend onto one reusable figure per plot, so
+no figures are ever registered with `matplotlib.pyplot`, and writes each plot straight
+to disk.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pandas import DataFrame
+
+PLOTS = ('boxplot', 'windrose', 'pdf', 'diurnal')
+"""Plots that can be rendered, see `render_plots`."""
+
+FORMATS = ('png', 'svg')
+
+# one reusable figure per plot, for each process
+_FIGURES = {}
+
+
+def render_plots(sites, out_dir, plots=PLOTS, fmt='png', max_workers=None, dpi=100,
+                 plot_kwargs=None):
+    """
+    Renders analysis plots for many sites, writing each one to
+    `<out_dir>/<site>_<plot>.<fmt>`.
+
+    Sites are rendered on a pool of `max_workers` processes, so report generation
+    scales with the number of cores. The plots are:
+
+    - `boxplot`: see `albatross.analysis.boxplot`
+    - `windrose`: see `albatross.analysis.plot_windrose`
+    - `pdf`: see `albatross.analysis.pdf`
+    - `diurnal`: see `albatross.analysis.plot_diurnal_stats`
+
+    Args:
+      sites (dict): site names mapped to their wind data `DataFrame`
+      out_dir (str): directory to write the plots to
+      plots (:obj:`list` of :obj:`str`, optional): plots to render for each site, by
+        default all of `PLOTS`
+      fmt (str, optional): image format, `'png'` or `'svg'`, by default `'png'`
+      max_workers (int, optional): number of processes, by default one per core. With
+        `max_workers=1`, sites are rendered in the calling process.
+      dpi (int, optional): resolution of the images, by default 100
+      plot_kwargs (dict, optional): additional parameters for each plot's function,
+        keyed by plot name, e.g. `{'windrose': {'speed': 'windspeed_100m'}}`
+
+    Returns:
+      dict: Site names mapped to a dict of plot names and their file paths.
+    """
+    assert isinstance(sites, dict), '"sites" must be a dict'
+    msg = '"sites" values must be DataFrames'
+    assert all([isinstance(data, DataFrame) for data in sites.values()]), msg
+
+    # site names become file names, which must stay inside `out_dir`
+    for name in sites:
+        msg = 'site name must be a file name, without path separators: %r' % (name,)
+        assert str(name) not in ('', '.', '..') and not any(
+            sep in str(name) for sep in (os.sep, os.altsep) if sep), msg
+
+    assert isinstance(plots, (list, tuple)), '"plots" must be a tuple or list'
+    for plot in plots:
+        assert plot in PLOTS, 'plot "%s" not found' % plot
+
+    assert fmt in FORMATS, '"fmt" must be one of %s' % (FORMATS,)
+
+    plot_kwargs = plot_kwargs or {}
+    assert isinstance(plot_kwargs, dict), '"plot_kwargs" must be a dict'
+
+    msg = '"max_workers" must be a positive int or None'
+    assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), msg
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    tasks = [
+        (name, data, out_dir, tuple(plots), fmt, dpi, plot_kwargs)
+        for name, data in sites.items()
+    ]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(tasks), 1))
+
+    if max_workers == 1:
+        return dict(map(_render_site, tasks))
+
+    # spawned workers never inherit an interactive backend from this process
+    context = multiprocessing.get_context('spawn')
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker) as executor:
+        return dict(executor.map(_render_site, tasks, chunksize=chunksize))
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use('Agg')
+
+
+def _render_site(task):
+    """Renders and saves every plot for one site, returning `(name, paths)`."""
+    from . import analysis
+
+    name, data, out_dir, plots, fmt, dpi, plot_kwargs = task
+    paths = {}
+
+    for plot in plots:
+        fig = _figure(plot)
+        kwargs = plot_kwargs.get(plot, {})
+
+        try:
+            if plot == 'windrose':
+                analysis.plot_windrose(data, fig=fig, **kwargs)
+            else:
+                draw = {
+                    'boxplot': analysis.boxplot,
+                    'pdf': analysis.pdf,
+                    'diurnal': analysis.plot_diurnal_stats,
+                }[plot]
+                draw(data, ax=fig.add_subplot(), **kwargs)
+
+            paths[plot] = os.path.join(out_dir, '%s_%s.%s' % (name, plot, fmt))
+            fig.savefig(paths[plot], format=fmt, dpi=dpi)
+        finally:
+            # free the artists, but keep the figure for the next site, even if this
+            # one failed
+            fig.clear()
+
+    return name, paths
+
+
+def _figure(plot):
+    """Returns this process' (empty) figure for `plot`, drawn with the Agg backend."""
+    if plot not in _FIGURES:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(8, 8) if plot == 'windrose' else None)
+        FigureCanvasAgg(fig)
+        _FIGURES[plot] = fig
+
+    return _FIGURES[plot]
@@ -1,8 +1,26 @@
 import json
-from rex import WindX
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
-from .utils import _load_wtk
+from .cache import (PointCache, get_coordinates_path, get_default_cache, get_tree_path,
+                    load_array, load_tree, save_array, save_tree)
+from .classes import RequestPlan
+from .mirror import find_mirror, get_mirror_dir, get_mirror_gids, get_mirror_path
+from .pool import HandlePool, get_default_pool
+from .utils import get_catalog
+
+MAX_YEAR_WORKERS = 8
+"""Default upper bound on the number of year files fetched at the same time."""
+
+DEFAULT_TIME_CHUNK = 8760
+"""Number of time steps read at once from datasets that are not chunked."""
 
 
 def _check_lat_lon(lat_lon):
@@ -13,6 +31,155 @@ def _check_lat_lon(lat_lon):
     assert len(lat_lon) == 2, 'lat_lon must have a length of 2'
 
 
+def _check_lat_lons(lat_lons):
+    """Validates an array of lat/lon points and returns it as an (N, 2) ndarray."""
+    msg = 'lat_lons must be a list, tuple or ndarray'
+    assert isinstance(lat_lons, (list, tuple, np.ndarray)), msg
+    assert len(lat_lons) != 0, 'lat_lons must not be empty'
+
+    msg = 'lat_lons must have a shape of (N, 2)'
+    if isinstance(lat_lons, np.ndarray):
+        assert lat_lons.ndim == 2 and lat_lons.shape[1] == 2, msg
+    else:
+        assert all([isinstance(x, (list, tuple)) and len(x) == 2 for x in lat_lons]), msg
+        lat_lons = np.array(lat_lons)
+
+    assert np.issubdtype(lat_lons.dtype, np.floating), 'lat/lon points must be floats'
+
+    return lat_lons
+
+
+def _check_bbox(bbox):
+    """Validates a bounding box of two lat/lon corners."""
+    msg = '"bbox" must be a pair of (lat, lon) corners'
+    assert isinstance(bbox, (list, tuple)) and len(bbox) == 2, msg
+
+    for lat_lon in bbox:
+        _check_lat_lon(lat_lon)
+
+
+def _check_years(years):
+    """Validates a collection of years."""
+    assert isinstance(years, (list, tuple, range)), '"years" must be a list, tuple or range'
+    assert len(years) != 0, '"years" must not be empty'
+
+
+def _check_cache(cache):
+    """Validates a `cache` argument, and returns the `PointCache` to use (if any)."""
+    msg = '"cache" must be a PointCache or bool'
+    assert cache is None or isinstance(cache, (bool, PointCache)), msg
+
+    if cache is True:
+        return get_default_cache()
+
+    return cache or None
+
+
+def _check_pool(pool):
+    """Validates a `pool` argument, and returns the `HandlePool` to use (if any)."""
+    msg = '"pool" must be a HandlePool or bool'
+    assert pool is None or isinstance(pool, (bool, HandlePool)), msg
+
+    if pool is True:
+        return get_default_pool()
+
+    # an empty `HandlePool` is falsy, so it is compared with False rather than tested
+    return None if pool is False else pool
+
+
+def _check_mirror(mirror):
+    """Validates a `mirror` argument, and returns the mirror directory to use (if any)."""
+    msg = '"mirror" must be a bool or a directory path'
+    assert mirror is None or isinstance(mirror, (bool, str)), msg
+
+    if mirror is True:
+        return get_mirror_dir()
+
+    return mirror or None
+
+
+def _open_wtk(wtk_file, pool=None, **kwargs):
+    """
+    Opens a `WindX` handle, checking one out of `pool` if given. rex (and h5py/h5pyd)
+    is only imported once a file is actually opened.
+    """
+    if pool is None:
+        from rex import WindX
+
+        return WindX(wtk_file, **kwargs)
+
+    return pool.handle(wtk_file, **kwargs)
+
+
+def _check_dtype(dtype, unscale=True):
+    """
+    Validates a `dtype` argument, and returns it as a `numpy.dtype` (if any). Integer
+    dtypes are only accepted for raw stored values, as unscaled values would be
+    truncated.
+    """
+    if dtype is None:
+        return None
+
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        dtype = None
+
+    assert dtype is not None and dtype.kind in 'iuf', '"dtype" must be a numeric dtype'
+
+    msg = 'an integer "dtype" requires keep_scaled=True (or unscale=False)'
+    assert not (unscale and dtype.kind in 'iu'), msg
+
+    return dtype
+
+
+def _check_time_window(start, end):
+    """Validates `start`/`end` arguments, and returns them as UTC timestamps."""
+    for name, value in (('start', start), ('end', end)):
+        msg = '"%s" must be a datetime or string' % name
+        assert value is None or isinstance(value, (str, datetime)), msg
+
+    start, end = _to_utc(start), _to_utc(end)
+
+    if start is not None and end is not None:
+        assert start <= end, '"start" must not be after "end"'
+
+    return start, end
+
+
+def _to_utc(value):
+    """Converts a datetime (or string) to a UTC timestamp, assuming UTC if naive."""
+    if value is None:
+        return None
+
+    value = pd.Timestamp(value)
+
+    return value.tz_localize('UTC') if value.tz is None else value.tz_convert('UTC')
+
+
+def _time_slice(time_index, start=None, end=None):
+    """Converts a UTC `start`/`end` window into a slice of `time_index` (inclusive)."""
+    if start is None and end is None:
+        return slice(None)
+
+    if time_index.tz is None:
+        start = None if start is None else start.tz_localize(None)
+        end = None if end is None else end.tz_localize(None)
+
+    i = 0 if start is None else int(time_index.searchsorted(start, side='left'))
+    j = len(time_index) if end is None else int(time_index.searchsorted(end, side='right'))
+
+    return slice(i, j)
+
+
+def _check_params(params):
+    """Validates request params."""
+    assert isinstance(params, (list, tuple)), '"params" must be a tuple or list'
+    assert len(params) != 0, '"params" must not be empty'
+    err_msg = '"params" elements must be strings'
+    assert all([isinstance(x, str) for x in params]), err_msg
+
+
 def identify_regions(lat_lon, coordinates=False):
     """
     Returns the region associated with the given lat/lon point.
@@ -21,7 +188,8 @@ def identify_regions(lat_lon, coordinates=False):
         lat_lon (:obj:`list` of :obj:`float`): latitude/longitude point to
           access
         coordinates (bool): optionally include a list of all registered
-          coordinates for the region (requires HSDS API calls)
+          coordinates for the region. These are downloaded from HSDS once, and are
+          then memory-mapped from the local cache (see `build_wtk_coordinates`)
 
     Returns:
         list: list of region names (`coordinates=False`)
@@ -29,29 +197,47 @@ def identify_regions(lat_lon, coordinates=False):
     """
     _check_lat_lon(lat_lon)
 
-    wtk = _load_wtk()
-    lat, lon = lat_lon
+    catalog = get_catalog()
+    membership = _region_membership(np.array([lat_lon]))[0]
+    regions = [name for name, inside in zip(catalog.names, membership) if inside]
 
-    regions = []
+    if len(regions) == 0:
+        raise ValueError('No region found for specified lat/lon point.')
 
-    for region in wtk:
-        lat_range, lon_range = wtk[region]['lat_lon_range']
+    if coordinates:
+        return [{region: load_array(build_wtk_coordinates(region))} for region in regions]
 
-        if lat >= lat_range[0] and lat <= lat_range[1]:
-            if lon >= lon_range[0] and lon <= lon_range[1]:
-                if coordinates:
-                    # grab coordinates from most recent year
-                    wtk_file = build_wtk_filepath(region, wtk[region]['year_range'][1])
+    return regions
 
-                    with WindX(wtk_file, hsds=True) as f:
-                        regions.append({region: f.coordinates})
-                else:
-                    regions.append(region)
 
-    if len(regions) == 0:
-        raise ValueError('No region found for specified lat/lon point.')
+def identify_regions_many(lat_lons):
+    """
+    Returns the regions associated with each of the given lat/lon points, in a single
+    vectorized pass.
 
-    return regions
+    Args:
+        lat_lons (:obj:`ndarray` or :obj:`list` of :obj:`tuple`): an (N, 2) array of
+          latitude/longitude points
+
+    Returns:
+        DataFrame: An (N, regions) boolean `DataFrame`, with one column per region (see
+        `get_regions`) that is True where the point is inside of that region.
+    """
+    lat_lons = _check_lat_lons(lat_lons)
+
+    return pd.DataFrame(_region_membership(lat_lons), columns=list(get_catalog().names))
+
+
+def _region_membership(lat_lons):
+    """Returns an (N, regions) boolean array of which regions contain each point."""
+    bounds = get_catalog().bounds
+
+    lat, lon = lat_lons[:, :1], lat_lons[:, 1:]
+
+    return (
+        (lat >= bounds[:, 0]) & (lat <= bounds[:, 1]) &
+        (lon >= bounds[:, 2]) & (lon <= bounds[:, 3])
+    )
 
 
 def build_wtk_filepath(region, year, resolution=None):
@@ -67,39 +253,99 @@ def build_wtk_filepath(region, year, resolution=None):
     Returns:
         str: The filepath for the requested resource.
     """
-    wtk = _load_wtk()
-    base_url = '/nrel/wtk/'
+    catalog = get_catalog()
 
-    assert region in wtk, 'region not found: %s' % region
+    assert region in catalog, 'region not found: %s' % region
 
-    year_range = wtk[region]['year_range']
-    year_range = range(year_range[0], year_range[1]+1)
+    info = catalog[region]
     assert isinstance(year, int), '"year" must be an integer'
     msg = 'year %s not available for region: %s' % (year, region)
-    assert year in year_range, msg
+    assert year in info.years, msg
 
     if resolution:
         msg = 'resolution "%s" not available for region: %s' % (
             resolution, region)
-        assert resolution in wtk[region]['resolutions'], msg
-
-    base = wtk[region].get('base')
+        assert resolution in info.resolutions, msg
 
     if resolution == '5min':
         url_region = '%s-%s/' % (region, resolution)
     else:
         url_region = region + '/'
 
-    if base:
-        file = '%s_%s.h5' % (base, year)
-    else:
-        file = 'wtk_%s_%s.h5' % (region, year)
+    return '%s%s%s_%s.h5' % (info.root, url_region, info.base, year)
+
+
+def build_wtk_coordinates(region, resolution=None, overwrite=False):
+    """
+    Downloads the lat/lon coordinates for a region/resolution, and stores them as a
+    `.npy` file in the local cache directory (see `albatross.cache.get_cache_dir`).
+    Every year of a region shares the same coordinates, so they are only downloaded
+    once, and can then be memory-mapped with `albatross.cache.load_array`.
+
+    Args:
+        region (str): region to download the coordinates of (see `get_regions`)
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        overwrite (:obj:`bool`, optional): download the coordinates even if they are
+          already cached, by default False
+
+    Returns:
+        str: Path to the .npy file containing an (N, 2) array of lat/lon coordinates.
+    """
+    catalog = get_catalog()
+
+    assert region in catalog, 'region not found: %s' % region
+
+    # grab coordinates from most recent year
+    wtk_file = build_wtk_filepath(region, catalog[region].years[-1], resolution)
+    path = get_coordinates_path(_cache_name(region, resolution))
+
+    if overwrite or not os.path.exists(path):
+        with _open_wtk(wtk_file, hsds=catalog[region].hsds) as f:
+            save_array(f.lat_lon, path)
+
+    return path
+
+
+def _cache_name(region, resolution=None):
+    """Returns the name used for cached region/resolution files, e.g. `'conus-5min'`."""
+    return '%s-%s' % (region, resolution) if resolution == '5min' else region
+
 
-    return base_url + url_region + file
+def build_wtk_tree(region, resolution=None, overwrite=False):
+    """
+    Builds a cKDTree of the lat/lon coordinates for a region/resolution (see
+    `build_wtk_coordinates`), and stores it in the local cache directory (see
+    `albatross.cache.get_cache_dir`). Every year of a region shares the same
+    coordinates, so the tree is only built once, and is then used by default by
+    `request_wtk_point_data` and `request_wtk_multi_point_data`.
+
+    Args:
+        region (str): region to build the tree for (see `get_regions`)
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        overwrite (:obj:`bool`, optional): rebuild the tree even if it is already
+          cached, by default False
+
+    Returns:
+        str: Path to the .pkl file containing the tree, which may be passed as `tree`
+        to any of the read/request functions.
+    """
+    assert region in get_catalog(), 'region not found: %s' % region
+
+    tree_path = get_tree_path(_cache_name(region, resolution))
+
+    if overwrite or not os.path.exists(tree_path):
+        from scipy.spatial import cKDTree
+
+        coordinates = load_array(build_wtk_coordinates(region, resolution, overwrite))
+
+        save_tree(cKDTree(coordinates), tree_path)
+
+    return tree_path
 
 
 def read_wtk_point_data(wtk_file, lat_lon, params, tree=None, unscale=True,
-                        str_decode=True, group=None):
+                        str_decode=True, group=None, cache=None, start=None, end=None,
+                        dtype=None, keep_scaled=False):
     """
     Reads WIND Toolkit data directly from a file.
 
@@ -119,6 +365,22 @@ def read_wtk_point_data(wtk_file, lat_lon, params, tree=None, unscale=True,
           speed up the meta data read. by default True
         group (:obj:`str`, optional): Group within .h5 resource file to open,
           by default None
+        cache (:obj:`PointCache` or :obj:`bool`, optional): persistent cache to serve
+          repeated reads from. `True` uses the shared default cache (see
+          `albatross.cache.get_default_cache`), by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+        dtype (:obj:`str` or :obj:`numpy.dtype`, optional): dtype of the returned
+          columns, e.g. `'float32'` to halve memory use, which may only be an integer
+          dtype for raw values. By default, float64 when unscaling, or the stored dtype
+          otherwise
+        keep_scaled (:obj:`bool`, optional): return the raw stored (e.g. int16)
+          values rather than unscaling them, with the factor each column must be
+          divided by to unscale it in `data.attrs['scale_factors']`. The
+          `albatross.analysis` functions unscale these columns automatically, by
+          default False
 
     Returns:
         tuple: A tuple `(data, metadata)` consisting of a `DataFrame` and associated
@@ -126,51 +388,54 @@ def read_wtk_point_data(wtk_file, lat_lon, params, tree=None, unscale=True,
     """
     _check_lat_lon(lat_lon)
 
-    assert isinstance(params, (list, tuple)), '"params" must be a tuple or list'
-    assert len(params) != 0, '"params" must not be empty'
-    err_msg = '"params" elements must be strings'
-    assert all([isinstance(x, str) for x in params]), err_msg
+    _check_params(params)
+
+    cache = _check_cache(cache)
+    dtype = _check_dtype(dtype, unscale and not keep_scaled)
+    start, end = _check_time_window(start, end)
 
     kwargs = {
-        'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
+        'tree': tree, 'unscale': unscale and not keep_scaled, 'str_decode': str_decode,
         'group': group, 'hsds': False
     }
 
-    results = []
-
-    with WindX(wtk_file, **kwargs) as f:
-        for param in params:
-            meta = f.meta
-            res = f.get_lat_lon_df(param, lat_lon)
-            col = res.columns[0]
-            res.rename(columns={col: param}, inplace=True)
-            results.append(res)
-
-    data = pd.concat(results, axis=1)
-
-    return (data, meta)
+    return _read_point_data(wtk_file, lat_lon, params, cache=cache, start=start, end=end,
+                            dtype=dtype, keep_scaled=keep_scaled, **kwargs)
 
 
 def request_wtk_point_data(lat_lon, year, params, region=None, resolution=None,
                            tree=None, unscale=True, str_decode=True,
-                           group=None):
+                           group=None, years=None, max_workers=None, cache=None,
+                           start=None, end=None, pool=None, dtype=None, keep_scaled=False,
+                           mirror=True, dry_run=False):
     """
     Requests WIND Toolkit data from NREL HSDS for a given lat/lon point. If a
     `region` is not specified, it will attempt to infer one using `identify_regions`.
     However, if multiple regions are identified for the `lat_lon` provided, it will
     raise an error, prompting the user to explicitly provide one.
 
+    Multiple years can be requested by passing `year=None` along with `years`. Each
+    year's file is fetched concurrently on a bounded thread pool, and the results are
+    joined into one continuous time-indexed `DataFrame`. Years that fall entirely
+    outside of the `start`/`end` window are skipped.
+
+    Years that have been mirrored locally (see `albatross.mirror.mirror_wtk_data`) are
+    read from the mirror instead of HSDS, as long as it holds the requested point and
+    `params`. The metadata of a mirrored year only covers the mirrored sites.
+
     Args:
         lat_lon (:obj:`list` of :obj:`float`): latitude/longitude point to
           access
-        year (int): year to be accessed (see `get_regions`)
+        year (int): year to be accessed (see `get_regions`), or None if `years` is
+          provided
         params (:obj:`list` of :obj:`str`): A list of parameters to include in
           the dataset
         region (str, optional): region in which the lat/lon point is located (see
           `get_regions`)
         resolution (:obj:`str`, optional): data resolution (see `get_regions`)
         tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
-          pre-computed tree of lat, lon coordinates, by default None
+          pre-computed tree of lat, lon coordinates. By default, the region's cached
+          tree is used (see `build_wtk_tree`)
         unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
           variables on extraction, by default True
         str_decode (:obj:`bool`, optional): Boolean flag to decode the
@@ -178,28 +443,970 @@ def request_wtk_point_data(lat_lon, year, params, region=None, resolution=None,
           speed up the meta data read. by default True
         group (:obj:`str`, optional): Group within .h5 resource file to open,
           by default None
+        years (:obj:`list` of :obj:`int`, optional): years to be accessed, e.g.
+          `range(2007, 2015)`, instead of a single `year`
+        max_workers (:obj:`int`, optional): maximum number of year files fetched at
+          the same time, by default `MAX_YEAR_WORKERS`
+        cache (:obj:`PointCache` or :obj:`bool`, optional): persistent cache to serve
+          repeated reads from. `True` uses the shared default cache (see
+          `albatross.cache.get_default_cache`), by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+        pool (:obj:`HandlePool` or :obj:`bool`, optional): pool of open file handles to
+          reuse between requests. `True` uses the shared default pool (see
+          `albatross.pool.get_default_pool`), by default None
+        dtype (:obj:`str` or :obj:`numpy.dtype`, optional): dtype of the returned
+          columns, e.g. `'float32'` to halve memory use, which may only be an integer
+          dtype for raw values. By default, float64 when unscaling, or the stored dtype
+          otherwise
+        keep_scaled (:obj:`bool`, optional): return the raw stored (e.g. int16)
+          values rather than unscaling them, with the factor each column must be
+          divided by to unscale it in `data.attrs['scale_factors']`. The
+          `albatross.analysis` functions unscale these columns automatically, by
+          default False
+        mirror (:obj:`bool` or :obj:`str`, optional): read from the local mirror
+          where it holds the requested data. `True` uses the default mirror directory
+          (see `albatross.mirror.get_mirror_dir`), a path uses that directory, and
+          `False` always reads from HSDS, by default True
+        dry_run (:obj:`bool`, optional): return the `albatross.RequestPlan` of the
+          request instead of reading anything, by default False
 
     Returns:
         tuple: A tuple `(data, metadata)` consisting of a `DataFrame` and associated
-        metadata.
+        metadata, or a `RequestPlan` if `dry_run` is True.
     """
     _check_lat_lon(lat_lon)
 
-    assert isinstance(params, (list, tuple)), '"params" must be a tuple or list'
-    assert len(params) != 0, '"params" must not be empty'
-    err_msg = '"params" elements must be strings'
-    assert all([isinstance(x, str) for x in params]), err_msg
+    _check_params(params)
+
+    msg = 'exactly one of "year" or "years" must be provided'
+    assert (year is None) != (years is None), msg
+
+    cache = _check_cache(cache)
+    pool = _check_pool(pool)
+    dtype = _check_dtype(dtype, unscale and not keep_scaled)
+    mirror = _check_mirror(mirror)
+    start, end = _check_time_window(start, end)
+
+    if years is not None:
+        years = _filter_years(years, start, end)
+
+    region = region or _infer_region(lat_lon)
+
+    # validate every year before any requests are made
+    wtk_files = [
+        build_wtk_filepath(region, y, resolution) for y in ([year] if years is None else years)
+    ]
+
+    if dry_run:
+        return RequestPlan(params, region, [year] if years is None else years,
+                           resolution=resolution, start=start, end=end)
+
+    if tree is None:
+        tree = build_wtk_tree(region, resolution)
+
+    # pass a loaded tree, which `load_tree` only unpickles once per process (pooled
+    # handles keep the tree they loaded, and are keyed by its path)
+    if isinstance(tree, str) and pool is None:
+        tree = load_tree(tree)
+
+    kwargs = {
+        'tree': tree, 'unscale': unscale and not keep_scaled, 'str_decode': str_decode,
+        'group': group, 'hsds': get_catalog()[region].hsds, 'cache': cache, 'start': start,
+        'end': end, 'pool': pool, 'dtype': dtype, 'keep_scaled': keep_scaled
+    }
+
+    mirrors = {}
+    if mirror is not None and group is None:
+        mirrors = _find_mirrors(wtk_files, lat_lon, params, tree, mirror)
+
+    def read(wtk_file):
+        if wtk_file in mirrors:
+            return _read_mirror_point_data(*mirrors[wtk_file], lat_lon, params, **kwargs)
+
+        return _read_point_data(wtk_file, lat_lon, params, **kwargs)
+
+    if years is None:
+        return read(wtk_files[0])
+
+    return _read_years(read, wtk_files, max_workers=max_workers)
+
+
+def _find_mirrors(wtk_files, lat_lon, params, tree, mirror_dir):
+    """
+    Returns a dict of the `wtk_files` that have a local mirror holding `params` for the
+    site nearest to `lat_lon`, mapped to `(mirror path, source gid)`.
+    """
+    candidates = [
+        wtk_file for wtk_file in wtk_files
+        if os.path.exists(get_mirror_path(wtk_file, mirror_dir))
+    ]
+
+    if not candidates:
+        return {}
+
+    # the gid in the source files, which the mirror may only hold a subset of
+    tree = load_tree(tree) if isinstance(tree, str) else tree
+    gid = int(tree.query(lat_lon)[1])
+
+    mirrors = {wtk_file: find_mirror(wtk_file, gid, params, mirror_dir) for wtk_file in candidates}
+
+    return {wtk_file: (path, gid) for wtk_file, path in mirrors.items() if path}
+
+
+def _read_mirror_point_data(mirror_file, gid, lat_lon, params, **kwargs):
+    """
+    Reads `params` for the source site `gid` from a local mirror file, through the same
+    path as `read_wtk_point_data`. The metadata is labelled with the source gids.
+
+    The site's row is looked up in the mirror's source gids, rather than with a tree of
+    the mirror's coordinates (rex caches trees by file name, which mirrors of different
+    years, and their source files, share).
+    """
+    gids = get_mirror_gids(mirror_file)
+    row = int(np.searchsorted(gids, gid))
+
+    msg = 'gid %s not found in mirror: %s' % (gid, mirror_file)
+    assert row < len(gids) and gids[row] == gid, msg
+
+    kwargs.update({'tree': None, 'hsds': False, 'cache': None})
+
+    data, meta = _read_point_data(mirror_file, lat_lon, params, gid=row, **kwargs)
+    meta = meta.set_axis(pd.Index(gids, name='gid'))
+
+    return (data, meta)
+
+
+def _filter_years(years, start=None, end=None):
+    """Validates `years`, dropping any that fall outside of the `start`/`end` window."""
+    _check_years(years)
+
+    years = [
+        y for y in years
+        if (start is None or y >= start.year) and (end is None or y <= end.year)
+    ]
+
+    assert years, 'none of "years" fall between "start" and "end"'
+
+    return years
+
+
+def _infer_region(lat_lon):
+    """Returns the only region containing `lat_lon`, see `identify_regions`."""
+    regions = identify_regions(lat_lon)
+
+    err_msg = (
+        'Multiple regions identified for the given lat/lon point: %s.\n'
+        'Please specify one using the `region` arg.'
+    ) % regions
+
+    if len(regions) > 1:
+        print(err_msg)
+
+    assert len(regions) == 1, err_msg
+
+    return regions[0]
+
+
+def _read_point_data(wtk_file, lat_lon, params, cache=None, start=None, end=None,
+                     pool=None, dtype=None, keep_scaled=False, gid=None, **kwargs):
+    """
+    Reads `params` for a single lat/lon point from a WTK file, limited to the rows
+    between `start` and `end`. If `gid` is given, that site is read rather than the one
+    nearest to `lat_lon`.
+    """
+    if cache is not None:
+        return _read_cached_point_data(wtk_file, lat_lon, params, cache, start=start,
+                                       end=end, pool=pool, dtype=dtype,
+                                       keep_scaled=keep_scaled, gid=gid, **kwargs)
+
+    with _open_wtk(wtk_file, pool, **kwargs) as f:
+        if gid is None:
+            gid = f.lat_lon_gid(lat_lon)
+
+        # a pooled handle keeps its meta, which callers must not be able to modify
+        meta = f.meta if pool is None else f.meta.copy()
+
+        time_index = f.time_index
+        time_slice = _time_slice(time_index, start, end)
+
+        data = _read_point_block(f, gid, params, time_index, time_slice,
+                                 unscale=kwargs.get('unscale', True), dtype=dtype)
+
+        if keep_scaled:
+            data.attrs['scale_factors'] = _scale_factors(f, params)
+
+    return (data, meta)
+
+
+def _read_point_block(f, gid, params, time_index, time_slice, unscale=True, dtype=None):
+    """
+    Reads the `time_slice` rows of `params` for a single gid from an open `WindX`
+    handle into a `DataFrame`, with a `dtype` (by default, see `_block_dtype`).
+    """
+    time_index = pd.Index(time_index[time_slice], name='time_index')
+
+    if dtype is None and not unscale:
+        # keep each raw column in its own stored dtype, e.g. int16
+        data = _read_columns(f, params, time_slice, gid, unscale)
+
+        return pd.DataFrame(data, index=time_index, columns=list(params))
+
+    if dtype is None:
+        dtype = _block_dtype(f, params, unscale)
+
+    # (param, time) layout, so that every dataset is written contiguously and the
+    # transposed block can be handed to pandas without a copy
+    block = np.empty((len(params), len(time_index)), dtype=dtype)
+
+    if len(time_index):
+        # write each column as it is read, rather than holding them all at once
+        for i, (_, values) in enumerate(_iter_columns(f, params, time_slice, gid, unscale)):
+            block[i] = values
+
+    return pd.DataFrame(block.T, index=time_index, columns=list(params), copy=False)
+
+
+def _parse_height(param):
+    """Splits a param into its variable and height, e.g. `('windspeed', 87)`, or None."""
+    match = re.match(r'^(.+)_(\d+)m$', param)
+
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+def _height_sources(param, datasets):
+    """
+    Returns the stored `(dataset, height)` pairs to read `param` from: only itself if it
+    is stored, or else the two stored heights of its variable nearest to it, which
+    bracket it where possible. Returns None if `param` is not a height of a variable
+    with at least two stored heights.
+    """
+    if param in datasets:
+        return [(param, None)]
+
+    parsed = _parse_height(param)
+
+    if parsed is None:
+        return None
+
+    var, height = parsed
+    heights = _stored_heights(var, datasets)
+
+    below = [h for h in heights if h < height]
+    above = [h for h in heights if h > height]
+
+    # one stored height can't be interpolated or extrapolated from
+    if len(heights) < 2:
+        return None
+
+    if below and above:
+        nearest = [below[-1], above[0]]
+    else:
+        nearest = below[-2:] or above[:2]
+
+    return [('%s_%sm' % (var, h), h) for h in nearest]
+
+
+def _stored_heights(var, datasets):
+    """Returns the sorted heights of `var` among `datasets`."""
+    return sorted(h for v, h in filter(None, map(_parse_height, datasets)) if v == var)
+
+
+def _read_columns(f, params, time_slice, gids, unscale=True):
+    """
+    Reads `params` from an open `WindX` handle into a dict of arrays (see
+    `_iter_columns`).
+    """
+    return dict(_iter_columns(f, params, time_slice, gids, unscale))
+
+
+def _iter_columns(f, params, time_slice, gids, unscale=True):
+    """
+    Reads `params` from an open `WindX` handle, yielding a `(param, values)` pair for
+    each in turn. Heights that are not stored are interpolated from the two nearest
+    stored heights (see `_interpolate_height`). Each stored dataset is only read once,
+    however many params need it, and is only held until the last of them is yielded.
+    """
+    sources = {param: _height_sources(param, f.datasets) for param in params}
+
+    # how many params still need each stored dataset
+    pending = {}
+    for pairs in sources.values():
+        for dset, _ in pairs or []:
+            pending[dset] = pending.get(dset, 0) + 1
+
+    stored = {}
+
+    def read(dset):
+        if dset not in stored:
+            stored[dset] = f[dset, time_slice, gids]
+
+        values = stored[dset]
+        pending[dset] -= 1
+
+        if not pending[dset]:
+            del stored[dset]
+
+        return values
+
+    for param, pairs in sources.items():
+        if pairs is None:
+            parsed = _parse_height(param)
+
+            if parsed is not None:
+                msg = 'unable to interpolate %s: only one height of %s is stored' % (
+                    param, parsed[0])
+                assert not _stored_heights(parsed[0], f.datasets), msg
+
+            # leave anything else (e.g. an unknown param) to rex
+            yield param, f[param, time_slice, gids]
+        elif len(pairs) == 1:
+            yield param, read(pairs[0][0])
+        else:
+            (dset_1, h_1), (dset_2, h_2) = pairs
+            factor = 1.0 if unscale else float(f.resource.get_scale_factor(dset_1))
+
+            # interpolate unscaled values, so that e.g. angles wrap correctly
+            yield param, factor * _interpolate_height(
+                _parse_height(param)[0], read(dset_1) / factor, h_1,
+                read(dset_2) / factor, h_2, _parse_height(param)[1])
+
+
+def _interpolate_height(var, ts_1, h_1, ts_2, h_2, h):
+    """
+    Interpolates (or extrapolates) the values of `var` at two heights, `h_1 < h_2`, to
+    height `h`, one value at a time:
+
+    - wind speed follows a power law, with a shear exponent from the two heights (which
+      is limited to 0.06-0.6 when extrapolating from the nearer height)
+    - pressure decays exponentially with height
+    - wind direction is interpolated along the shortest arc
+    - anything else is interpolated linearly
+    """
+    weight = (h - h_1) / (h_2 - h_1)
+
+    if var == 'windspeed':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = np.log(np.maximum(ts_2, 1e-3) / np.maximum(ts_1, 1e-3)) / np.log(h_2 / h_1)
+
+        if not h_1 <= h <= h_2:
+            alpha = np.clip(alpha, 0.06, 0.6)
+
+        # extrapolate from the nearer height, so a limited exponent stays continuous
+        if h > h_2:
+            return np.maximum(ts_2, 1e-3) * (h / h_2) ** alpha
+
+        return np.maximum(ts_1, 1e-3) * (h / h_1) ** alpha
+
+    if var == 'pressure':
+        return ts_1 * (ts_2 / ts_1) ** weight
+
+    if var == 'winddirection':
+        diff = (ts_2 - ts_1 + 180) % 360 - 180
+
+        return (ts_1 + diff * weight) % 360
+
+    return ts_1 + (ts_2 - ts_1) * weight
+
+
+def _block_dtype(f, params, unscale=True):
+    """
+    Returns the dtype of a preallocated block that holds every one of `params`.
+    Unscaled and interpolated values are floats, which float64 holds exactly.
+    """
+    if unscale or any(param not in f.datasets for param in params):
+        return np.float64
+
+    return np.result_type(*[f.resource.get_dset_properties(param)[1] for param in params])
+
+
+def _scale_factors(f, params):
+    """
+    Returns the factor that the raw values of each of `params` are divided by when
+    unscaling. Heights that are not stored are interpolated from the raw values of the
+    same variable, so share its scale factor.
+    """
+    factors = {}
+
+    for param in params:
+        sources = _height_sources(param, f.datasets)
+        factors[param] = float(f.resource.get_scale_factor(sources[0][0])) if sources else 1.0
+
+    return factors
+
+
+def _read_cached_point_data(wtk_file, lat_lon, params, cache, start=None, end=None,
+                            pool=None, dtype=None, keep_scaled=False, gid=None, **kwargs):
+    """
+    Reads `params` for a single lat/lon point (or the site `gid`) through a
+    `PointCache`. The file is only opened if the gid, meta, time index or one of the
+    datasets is missing from the cache.
+    """
+    group = kwargs.get('group')
+    source = '%s:%s' % (wtk_file, group) if group else wtk_file
+    unscale = kwargs.get('unscale', True)
+    str_decode = kwargs.get('str_decode', True)
+
+    with ExitStack() as stack:
+        handles = []
+
+        def windx():
+            if not handles:
+                handles.append(stack.enter_context(_open_wtk(wtk_file, pool, **kwargs)))
+
+            return handles[0]
+
+        def cached(key, read):
+            data = cache.get(key)
+
+            if data is None:
+                data = read()
+                cache.put(key, data)
+
+            return data
+
+        if gid is None:
+            gid = cached(cache.make_key(source, tuple(lat_lon), 'gid'),
+                         lambda: pd.DataFrame({'gid': [windx().lat_lon_gid(lat_lon)]}))
+            gid = int(gid['gid'][0])
+
+        meta = cached(cache.make_key(source, None, 'meta', None, str_decode),
+                      lambda: windx().meta)
+
+        time_index = cached(
+            cache.make_key(source, None, 'time_index'),
+            lambda: pd.DataFrame(index=pd.Index(windx().time_index, name='time_index'))
+        ).index
+
+        time_slice = _time_slice(time_index, start, end)
+        time_index = time_index[time_slice]
+        window = (time_slice.start, time_slice.stop)
+
+        results = [
+            cached(cache.make_key(source, gid, param, window, unscale),
+                   lambda: pd.DataFrame(_read_columns(windx(), [param], time_slice, gid,
+                                                      unscale)))
+            for param in params
+        ]
+
+        if keep_scaled:
+            factors = cached(
+                cache.make_key(source, None, 'scale_factors', tuple(params)),
+                lambda: pd.DataFrame(_scale_factors(windx(), params), index=[0]))
+
+    data = pd.concat(results, axis=1)
+    data.index = time_index
+
+    if dtype is not None:
+        data = data.astype(dtype)
+
+    if keep_scaled:
+        data.attrs['scale_factors'] = {
+            param: float(factors[param][0]) for param in params
+        }
+
+    return (data, meta)
+
+
+def _read_years(read, wtk_files, max_workers=None):
+    """
+    Calls `read` for each of the (single year) `wtk_files` on a bounded thread pool, and
+    joins the resulting `(data, meta)` tuples along the time axis. WTK coordinates are
+    shared between years, so the metadata of the first file is returned.
+    """
+    max_workers = min(len(wtk_files), max_workers or MAX_YEAR_WORKERS)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(read, wtk_files))
+
+    data = pd.concat([data for data, _ in results])
+    data.sort_index(inplace=True)
+
+    return (data, results[0][1])
+
+
+def iter_wtk_point_data(lat_lon, year, params, region=None, resolution=None, tree=None,
+                        unscale=True, str_decode=True, group=None, years=None,
+                        start=None, end=None, freq='MS', pool=None):
+    """
+    Requests WIND Toolkit data from NREL HSDS for a given lat/lon point, one chunk of
+    time at a time (by default, one month). Chunks are yielded in time order as soon as
+    they arrive, while the next chunk is read in the background, so analysis can start
+    immediately and memory use is bounded by the chunk size rather than the length of
+    the record.
+
+    Args:
+        lat_lon (:obj:`list` of :obj:`float`): latitude/longitude point to
+          access
+        year (int): year to be accessed (see `get_regions`), or None if `years` is
+          provided
+        params (:obj:`list` of :obj:`str`): A list of parameters to include in
+          the dataset
+        region (str, optional): region in which the lat/lon point is located (see
+          `get_regions`)
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
+          pre-computed tree of lat, lon coordinates. By default, the region's cached
+          tree is used (see `build_wtk_tree`)
+        unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
+          variables on extraction, by default True
+        str_decode (:obj:`bool`, optional): Boolean flag to decode the
+          bytestring meta data into normal strings. Setting this to False will
+          speed up the meta data read. by default True
+        group (:obj:`str`, optional): Group within .h5 resource file to open,
+          by default None
+        years (:obj:`list` of :obj:`int`, optional): years to be accessed, e.g.
+          `range(2007, 2015)`, instead of a single `year`
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+        freq (:obj:`str`, optional): pandas frequency string marking the start of
+          each chunk, by default `'MS'` (month start)
+        pool (:obj:`HandlePool` or :obj:`bool`, optional): pool of open file handles to
+          reuse between requests. `True` uses the shared default pool (see
+          `albatross.pool.get_default_pool`), by default None
+
+    Returns:
+        generator: Yields a tuple `(data, metadata)` consisting of a `DataFrame` for one
+        chunk of time and the associated metadata. The arguments are validated (and the
+        tree is loaded) when this is called, rather than when the first chunk is read.
+    """
+    _check_lat_lon(lat_lon)
+
+    _check_params(params)
+
+    msg = 'exactly one of "year" or "years" must be provided'
+    assert (year is None) != (years is None), msg
+
+    assert isinstance(freq, str), '"freq" must be a string'
+
+    pool = _check_pool(pool)
+    start, end = _check_time_window(start, end)
+
+    if years is not None:
+        years = _filter_years(years, start, end)
+
+    region = region or _infer_region(lat_lon)
+
+    # validate every year before any requests are made
+    wtk_files = [
+        build_wtk_filepath(region, y, resolution) for y in ([year] if years is None else years)
+    ]
+
+    if tree is None:
+        tree = build_wtk_tree(region, resolution)
+
+    # share one loaded tree between every year, which `load_tree` only unpickles once
+    # per process
+    if isinstance(tree, str) and pool is None:
+        tree = load_tree(tree)
+
+    kwargs = {
+        'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
+        'group': group, 'hsds': get_catalog()[region].hsds
+    }
+
+    return _iter_point_data(wtk_files, lat_lon, params, start=start, end=end, freq=freq,
+                            pool=pool, **kwargs)
+
+
+def _iter_point_data(wtk_files, lat_lon, params, start=None, end=None, freq='MS',
+                     pool=None, **kwargs):
+    """
+    Yields `(data, meta)` chunks of `params` for a single lat/lon point from each of
+    `wtk_files` in turn, reading the next chunk on a background thread while the
+    current one is being consumed.
+    """
+    tasks = _point_chunk_tasks(wtk_files, lat_lon, params, start=start, end=end,
+                               freq=freq, pool=pool, **kwargs)
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            task = next(tasks, None)
+            future = executor.submit(task) if task else None
+
+            while future is not None:
+                result = future.result()
+
+                # only advance `tasks` once the previous read has finished, since doing
+                # so may close the file it was reading from
+                task = next(tasks, None)
+                future = executor.submit(task) if task else None
+
+                yield result
+    finally:
+        tasks.close()
+
+
+def _point_chunk_tasks(wtk_files, lat_lon, params, start=None, end=None, freq='MS',
+                       pool=None, **kwargs):
+    """
+    Yields a callable for each chunk of time in `wtk_files`, which reads that chunk and
+    returns a `(data, meta)` tuple. Each file is held open until its last chunk is read.
+    """
+    unscale = kwargs.get('unscale', True)
+
+    for wtk_file in wtk_files:
+        with _open_wtk(wtk_file, pool, **kwargs) as f:
+            gid = f.lat_lon_gid(lat_lon)
+            meta = f.meta if pool is None else f.meta.copy()
+            time_index = f.time_index
+
+            for a, b in _chunk_bounds(time_index, _time_slice(time_index, start, end), freq):
+                yield partial(_read_point_chunk, f, gid, params, time_index, slice(a, b),
+                              unscale, meta)
+
+
+def _read_point_chunk(f, gid, params, time_index, time_slice, unscale, meta):
+    return (_read_point_block(f, gid, params, time_index, time_slice, unscale=unscale), meta)
+
+
+def _chunk_bounds(time_index, time_slice, freq):
+    """
+    Splits the `time_slice` rows of `time_index` into `(start, stop)` row ranges, which
+    break at each `freq` boundary (e.g. the start of each month).
+    """
+    a, b, _ = time_slice.indices(len(time_index))
+
+    if a >= b:
+        return []
+
+    edges = time_index.searchsorted(pd.date_range(time_index[a], time_index[b - 1], freq=freq))
+    bounds = np.unique(np.concatenate([[a], edges, [b]]))
+
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _read_multi_point_data(f, lat_lons, params, unscale=True, start=None, end=None):
+    """
+    Reads `params` for every point in `lat_lons` from an open `WindX` handle.
+
+    All gids are resolved with a single nearest-neighbour query, and each dataset is read
+    once for the unique set of gids (rex splits the read into chunk-aligned hyperslabs).
+    """
+    gids = np.atleast_1d(f.lat_lon_gid(lat_lons))
+    unique_gids, site_idx = np.unique(gids, return_inverse=True)
+
+    time_index = f.time_index
+    time_slice = _time_slice(time_index, start, end)
+    time_index = pd.Index(time_index[time_slice], name='time_index')
+
+    block = np.empty((len(time_index), len(gids), len(params)),
+                     dtype=_block_dtype(f, params, unscale))
+
+    if len(time_index):
+        columns = _read_columns(f, params, time_slice, unique_gids, unscale)
+
+        for i, values in enumerate(columns.values()):
+            block[:, :, i] = values.reshape(len(time_index), -1)[:, site_idx]
+
+    columns = pd.MultiIndex.from_product(
+        [range(len(gids)), params], names=['site', 'param'])
+    data = pd.DataFrame(block.reshape(len(time_index), -1), index=time_index,
+                        columns=columns, copy=False)
+
+    meta = f.meta.iloc[gids].reset_index()
+    meta.index.name = 'site'
+
+    return (data, meta)
+
+
+def read_wtk_multi_point_data(wtk_file, lat_lons, params, tree=None, unscale=True,
+                              str_decode=True, group=None, start=None, end=None):
+    """
+    Reads WIND Toolkit data for many lat/lon points directly from a file.
+
+    Every point is resolved to its nearest gid in one vectorized lookup, and each
+    parameter is read once for all points, so the cost scales with the number of
+    `params` rather than the number of points.
+
+    Args:
+        wtk_file (:obj:`str`): file path
+        lat_lons (:obj:`list` of :obj:`tuple`): latitude/longitude points to access,
+          as a list of (lat, lon) pairs or an (N, 2) ndarray
+        params (:obj:`list` of :obj:`str`): A list of parameters to include in
+          the dataset
+        tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
+          pre-computed tree of lat, lon coordinates, by default None
+        unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
+          variables on extraction, by default True
+        str_decode (:obj:`bool`, optional): Boolean flag to decode the
+          bytestring meta data into normal strings. Setting this to False will
+          speed up the meta data read. by default True
+        group (:obj:`str`, optional): Group within .h5 resource file to open,
+          by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+
+    Returns:
+        tuple: A tuple `(data, metadata)` consisting of a `DataFrame` with a
+        `(site, param)` column index, where `site` is the position of the point in
+        `lat_lons`, and the metadata for each site (including its `gid`).
+    """
+    lat_lons = _check_lat_lons(lat_lons)
+
+    _check_params(params)
+
+    start, end = _check_time_window(start, end)
+
+    kwargs = {
+        'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
+        'group': group, 'hsds': False
+    }
+
+    with _open_wtk(wtk_file, **kwargs) as f:
+        return _read_multi_point_data(f, lat_lons, params, unscale, start=start, end=end)
+
+
+def request_wtk_multi_point_data(lat_lons, year, params, region=None, resolution=None,
+                                 tree=None, unscale=True, str_decode=True,
+                                 group=None, start=None, end=None, pool=None,
+                                 dry_run=False):
+    """
+    Requests WIND Toolkit data from NREL HSDS for many lat/lon points at once, using
+    a single file handle. If a `region` is not specified, it will attempt to infer one
+    that contains every point using `identify_regions`.
+
+    Args:
+        lat_lons (:obj:`list` of :obj:`tuple`): latitude/longitude points to access,
+          as a list of (lat, lon) pairs or an (N, 2) ndarray
+        year (int): year to be accessed (see `get_regions`)
+        params (:obj:`list` of :obj:`str`): A list of parameters to include in
+          the dataset
+        region (str, optional): region in which the lat/lon points are located (see
+          `get_regions`)
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
+          pre-computed tree of lat, lon coordinates. By default, the region's cached
+          tree is used (see `build_wtk_tree`)
+        unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
+          variables on extraction, by default True
+        str_decode (:obj:`bool`, optional): Boolean flag to decode the
+          bytestring meta data into normal strings. Setting this to False will
+          speed up the meta data read. by default True
+        group (:obj:`str`, optional): Group within .h5 resource file to open,
+          by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+        pool (:obj:`HandlePool` or :obj:`bool`, optional): pool of open file handles to
+          reuse between requests. `True` uses the shared default pool (see
+          `albatross.pool.get_default_pool`), by default None
+        dry_run (:obj:`bool`, optional): return the `albatross.RequestPlan` of the
+          request (counting every distinct point as a site) instead of reading
+          anything, by default False
+
+    Returns:
+        tuple: A tuple `(data, metadata)`, see `read_wtk_multi_point_data`, or a
+        `RequestPlan` if `dry_run` is True.
+    """
+    lat_lons = _check_lat_lons(lat_lons)
+
+    _check_params(params)
+
+    pool = _check_pool(pool)
+    start, end = _check_time_window(start, end)
 
     if not region:
-        regions = identify_regions(lat_lon)
+        membership = identify_regions_many(lat_lons)
+
+        if not membership.any(axis=1).all():
+            raise ValueError('No region found for specified lat/lon point.')
+
+        regions = list(membership.columns[membership.all(axis=0)])
+
+        assert regions, 'No single region contains all of the given lat/lon points.'
 
         err_msg = (
-            'Multiple regions identified for the given lat/lon point: %s.\n'
+            'Multiple regions identified for the given lat/lon points: %s.\n'
             'Please specify one using the `region` arg.'
         ) % regions
 
-        if len(regions) > 1:
-            print(err_msg)
+        assert len(regions) == 1, err_msg
+
+        region = regions[0]
+
+    wtk_file = build_wtk_filepath(region, year, resolution)
+
+    if dry_run:
+        return RequestPlan(params, region, year, resolution=resolution,
+                           sites=len(np.unique(lat_lons, axis=0)), start=start, end=end)
+
+    if tree is None:
+        tree = build_wtk_tree(region, resolution)
+
+    # `load_tree` only unpickles a tree once per process
+    if isinstance(tree, str) and pool is None:
+        tree = load_tree(tree)
+
+    kwargs = {
+        'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
+        'group': group, 'hsds': get_catalog()[region].hsds
+    }
+
+    with _open_wtk(wtk_file, pool, **kwargs) as f:
+        return _read_multi_point_data(f, lat_lons, params, unscale, start=start, end=end)
+
+
+def _read_box_data(f, bbox, params, out=None, unscale=True, start=None, end=None):
+    """
+    Reads `params` for every gid inside of `bbox` from an open `WindX` handle into a
+    (time, gid, param) array. Each dataset is streamed one time chunk at a time, so the
+    working set is bounded by the chunk size rather than the length of the record.
+    """
+    gids = f.box_gids(*bbox)
+
+    if len(gids) == 0:
+        raise ValueError('No gids found inside of the given bbox.')
+
+    time_index = f.time_index
+    time_slice = _time_slice(time_index, start, end)
+    t0, t1, _ = time_slice.indices(len(time_index))
+    time_index = pd.Index(time_index[time_slice], name='time_index')
+
+    shape = (len(time_index), len(gids), len(params))
+    dtype = _block_dtype(f, params, unscale)
+
+    if out is None:
+        data = np.empty(shape, dtype=dtype)
+    else:
+        data = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+
+    for i, param in enumerate(params):
+        sources = _height_sources(param, f.datasets)
+        _, _, chunks = f.resource.get_dset_properties(sources[0][0] if sources else param)
+        step = chunks[0] if chunks else DEFAULT_TIME_CHUNK
+
+        # align reads with the dataset's chunk boundaries
+        for chunk_start in range(t0 - t0 % step, t1, step):
+            a, b = max(chunk_start, t0), min(chunk_start + step, t1)
+            values = _read_columns(f, [param], slice(a, b), gids, unscale)[param]
+            data[a - t0:b - t0, :, i] = values.reshape(b - a, -1)
+
+    if out is not None:
+        data.flush()
+
+    return (data, time_index, f.meta.iloc[gids])
+
+
+def read_wtk_box_data(wtk_file, bbox, params, out=None, tree=None, unscale=True,
+                      str_decode=True, group=None, start=None, end=None):
+    """
+    Reads WIND Toolkit data for every gid inside of a bounding box directly from a file.
+
+    Args:
+        wtk_file (:obj:`str`): file path
+        bbox (:obj:`tuple`): two opposite (lat, lon) corners of the bounding box, e.g.
+          `((lat_min, lon_min), (lat_max, lon_max))`
+        params (:obj:`list` of :obj:`str`): A list of parameters to include in
+          the dataset
+        out (:obj:`str`, optional): path to a `.npy` file to write the data to as a
+          memory-mapped array, rather than holding it in memory, by default None
+        tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
+          pre-computed tree of lat, lon coordinates, by default None
+        unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
+          variables on extraction, by default True
+        str_decode (:obj:`bool`, optional): Boolean flag to decode the
+          bytestring meta data into normal strings. Setting this to False will
+          speed up the meta data read. by default True
+        group (:obj:`str`, optional): Group within .h5 resource file to open,
+          by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+
+    Returns:
+        tuple: A tuple `(data, time_index, metadata)` consisting of a
+        `(time, gid, param)` ndarray (a `numpy.memmap` if `out` is given), the
+        associated time index, and metadata for each gid.
+    """
+    _check_bbox(bbox)
+
+    _check_params(params)
+
+    start, end = _check_time_window(start, end)
+
+    kwargs = {
+        'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
+        'group': group, 'hsds': False
+    }
+
+    with _open_wtk(wtk_file, **kwargs) as f:
+        return _read_box_data(f, bbox, params, out=out, unscale=unscale, start=start,
+                              end=end)
+
+
+def request_wtk_box_data(bbox, year, params, region=None, resolution=None, out=None,
+                         tree=None, unscale=True, str_decode=True, group=None,
+                         start=None, end=None, pool=None, dry_run=False):
+    """
+    Requests WIND Toolkit data from NREL HSDS for every gid inside of a bounding box,
+    e.g. a lease area. If a `region` is not specified, it will attempt to infer one that
+    contains both corners using `identify_regions`.
+
+    The data is streamed one dataset chunk at a time into a `(time, gid, param)` array,
+    which can be written straight to a memory-mapped `.npy` file with `out`, so large
+    cubes never need more than a fixed working set in memory.
+
+    Args:
+        bbox (:obj:`tuple`): two opposite (lat, lon) corners of the bounding box, e.g.
+          `((lat_min, lon_min), (lat_max, lon_max))`
+        year (int): year to be accessed (see `get_regions`)
+        params (:obj:`list` of :obj:`str`): A list of parameters to include in
+          the dataset
+        region (str, optional): region in which the bounding box is located (see
+          `get_regions`)
+        resolution (:obj:`str`, optional): data resolution (see `get_regions`)
+        out (:obj:`str`, optional): path to a `.npy` file to write the data to as a
+          memory-mapped array, rather than holding it in memory, by default None
+        tree (:obj:`str`, optional): cKDTree or path to .pkl file containing
+          pre-computed tree of lat, lon coordinates, by default None
+        unscale (:obj:`bool`, optional): Boolean flag to automatically unscale
+          variables on extraction, by default True
+        str_decode (:obj:`bool`, optional): Boolean flag to decode the
+          bytestring meta data into normal strings. Setting this to False will
+          speed up the meta data read. by default True
+        group (:obj:`str`, optional): Group within .h5 resource file to open,
+          by default None
+        start (:obj:`datetime` or :obj:`str`, optional): only read data from this time
+          onwards (naive times are treated as UTC), by default None
+        end (:obj:`datetime` or :obj:`str`, optional): only read data up to (and
+          including) this time, by default None
+        pool (:obj:`HandlePool` or :obj:`bool`, optional): pool of open file handles to
+          reuse between requests. `True` uses the shared default pool (see
+          `albatross.pool.get_default_pool`), by default None
+        dry_run (:obj:`bool`, optional): return the `albatross.RequestPlan` of the
+          request instead of reading any data. The sites inside of `bbox` are counted
+          from the region's cached coordinates (see `build_wtk_coordinates`), by
+          default False
+
+    Returns:
+        tuple: A tuple `(data, time_index, metadata)`, see `read_wtk_box_data`, or a
+        `RequestPlan` if `dry_run` is True.
+    """
+    _check_bbox(bbox)
+
+    _check_params(params)
+
+    pool = _check_pool(pool)
+    start, end = _check_time_window(start, end)
+
+    if not region:
+        regions = [r for r in identify_regions(bbox[0]) if r in identify_regions(bbox[1])]
+
+        assert regions, 'No single region contains the given bbox.'
+
+        err_msg = (
+            'Multiple regions identified for the given bbox: %s.\n'
+            'Please specify one using the `region` arg.'
+        ) % regions
 
         assert len(regions) == 1, err_msg
 
@@ -207,24 +1414,33 @@ def request_wtk_point_data(lat_lon, year, params, region=None, resolution=None,
 
     wtk_file = build_wtk_filepath(region, year, resolution)
 
+    if dry_run:
+        sites = _count_box_sites(load_array(build_wtk_coordinates(region, resolution)), bbox)
+
+        assert sites, 'No gids found inside of the given bbox.'
+
+        return RequestPlan(params, region, year, resolution=resolution, sites=sites,
+                           start=start, end=end, chunk_rows=DEFAULT_TIME_CHUNK)
+
     kwargs = {
         'tree': tree, 'unscale': unscale, 'str_decode': str_decode,
-        'group': group, 'hsds': True
+        'group': group, 'hsds': get_catalog()[region].hsds
     }
 
-    results = []
+    with _open_wtk(wtk_file, pool, **kwargs) as f:
+        return _read_box_data(f, bbox, params, out=out, unscale=unscale, start=start,
+                              end=end)
 
-    with WindX(wtk_file, **kwargs) as f:
-        for param in params:
-            meta = f.meta
-            res = f.get_lat_lon_df(param, lat_lon)
-            col = res.columns[0]
-            res.rename(columns={col: param}, inplace=True)
-            results.append(res)
 
-    data = pd.concat(results, axis=1)
+def _count_box_sites(coordinates, bbox):
+    """Counts the `coordinates` inside of `bbox`, matching `WindX.box_gids`."""
+    # compared at the precision of the coordinates, as rex does
+    bbox = np.asarray(bbox, dtype=coordinates.dtype)
+    (lat_min, lat_max), (lon_min, lon_max) = np.sort(bbox.T, axis=1)
 
-    return (data, meta)
+    return int(np.count_nonzero(
+        (coordinates[:, 0] >= lat_min) & (coordinates[:, 0] <= lat_max)
+        & (coordinates[:, 1] >= lon_min) & (coordinates[:, 1] <= lon_max)))
 
 
 def get_regions(pprint=False):
@@ -240,7 +1456,7 @@ def get_regions(pprint=False):
     Returns:
         dict: Regions and configuration options.
     """
-    wtk = _load_wtk()
+    wtk = get_catalog().to_dict()
     if pprint:
         print(json.dumps(wtk, indent=3))
 
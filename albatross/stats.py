@@ -0,0 +1,280 @@
+"""
+Provides streaming accumulators for wind statistics, which take data one chunk at a time
+in bounded memory and can be merged across processes.
+
+Example:
+  .. code-block:: python
+
+    acc = DiurnalAccumulator()
+
+    for data, meta in iter_wtk_point_data(lat_lon, None, params, years=range(2000, 2020)):
+        acc.update(data)
+
+    stats = acc.result('windspeed_100m')
+"""
+
+import numpy as np
+from pandas import DataFrame, Index, MultiIndex
+
+from .analysis import DIURNAL_STATS, _column, _diurnal_groups
+
+DEFAULT_COMPRESSION = 1000
+"""Default t-digest compression, roughly the most centroids each digest keeps."""
+
+
+class DiurnalAccumulator:
+    """
+    Accumulates the diurnal statistics of `albatross.analysis.get_diurnal_stats` for
+    many columns, one chunk of data at a time.
+
+    Each hour (or month and hour) bucket of each column keeps its count, mean and sum
+    of squared deviations (merged with Welford's/Chan's updates), along with a t-digest
+    of its distribution for the percentiles. Memory use is bounded by the number of
+    buckets and the `compression`, however much data is added, and accumulators that
+    were filled separately (e.g. by different processes) can be combined with `merge`.
+
+    Means and standard deviations are exact. Percentiles are exact until a bucket holds
+    more than `compression` values, and approximate (most accurate towards the tails)
+    after that.
+    """
+    def __init__(self, fields=None, by_month=False, compression=DEFAULT_COMPRESSION):
+        """
+        Args:
+          fields (:obj:`list` of :obj:`str`, optional): columns to accumulate. If none
+            are provided, every column containing the string 'windspeed' in the first
+            chunk is accumulated.
+          by_month (:obj:`bool`, optional): accumulate every month and hour (12x24)
+            rather than every hour, by default False
+          compression (int, optional): t-digest compression, by default
+            `DEFAULT_COMPRESSION`
+        """
+        if fields:
+            assert isinstance(fields, list), '"fields" must be a list or None'
+            msg = '"fields" elements must be strings'
+            assert all([isinstance(f, str) for f in fields]), msg
+
+        msg = '"compression" must be an int of at least 20'
+        assert isinstance(compression, int) and compression >= 20, msg
+
+        self.fields = list(fields) if fields else None
+        self.by_month = by_month
+        self.compression = compression
+        self.n_groups = 12 * 24 if by_month else 24
+        self.index_name = None
+
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+        # (means, weights) of each bucket's digest, indexed [group][field]
+        self._digests = None
+
+    def update(self, data):
+        """
+        Adds a chunk of data.
+
+        Args:
+          data (DataFrame): Wind data, with a `DatetimeIndex`
+        """
+        assert isinstance(data, DataFrame), '"data" must be a DataFrame'
+
+        if self.fields is None:
+            fields = list(filter(lambda x: 'windspeed' in x, data.columns[:]))
+            assert len(fields) > 0, 'unable to infer wind speed data column'
+            self.fields = fields
+
+        for field in self.fields:
+            assert field in data, 'column not found: %s' % field
+
+        self._init()
+
+        if self.index_name is None:
+            self.index_name = data.index.name
+
+        if not len(data):
+            return
+
+        values = np.column_stack([_column(data, field).to_numpy(dtype=np.float64)
+                                  for field in self.fields])
+
+        order, bounds = _diurnal_groups(data.index, self.by_month)
+        grouped = values[order]
+
+        for group in np.flatnonzero(bounds[1:] > bounds[:-1]):
+            rows = grouped[bounds[group]:bounds[group + 1]]
+
+            for i in range(len(self.fields)):
+                column = rows[:, i]
+                column = column[~np.isnan(column)]
+
+                if len(column):
+                    self._add(group, i, len(column), column.mean(),
+                              ((column - column.mean()) ** 2).sum(), column.min(),
+                              column.max(), column, np.ones(len(column)))
+
+    def merge(self, other):
+        """
+        Adds the data accumulated by another accumulator, with the same `fields` and
+        `by_month`.
+
+        Args:
+          other (DiurnalAccumulator): The accumulator to merge in.
+
+        Returns:
+          DiurnalAccumulator: This accumulator.
+        """
+        assert isinstance(other, DiurnalAccumulator), '"other" must be a DiurnalAccumulator'
+
+        if other._count is None:
+            return self
+
+        if self.fields is None:
+            self.fields = list(other.fields)
+
+        msg = 'accumulators must have the same "fields" and "by_month"'
+        assert self.fields == other.fields and self.by_month == other.by_month, msg
+
+        self._init()
+        self.index_name = self.index_name or other.index_name
+
+        for group, i in zip(*np.nonzero(other._count)):
+            means, weights = other._digests[group][i]
+            self._add(group, i, other._count[group, i], other._mean[group, i],
+                      other._m2[group, i], other._min[group, i], other._max[group, i],
+                      means, weights)
+
+        return self
+
+    def result(self, field=None):
+        """
+        Returns the accumulated diurnal statistics.
+
+        Args:
+          field (str, optional): a single field to return, in the format of
+            `get_diurnal_stats`. By default, every field is returned in the format of
+            `get_diurnal_stats_many`.
+
+        Returns:
+          DataFrame: A DataFrame consisting of an hourly time index (or a
+          `(month, hour)` index if `by_month` is True), and columns of
+          `albatross.analysis.DIURNAL_STATS`, for each field.
+        """
+        assert self._count is not None, 'no data has been accumulated'
+
+        if field is not None:
+            assert field in self.fields, 'column not found: %s' % field
+
+        fields = self.fields if field is None else [field]
+        present = self._count.any(axis=1)
+        table = []
+
+        for group in np.flatnonzero(present):
+            row = []
+
+            for i in [self.fields.index(f) for f in fields]:
+                count = self._count[group, i]
+
+                if count == 0:
+                    row += [np.nan] * len(DIURNAL_STATS)
+                    continue
+
+                mean = self._mean[group, i]
+                std = np.sqrt(self._m2[group, i] / (count - 1)) if count > 1 else np.nan
+                p_10, median, p_90 = _quantiles(
+                    *self._digests[group][i], self._min[group, i], self._max[group, i],
+                    [.1, .5, .9])
+
+                row += [mean, mean + std, mean - std, p_10, median, p_90]
+
+            table.append(row)
+
+        # labelled with the dtype of `DatetimeIndex.hour`, as `get_diurnal_stats` is
+        groups = np.flatnonzero(present).astype(np.int32)
+
+        if self.by_month:
+            labels = MultiIndex.from_arrays([groups // 24 + 1, groups % 24],
+                                            names=['month', 'hour'])
+        else:
+            labels = Index(groups, name=self.index_name)
+
+        df = DataFrame(np.array(table, dtype=np.float64).reshape(len(groups), -1),
+                       index=labels, columns=MultiIndex.from_product([fields, DIURNAL_STATS]))
+
+        return df if field is None else df.droplevel(0, axis=1)
+
+    def _init(self):
+        if self._count is not None:
+            return
+
+        shape = (self.n_groups, len(self.fields))
+
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+
+        empty = (np.empty(0), np.empty(0))
+        self._digests = [[empty] * len(self.fields) for _ in range(self.n_groups)]
+
+    def _add(self, group, i, count, mean, m2, low, high, means, weights):
+        """Merges the moments and digest of some values into bucket `(group, i)`."""
+        n = self._count[group, i]
+        total = n + count
+        delta = mean - self._mean[group, i]
+
+        # Chan et al.'s parallel form of Welford's update
+        self._mean[group, i] += delta * count / total
+        self._m2[group, i] += m2 + delta ** 2 * n * count / total
+        self._count[group, i] = total
+        self._min[group, i] = min(self._min[group, i], low)
+        self._max[group, i] = max(self._max[group, i], high)
+
+        old_means, old_weights = self._digests[group][i]
+        means = np.concatenate([old_means, means])
+        weights = np.concatenate([old_weights, weights])
+
+        # small buckets are kept exact
+        if len(means) > self.compression:
+            means, weights = _compress(means, weights, self.compression)
+
+        self._digests[group][i] = (means, weights)
+
+
+def _compress(means, weights, compression):
+    """
+    Merges the centroids `(means, weights)` of a t-digest, so that each centroid spans
+    at most one unit of the k1 scale function. This keeps about `compression / 2`
+    centroids, which are smallest in the tails.
+    """
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+
+    total = weights.sum()
+    q = (np.cumsum(weights) - weights / 2) / total
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+    clusters = np.floor(k - k[0]).astype(np.int64)
+    _, clusters = np.unique(clusters, return_inverse=True)
+
+    merged_weights = np.bincount(clusters, weights=weights)
+    merged_means = np.bincount(clusters, weights=means * weights) / merged_weights
+
+    return merged_means, merged_weights
+
+
+def _quantiles(means, weights, low, high, qs):
+    """
+    Interpolates quantiles from t-digest centroids, anchored at the min and max. While
+    every centroid is a single value, this matches `pandas.Series.quantile`.
+    """
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+
+    total = weights.sum()
+    positions = np.concatenate([[0], np.cumsum(weights) - weights / 2, [total]])
+    values = np.concatenate([[low], means, [high]])
+
+    return np.interp(np.asarray(qs) * (total - 1) + 0.5, positions, values)
@@ -1,9 +1,187 @@
+import copy
 import pkgutil
+from collections import namedtuple
+from collections.abc import Mapping
+
+import numpy as np
 from yaml import load, Loader
 
 WTK_FILE = './wtk.yml'
+WTK_ROOT = '/nrel/wtk/'
+
+_CATALOG = None
+_EXTRA_CATALOGS = []
 
 
 def _load_wtk(file=WTK_FILE):
     data = pkgutil.get_data(__name__, "wtk.yml")
     return load(data, Loader=Loader)
+
+
+class Region(namedtuple('Region', ['name', 'years', 'resolutions', 'base', 'lat_range',
+                                   'lon_range', 'root', 'hsds'])):
+    """
+    An immutable description of a WIND Toolkit region.
+
+    Attributes:
+      name (str): region name
+      years (range): available years
+      resolutions (tuple): available data resolutions, e.g. `('hourly', '5min')`
+      base (str): file name prefix, e.g. `'wtk_conus'` for `wtk_conus_2012.h5`
+      lat_range (tuple): (min, max) latitude
+      lon_range (tuple): (min, max) longitude
+      root (str): directory containing the region's files, by default `WTK_ROOT`
+      hsds (bool): whether the files are read through HSDS (the default) or directly
+        from the local filesystem
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, name, config):
+        """
+        Builds a `Region` from its `wtk.yml` style configuration.
+
+        Args:
+          name (str): region name
+          config (dict): region configuration, with `year_range`, `resolutions` and
+            `lat_lon_range` keys, and optionally `base`, `root` and `hsds`.
+
+        Returns:
+          Region: The region.
+        """
+        assert isinstance(config, dict), 'region config must be a dict: %s' % name
+
+        for key in ('year_range', 'resolutions', 'lat_lon_range'):
+            assert key in config, 'region "%s" is missing "%s"' % (name, key)
+
+        (first, last), (lat_range, lon_range) = config['year_range'], config['lat_lon_range']
+
+        return cls(
+            name=name,
+            years=range(first, last + 1),
+            resolutions=tuple(config['resolutions']),
+            base=config.get('base') or 'wtk_%s' % name,
+            lat_range=tuple(lat_range),
+            lon_range=tuple(lon_range),
+            root=config.get('root') or WTK_ROOT,
+            hsds=bool(config.get('hsds', True)),
+        )
+
+    def to_dict(self):
+        """
+        Returns the region's `wtk.yml` style configuration.
+
+        Returns:
+          dict: Region configuration options.
+        """
+        config = {
+            'year_range': [self.years[0], self.years[-1]],
+            'resolutions': list(self.resolutions),
+            'lat_lon_range': [list(self.lat_range), list(self.lon_range)],
+        }
+
+        if self.base != 'wtk_%s' % self.name:
+            config['base'] = self.base
+
+        if self.root != WTK_ROOT:
+            config['root'] = self.root
+
+        if not self.hsds:
+            config['hsds'] = False
+
+        return config
+
+
+class RegionCatalog(Mapping):
+    """
+    An immutable mapping of region names to `Region` descriptions, along with a
+    precomputed `(regions, 4)` array of `(lat_min, lat_max, lon_min, lon_max)` bounds.
+    """
+    def __init__(self, regions):
+        """
+        Args:
+          regions (:obj:`list` of :obj:`Region`): the regions, in order.
+        """
+        self._regions = {region.name: region for region in regions}
+        self.names = tuple(self._regions)
+
+        self.bounds = np.array(
+            [region.lat_range + region.lon_range for region in self._regions.values()],
+            dtype=np.float64).reshape(-1, 4)
+        self.bounds.flags.writeable = False
+
+    def __getitem__(self, name):
+        return self._regions[name]
+
+    def __iter__(self):
+        return iter(self._regions)
+
+    def __len__(self):
+        return len(self._regions)
+
+    def to_dict(self):
+        """
+        Returns the `wtk.yml` style configuration of every region.
+
+        Returns:
+          dict: Regions and configuration options.
+        """
+        return {name: region.to_dict() for name, region in self._regions.items()}
+
+
+def get_catalog():
+    """
+    Returns the catalog of WIND Toolkit regions. It is loaded from `wtk.yml` (plus any
+    catalogs added with `register_catalog`) once per process.
+
+    Returns:
+      RegionCatalog: The region catalog.
+    """
+    global _CATALOG
+
+    if _CATALOG is None:
+        regions = {}
+
+        for catalog in [_load_wtk()] + _EXTRA_CATALOGS:
+            for name, config in catalog.items():
+                regions[name] = Region.from_dict(name, config)
+
+        _CATALOG = RegionCatalog(regions.values())
+
+    return _CATALOG
+
+
+def register_catalog(catalog):
+    """
+    Adds regions to the catalog, e.g. to describe a local mirror of WIND Toolkit files.
+    Regions with the same name as an existing region replace it.
+
+    Args:
+      catalog (:obj:`dict` or :obj:`str`): `wtk.yml` style region configurations, or
+        the path to a YAML file containing them. Each region may set a `root`
+        directory for its files, and `hsds: false` to read them from the local
+        filesystem rather than HSDS.
+    """
+    global _CATALOG
+
+    if isinstance(catalog, str):
+        with open(catalog) as f:
+            catalog = load(f, Loader=Loader)
+
+    assert isinstance(catalog, dict), '"catalog" must be a dict or a path to a YAML file'
+
+    # validate every region before registering any of them
+    for name, config in catalog.items():
+        Region.from_dict(name, config)
+
+    # a copy, so later changes to the caller's dict can't change the catalog
+    _EXTRA_CATALOGS.append(copy.deepcopy(catalog))
+    _CATALOG = None
+
+
+def clear_catalogs():
+    """Removes every catalog added with `register_catalog`."""
+    global _CATALOG
+
+    _EXTRA_CATALOGS.clear()
+    _CATALOG = None
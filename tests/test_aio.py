@@ -0,0 +1,111 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from albatross import TESTDATADIR
+from albatross.aio import AsyncClient
+from albatross.requests import read_wtk_point_data
+
+
+def test_async_client_invalid_args():
+    """Test invalid inputs for `AsyncClient`."""
+    with pytest.raises(AssertionError) as e:
+        AsyncClient(max_concurrency=0)
+
+    assert str(e.value) == '"max_concurrency" must be a positive int'
+
+    with pytest.raises(AssertionError) as e:
+        AsyncClient(timeout='bad')
+
+    assert str(e.value) == '"timeout" must be a positive number or None'
+
+
+def test_async_client_run():
+    """Test that `AsyncClient.run` returns the same data as a blocking read."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    async def main():
+        async with AsyncClient() as client:
+            return await asyncio.gather(*[
+                client.run(read_wtk_point_data, path, lat_lon, ['windspeed_100m'])
+                for _ in range(3)
+            ])
+
+    expected, _ = read_wtk_point_data(path, lat_lon, ['windspeed_100m'])
+
+    for data, _ in asyncio.run(main()):
+        assert data.equals(expected)
+
+
+def test_async_client_max_concurrency():
+    """Test that no more than `max_concurrency` requests run at the same time."""
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def work():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+
+        time.sleep(0.02)
+
+        with lock:
+            running[0] -= 1
+
+    async def main():
+        async with AsyncClient(max_concurrency=2) as client:
+            await asyncio.gather(*[client.run(work) for _ in range(8)])
+
+    asyncio.run(main())
+
+    assert running[1] == 2
+
+
+def test_async_client_timeout():
+    """Test that slow requests time out, but keep their slot until they finish."""
+    async def main():
+        async with AsyncClient(max_concurrency=1, timeout=0.01) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.run(time.sleep, 0.2)
+
+            # waits for the timed out request to release its slot
+            started = time.monotonic()
+            await client.run(time.sleep, 0, timeout=1)
+
+            return time.monotonic() - started
+
+    assert asyncio.run(main()) > 0.1
+
+
+def test_async_client_reuse():
+    """Test that a client can be used from more than one event loop."""
+    client = AsyncClient(max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*[client.run(sum, [i, 1]) for i in range(4)])
+
+    assert asyncio.run(main()) == [1, 2, 3, 4]
+    assert asyncio.run(main()) == [1, 2, 3, 4]
+
+    client.close()
+
+
+def test_async_client_timeout_after_loop_closed(caplog):
+    """Test that a timed out request finishing after its loop has closed is harmless."""
+    client = AsyncClient(timeout=0.01)
+    release = threading.Event()
+
+    async def main():
+        return await client.run(release.wait)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+
+    release.set()
+    client._executor.shutdown(wait=True)
+
+    assert not [r for r in caplog.records if 'exception calling callback' in r.getMessage()]
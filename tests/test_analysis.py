@@ -1,14 +1,22 @@
 import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas
 import pytest
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 from pandas import DataFrame, read_hdf
+from pandas.testing import assert_frame_equal
 
 from albatross import TESTDATADIR
 from albatross.classes import WindTurbine
 from albatross.requests import read_wtk_point_data
 from albatross.analysis import (
-    boxplot, get_diurnal_stats, plot_diurnal_stats, plot_windrose, pdf, turbulence_std)
+    DIURNAL_STATS, REPRESENTATIVE_STATS, TURBULENCE_STATS, boxplot, boxplot_stats, fit_weibull,
+    get_diurnal_stats, get_diurnal_stats_many, get_turbulence_stats, plot_diurnal_stats,
+    plot_windrose, pdf, turbulence_std, weibull_pdf, windrose_table)
 
 
 @pytest.fixture
@@ -21,6 +29,16 @@ def data():
     return res
 
 
+@pytest.fixture
+def data_wind():
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    res, meta = read_wtk_point_data(path, lat_lon, ['windspeed_100m', 'winddirection_100m'])
+
+    return res
+
+
 @pytest.fixture
 def data_5min():
     path = os.path.join(TESTDATADIR, 'pacwave_5min.h5')
@@ -80,6 +98,97 @@ def test_boxplot(data):
     # TODO: add image comparison testing https://matplotlib.org/stable/devel/testing.html#writing-an-image-comparison-test # noqa
 
 
+def test_boxplot_stats(data_wind):
+    """Test that `boxplot_stats` matches matplotlib's box statistics."""
+    from matplotlib import cbook
+
+    data = data_wind.copy()
+    data.iloc[10:20, 0] = np.nan
+
+    stats = boxplot_stats(data, fields=['windspeed_100m'])
+    expected = cbook.boxplot_stats(data['windspeed_100m'].dropna().to_numpy())[0]
+
+    assert stats[0]['label'] == 'windspeed_100m'
+
+    for key in ('mean', 'iqr', 'cilo', 'cihi', 'whislo', 'whishi', 'q1', 'med', 'q3'):
+        assert np.isclose(stats[0][key], expected[key])
+
+    assert np.array_equal(stats[0]['fliers'], np.sort(expected['fliers']))
+
+
+def test_boxplot_stats_max_fliers(data):
+    """Test that `max_fliers` caps the fliers, keeping the most extreme."""
+    fliers = boxplot_stats(data)[0]['fliers']
+    capped = boxplot_stats(data, max_fliers=10)[0]
+
+    assert len(fliers) > 10
+    assert len(capped['fliers']) == 10
+    assert capped['fliers'][0] == fliers[0] and capped['fliers'][-1] == fliers[-1]
+
+    with pytest.raises(AssertionError) as e:
+        boxplot_stats(data, max_fliers=-1)
+
+    assert str(e.value) == '"max_fliers" must be a non-negative int or None'
+
+
+def test_boxplot_notch(data):
+    """Test that `boxplot` accepts `notch`, as `Axes.boxplot` does."""
+    fig, ax = boxplot(data, notch=True)
+
+    # a notched box outline has 11 vertices, a plain one 5
+    assert len(ax.lines[0].get_xdata()) == 11
+
+
+def test_boxplot_sym(data):
+    """Test that `boxplot` accepts `sym`, as `Axes.boxplot` does."""
+    fig, ax = boxplot(data, sym='')
+
+    # fliers are the only lines drawn without a line style
+    assert [line for line in ax.lines if line.get_linestyle() == 'None'] == []
+
+    fig, ax = boxplot(data, sym='g+')
+    fliers = [line for line in ax.lines if line.get_marker() == '+']
+
+    assert len(fliers) == 1 and fliers[0].get_markeredgecolor() == 'g'
+
+    with pytest.raises(AssertionError) as e:
+        boxplot(data, sym='bad')
+
+    assert str(e.value) == 'unrecognized "sym" format string: bad'
+
+    with pytest.raises(AssertionError) as e:
+        boxplot(data, bootstrap=1000)
+
+    assert str(e.value) == '"bootstrap" is not supported, precomputed "stats" may be given instead'
+
+
+def test_boxplot_whis_percentiles(data):
+    """Test percentile `whis` against matplotlib's box statistics."""
+    from matplotlib import cbook
+
+    stats = boxplot_stats(data, whis=(5, 95))[0]
+    expected = cbook.boxplot_stats(data['windspeed_100m'].to_numpy(), whis=(5, 95))[0]
+
+    assert np.isclose(stats['whislo'], expected['whislo'])
+    assert np.isclose(stats['whishi'], expected['whishi'])
+    assert np.array_equal(stats['fliers'], np.sort(expected['fliers']))
+
+    boxplot(data, whis=(5, 95))
+
+    with pytest.raises(AssertionError) as e:
+        boxplot_stats(data, whis=(95, 5))
+
+    assert str(e.value) == '"whis" must be a float or a (low, high) pair of percentiles'
+
+
+def test_boxplot_precomputed_stats(data):
+    """Test that `boxplot` draws precomputed statistics."""
+    stats = boxplot_stats(data, labels=['100m'], max_fliers=0)
+    fig, ax = boxplot(None, stats=stats)
+
+    assert [label.get_text() for label in ax.get_xticklabels()] == ['100m']
+
+
 # Test `plot_windrose` #
 
 
@@ -163,6 +272,73 @@ def test_windrose():
     plot_windrose(data, speed='ws', direction='wd')
 
 
+def test_windrose_table_invalid_data(data):
+    """Test invalid inputs for `windrose_table`."""
+    with pytest.raises(AssertionError) as e:
+        windrose_table([])
+
+    assert str(e.value) == '"data" must be a DataFrame or dict'
+
+    with pytest.raises(AssertionError) as e:
+        windrose_table(data)
+
+    assert str(e.value) == 'unable to infer wind direction data column'
+
+
+def test_windrose_table(data_wind):
+    """Test that `windrose_table` matches the table binned by `windrose`."""
+    from windrose.windrose import histogram
+
+    ws, wd = data_wind['windspeed_100m'].to_numpy(), data_wind['winddirection_100m'].to_numpy()
+    bins = np.linspace(ws.min(), ws.max(), 6)
+
+    _, _, expected = histogram(wd, ws, bins, 16, len(ws), normed=True)
+    table = windrose_table(data_wind)
+
+    assert table.shape == (16, 6)
+    assert list(table.index[:3]) == [0, 22.5, 45]
+    assert np.allclose(table.columns, bins)
+    assert np.allclose(table.to_numpy().T, expected)
+    assert np.isclose(table.to_numpy().sum(), 100)
+
+    counts = windrose_table(data_wind, sectors=8, speed_bins=[0, 5, 10], normed=False)
+
+    assert counts.shape == (8, 3)
+    assert counts.to_numpy().sum() == len(data_wind)
+
+
+def test_windrose_table_sites(data_wind):
+    """Test that `windrose_table` bins many sites at once."""
+    sites = {'a': data_wind, 'b': data_wind.iloc[:1000]}
+    table = windrose_table(sites, speed_bins=[0, 4, 8, 12])
+
+    assert list(table.index.names) == ['site', 'direction']
+    assert np.allclose(table.loc['b'], windrose_table(sites['b'], speed_bins=[0, 4, 8, 12]))
+
+
+def test_windrose_precomputed_table(data_wind):
+    """Test that `plot_windrose` draws a precomputed table as it draws the raw data."""
+    from windrose import WindroseAxes
+
+    ax = plot_windrose(data_wind)
+    table_ax = plot_windrose(None, table=windrose_table(data_wind))
+
+    def bars(ax):
+        return sorted((p.get_x(), p.get_y(), p.get_width(), p.get_height(), *p.get_facecolor())
+                      for p in ax.patches)
+
+    assert isinstance(table_ax, WindroseAxes)
+    assert np.allclose(bars(table_ax), bars(ax))
+    assert table_ax.get_rmax() == pytest.approx(ax.get_rmax())
+    assert ([t.get_text() for t in table_ax.get_legend().get_texts()]
+            == [t.get_text() for t in ax.get_legend().get_texts()])
+
+    with pytest.raises(AssertionError) as e:
+        plot_windrose(None, table=windrose_table({'a': data_wind}))
+
+    assert str(e.value) == '"table" must hold a single site'
+
+
 # test `pdf` #
 
 
@@ -212,6 +388,71 @@ def test_pdf(data):
     # TODO: add image comparison testing https://matplotlib.org/stable/devel/testing.html#writing-an-image-comparison-test # noqa
 
 
+def test_pdf_params(data):
+    """Test that `pdf` returns `scipy.stats.exponweib` style parameters."""
+    _, _, params = pdf(data)
+    k, c = fit_weibull(data)
+
+    assert params == (1, k[0], 0, c[0])
+
+
+# Test `fit_weibull` #
+
+
+def test_fit_weibull_invalid_data(data):
+    """Test invalid `data` inputs for `fit_weibull`."""
+    with pytest.raises(AssertionError) as e:
+        fit_weibull([1, 2, 3])
+
+    assert str(e.value) == '"data" must be a DataFrame or ndarray'
+
+    with pytest.raises(AssertionError) as e:
+        fit_weibull(data, fields=['bad'])
+
+    assert str(e.value) == 'column not found: bad'
+
+    with pytest.raises(AssertionError) as e:
+        fit_weibull(np.zeros((10, 2)))
+
+    assert str(e.value) == 'at least 2 positive values are required in every column'
+
+
+def test_fit_weibull(data):
+    """Test that `fit_weibull` matches scipy's maximum likelihood fit."""
+    from scipy import stats
+
+    ws = data['windspeed_100m'].to_numpy()
+    k, c = fit_weibull(data)
+
+    assert k.shape == c.shape == (1,)
+
+    _, expected_k, _, expected_c = stats.exponweib.fit(ws[ws > 0], floc=0, f0=1)
+
+    assert np.isclose(k[0], expected_k, rtol=1e-4)
+    assert np.isclose(c[0], expected_c, rtol=1e-4)
+
+
+def test_fit_weibull_columns():
+    """Test that `fit_weibull` fits many columns at once, ignoring calms and NaNs."""
+    rng = np.random.default_rng(0)
+    shapes, scales = np.array([1.5, 2.0, 3.0]), np.array([6.0, 8.0, 10.0])
+    ws = rng.weibull(shapes, (20000, 3)) * scales
+    ws[:100, 0], ws[100:200, 1] = 0, np.nan
+
+    k, c = fit_weibull(ws)
+
+    assert np.allclose(k, shapes, rtol=0.05)
+    assert np.allclose(c, scales, rtol=0.05)
+
+    single_k, single_c = fit_weibull(ws[:, 2])
+
+    assert np.isclose(single_k[0], k[2]) and np.isclose(single_c[0], c[2])
+
+    # the density integrates to 1
+    x = np.linspace(0, 60, 60001)
+    assert np.isclose(np.trapezoid(weibull_pdf(x, k[1], c[1]), x), 1, atol=1e-4)
+
+
 # test get_diurnal_stats
 
 
@@ -252,6 +493,61 @@ def test_get_diurnal_stats(data):
         assert len(df[col]) == 24
 
 
+def test_get_diurnal_stats_matches_groupby(data):
+    """Test that `get_diurnal_stats` matches separate `groupby` passes, skipping NaNs."""
+    data = data.copy()
+    data.iloc[5:50, 0] = np.nan
+
+    ws = data['windspeed_100m']
+    hours = ws.groupby(data.index.hour)
+
+    expected = pandas.concat([
+        hours.mean(), hours.mean() + hours.std(), hours.mean() - hours.std(),
+        hours.quantile(q=.1), hours.median(), hours.quantile(q=.9)], axis=1)
+    expected.columns = DIURNAL_STATS
+
+    assert_frame_equal(get_diurnal_stats(data), expected)
+
+
+def test_get_diurnal_stats_by_month(data):
+    """Test the month x hour mode of `get_diurnal_stats`."""
+    df = get_diurnal_stats(data, by_month=True)
+
+    assert df.shape == (12 * 24, 6)
+    assert list(df.index.names) == ['month', 'hour']
+
+    july = data[data.index.month == 7]['windspeed_100m']
+    assert np.isclose(df.loc[(7, 12), 'Median'], july[july.index.hour == 12].median())
+
+
+def test_get_diurnal_stats_many_invalid_fields(data):
+    """Test invalid `fields` inputs for `get_diurnal_stats_many`."""
+    with pytest.raises(AssertionError) as e:
+        get_diurnal_stats_many(data, fields=['bad'])
+
+    msg = 'column not found: bad'
+    assert str(e.value) == msg
+
+
+def test_get_diurnal_stats_many():
+    """Test that `get_diurnal_stats_many` matches `get_diurnal_stats` for each column."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    data, _ = read_wtk_point_data(path, (41.96364, -71.79364),
+                                  ['windspeed_80m', 'windspeed_100m', 'pressure_0m'])
+
+    df = get_diurnal_stats_many(data)
+
+    assert list(df.columns.levels[0]) == ['windspeed_100m', 'windspeed_80m']
+    assert df.shape == (24, 12)
+
+    for field in ['windspeed_80m', 'windspeed_100m']:
+        assert_frame_equal(df[field], get_diurnal_stats(data, speed=field))
+
+    df = get_diurnal_stats_many(data, fields=['pressure_0m'], by_month=True)
+
+    assert df.shape == (12 * 24, 6)
+
+
 # Test `plot_diurnal_stats`
 
 
@@ -345,8 +641,124 @@ def test_turbulence_std(data_5min, turbine):
     assert res.columns == ['turbulence_std']
 
     # check that first turbulence std data point is correct
-    d1, d2 = data_5min['windspeed_10m'][:2]
+    d1, d2 = data_5min['windspeed_10m'].iloc[:2]
     avg = (d1 + d2)/2
-    t1 = res['turbulence_std'][0]
+    t1 = res['turbulence_std'].iloc[0]
 
     assert turbulence_std(avg, turbine) == pytest.approx(t1)
+
+
+def test_turbulence_std_many(data_5min, turbine):
+    """Test `turbulence_std` for many turbines and columns at once."""
+    turbines = [turbine, WindTurbine('I', 'A+')]
+    data = data_5min.assign(windspeed_20m=data_5min['windspeed_10m'] * 1.1)
+
+    assert turbulence_std(3.9, turbines) == pytest.approx([1.1935, 1.5345])
+
+    res = turbulence_std(data, turbines, speed=['windspeed_10m', 'windspeed_20m'])
+
+    assert list(res.columns) == [('windspeed_10m', 'IIB'), ('windspeed_10m', 'IA+'),
+                                 ('windspeed_20m', 'IIB'), ('windspeed_20m', 'IA+')]
+
+    for field in ['windspeed_10m', 'windspeed_20m']:
+        for t in turbines:
+            single = turbulence_std(data, t, speed=field)['turbulence_std']
+            np.testing.assert_allclose(res[(field, t.name)], single)
+
+
+def test_get_turbulence_stats_invalid(data_5min, turbine):
+    """Test invalid inputs for `get_turbulence_stats`."""
+    with pytest.raises(AssertionError) as e:
+        get_turbulence_stats({})
+
+    assert str(e.value) == '"data" must be a DataFrame'
+
+    with pytest.raises(AssertionError) as e:
+        get_turbulence_stats(data_5min, turbines=turbine)
+
+    assert str(e.value) == '"turbines" must be a list or None'
+
+    with pytest.raises(AssertionError) as e:
+        get_turbulence_stats(data_5min, turbines=['bad'])
+
+    assert str(e.value) == '"turbines" elements must be WindTurbines'
+
+    with pytest.raises(AssertionError) as e:
+        get_turbulence_stats(data_5min, fields=['bad'])
+
+    assert str(e.value) == 'column not found: bad'
+
+    with pytest.raises(AssertionError) as e:
+        get_turbulence_stats(data_5min, quantile=90)
+
+    assert str(e.value) == '"quantile" must be between 0 and 1'
+
+
+def test_get_turbulence_stats(data_5min, turbine):
+    """Test `get_turbulence_stats` against a `groupby` implementation."""
+    windows, bins = get_turbulence_stats(data_5min, turbines=[turbine])
+
+    assert list(windows.columns) == [('windspeed_10m', s)
+                                     for s in TURBULENCE_STATS + ['NTM IIB']]
+    assert list(bins.columns) == [('windspeed_10m', s)
+                                  for s in REPRESENTATIVE_STATS + ['NTM IIB']]
+
+    grouped = data_5min['windspeed_10m'].astype(np.float64).groupby(pandas.Grouper(freq='10min'))
+    mean, std = grouped.mean(), grouped.std()
+    ti = std / mean
+
+    assert len(windows) == 52560
+    np.testing.assert_allclose(windows[('windspeed_10m', 'Mean')], mean)
+    np.testing.assert_allclose(windows[('windspeed_10m', 'Std')], std)
+    np.testing.assert_allclose(windows[('windspeed_10m', 'TI')], ti)
+
+    ntm = turbulence_std(data_5min, turbine)['turbulence_std']
+    np.testing.assert_allclose(windows[('windspeed_10m', 'NTM IIB')], ntm)
+
+    valid = np.isfinite(ti)
+    speed_bins = np.floor(mean[valid] + 0.5)
+    representative = ti[valid].groupby(speed_bins).quantile(.9)
+
+    np.testing.assert_array_equal(bins.index, representative.index)
+    np.testing.assert_allclose(bins[('windspeed_10m', 'Representative TI')], representative)
+    np.testing.assert_allclose(bins[('windspeed_10m', 'Mean TI')],
+                               ti[valid].groupby(speed_bins).mean())
+    assert bins[('windspeed_10m', 'Count')].sum() == valid.sum()
+
+    # NTM TI at each bin centre
+    assert bins.loc[15.0, ('windspeed_10m', 'NTM IIB')] == pytest.approx(
+        turbulence_std(15.0, turbine) / 15)
+
+    # which is undefined, rather than infinite, at 0 m/s
+    assert np.isnan(bins.loc[0.0, ('windspeed_10m', 'NTM IIB')])
+    assert not np.isinf(bins.to_numpy()).any()
+
+
+def test_get_turbulence_stats_hourly(data):
+    """Test that hourly data, with no 10 minute variation, gives no measured TI."""
+    windows, bins = get_turbulence_stats(data)
+
+    assert windows[('windspeed_100m', 'TI')].isna().all()
+    assert len(bins) == 0
+
+
+def test_lazy_imports():
+    """Test that importing the compute modules does not load plotting/HDF libraries."""
+    code = (
+        'import sys, albatross.analysis, albatross.requests; '
+        'print(sorted(m for m in ("matplotlib", "windrose", "scipy", "rex", "h5py") '
+        'if m in sys.modules))'
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, check=True,
+                         text=True).stdout
+
+    assert out.strip() == '[]'
+
+
+def test_get_diurnal_stats_scaled(data):
+    """Test that `get_diurnal_stats` unscales data read with `keep_scaled=True`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    scaled, _ = read_wtk_point_data(path, (41.96364, -71.79364), ['windspeed_100m'],
+                                    keep_scaled=True)
+
+    assert_frame_equal(get_diurnal_stats(scaled), get_diurnal_stats(data))
@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+import pytest
+from pandas import DataFrame, DatetimeIndex, Index
+from pandas.testing import assert_frame_equal
+from scipy.spatial import cKDTree
+
+from albatross.cache import PointCache, load_tree, save_tree
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PointCache(str(tmp_path))
+
+
+def test_PointCache_invalid_max_size(tmp_path):
+    """Test invalid `max_size` inputs for `PointCache`."""
+    with pytest.raises(AssertionError) as e:
+        PointCache(str(tmp_path), max_size=0)
+
+    msg = '"max_size" must be a positive int'
+    assert str(e.value) == msg
+
+
+def test_PointCache_invalid_data(cache):
+    """Test invalid `data` inputs for `PointCache.put`."""
+    with pytest.raises(AssertionError) as e:
+        cache.put(cache.make_key('bad'), [1, 2, 3])
+
+    msg = '"data" must be a DataFrame'
+    assert str(e.value) == msg
+
+
+def test_PointCache(cache):
+    """Test storing and retrieving entries with `PointCache`."""
+    key = cache.make_key('/nrel/wtk/conus/wtk_conus_2012.h5', 42, 'windspeed_100m', None, True)
+
+    assert cache.get(key) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    index = DatetimeIndex(['2012-01-01 00:00', '2012-01-01 01:00'], tz='UTC',
+                          name='time_index')
+    data = DataFrame({
+        'windspeed_100m': np.array([7.25, 6.5], dtype=np.float32),
+        'state': ['Rhode Island', 'Rhode Island'],
+    }, index=index)
+
+    cache.put(key, data)
+
+    assert_frame_equal(cache.get(key), data)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # a time index on its own
+    key = cache.make_key('time_index')
+    data = DataFrame(index=Index(index, name='time_index'))
+
+    cache.put(key, data)
+
+    assert (cache.get(key).index == index).all()
+
+    cache.clear()
+
+    assert cache.size == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_PointCache_eviction(tmp_path):
+    """Test that `PointCache` evicts the least recently used entries."""
+    data = DataFrame({'x': np.random.default_rng(0).random(1000)})
+
+    cache = PointCache(str(tmp_path), max_size=10**9)
+    cache.put('a', data)
+    entry_size = cache.size
+
+    cache.max_size = 2 * entry_size
+    cache.put('b', data)
+
+    # make `a` the most recently used entry
+    os.utime(cache._path('b'), (0, 0))
+    assert cache.get('a') is not None
+
+    cache.put('c', data)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert cache.size <= cache.max_size
+
+
+def test_PointCache_overwrite(tmp_path):
+    """Test that overwriting an entry doesn't count it towards the size twice."""
+    cache = PointCache(str(tmp_path))
+    data = DataFrame({'a': np.arange(1000.0)})
+
+    cache.put('a', data)
+    size = cache.size
+
+    for _ in range(3):
+        cache.put('a', data)
+
+    with cache._lock():
+        assert cache._tracked_size() == size == cache.size
+
+
+def test_PointCache_shared_size(tmp_path):
+    """Test that instances sharing a directory share its size cap."""
+    caches = [PointCache(str(tmp_path)) for _ in range(4)]
+    data = DataFrame({'a': np.random.default_rng(0).random(1000)})
+
+    caches[0].put('first', data)
+    entry_size = caches[0].size
+
+    for cache in caches:
+        cache.max_size = 3 * entry_size
+
+    for i in range(12):
+        caches[i % 4].put('key_%s' % i, data)
+
+        assert caches[0].size <= 3 * entry_size
+
+
+def test_PointCache_counters_threads(tmp_path):
+    """Test that hits and misses are counted correctly from many threads."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = PointCache(str(tmp_path))
+    cache.put('a', DataFrame({'a': [1.0]}))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: cache.get('a' if i % 2 else 'b'), range(200)))
+
+    assert (cache.hits, cache.misses) == (100, 100)
+
+
+def test_load_tree(tmp_path):
+    """Test that `load_tree` unpickles a tree once, until its file is rewritten."""
+    path = str(tmp_path / 'tree.pkl')
+    save_tree(cKDTree(np.array([[0.0, 0.0], [1.0, 1.0]])), path)
+
+    tree = load_tree(path)
+
+    assert load_tree(path) is tree
+    assert tree.query((0.9, 0.9))[1] == 1
+
+    save_tree(cKDTree(np.array([[1.0, 1.0], [0.0, 0.0]])), path)
+    os.utime(path, ns=(0, 0))
+
+    assert load_tree(path) is not tree
+    assert load_tree(path).query((0.9, 0.9))[1] == 0
@@ -1,6 +1,7 @@
 import pytest
+from pandas import Timedelta, Timestamp
 
-from albatross import WindTurbine, RequestParams
+from albatross import WindTurbine, RequestParams, RequestPlan
 
 
 def test_WindTurbine_invalid_speed():
@@ -29,6 +30,7 @@ def test_WindTurbine():
     assert turbine.v_ref == 50
     assert turbine.v_ref_t == 57
     assert turbine.i_ref == 0.18
+    assert turbine.name == 'IA+'
 
 
 # Test RequestParams #
@@ -98,3 +100,105 @@ def test_RequestParams_register():
 
     assert len(rp.params) == 4
     assert rp.params[3] == 'inversemoninobukhovlength_2m'
+
+
+def test_RequestParams_plan():
+    """Test that `plan` plans a request of the registered params."""
+    rp = RequestParams()
+
+    rp.register('wind_speed', heights=[90, 100])
+    rp.register('pressure', heights=[100])
+
+    plan = rp.plan('conus', 2012, sites=2)
+
+    assert type(plan) == RequestPlan
+    assert plan.params == ['windspeed_90m', 'windspeed_100m', 'pressure_100m']
+    assert plan.sites == 2
+
+
+# Test RequestPlan #
+
+def test_RequestPlan_invalid():
+    """Test invalid `RequestPlan` inputs."""
+    with pytest.raises(AssertionError) as e:
+        RequestPlan(['windspeed_100m'], 'conus', 2012, sites=0)
+
+    assert str(e.value) == '"sites" must be a positive int'
+
+    with pytest.raises(AssertionError) as e:
+        RequestPlan(['bad'], 'conus', 2012)
+
+    assert str(e.value) == 'dataset not found: bad'
+
+    with pytest.raises(AssertionError) as e:
+        RequestPlan(['windspeed_100m'], 'conus', 2020)
+
+    assert str(e.value) == 'year 2020 not available for region: conus'
+
+
+def test_RequestPlan():
+    """Test that `RequestPlan` dedupes params, and groups them by stored dataset."""
+    params = ['windspeed_90m', 'windspeed_100m', 'windspeed_90m', 'pressure_150m', 'meta']
+    plan = RequestPlan(params, 'conus', [2012, 2013], sites=3)
+
+    assert plan.params == ['windspeed_90m', 'windspeed_100m', 'pressure_150m', 'meta']
+    assert plan.files == ['/nrel/wtk/conus/wtk_conus_2012.h5',
+                          '/nrel/wtk/conus/wtk_conus_2013.h5']
+    assert plan.datasets == {
+        'windspeed_80m': ['windspeed_90m'],
+        'windspeed_100m': ['windspeed_90m', 'windspeed_100m'],
+        'pressure_100m': ['pressure_150m'],
+        'pressure_200m': ['pressure_150m'],
+    }
+
+    assert plan.rows == 8784 + 8760
+    assert plan.bytes == plan.rows * 3 * 4 * 2
+    assert plan.calls == 2 * (4 + 2)
+    assert plan.summary()['bytes'] == plan.bytes
+
+
+def test_RequestPlan_time_window():
+    """Test `RequestPlan` estimates for a time window and chunked reads."""
+    plan = RequestPlan(['windspeed_100m'], 'conus', 2012, resolution='5min',
+                       start='2012-06-01', end='2012-06-30 23:55', chunk_rows=2000)
+
+    assert plan.files == ['/nrel/wtk/conus-5min/wtk_conus_2012.h5']
+    assert plan.rows == 30 * 24 * 12
+    assert plan.calls == 5 + 2
+
+
+def test_RequestPlan_check():
+    """Test that `check` rejects requests over budget."""
+    plan = RequestPlan(['windspeed_100m'], 'conus', 2012)
+
+    plan.check(max_bytes=plan.bytes, max_calls=plan.calls)
+
+    with pytest.raises(AssertionError) as e:
+        plan.check(max_bytes=1000)
+
+    msg = 'request of 17568 bytes exceeds "max_bytes" (1000), see `RequestPlan.split`'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        plan.check(max_calls=1)
+
+    assert str(e.value) == 'request of 3 calls exceeds "max_calls" (1)'
+
+
+def test_RequestPlan_split():
+    """Test that `split` covers the request with plans under budget."""
+    plan = RequestPlan(['windspeed_90m'], 'conus', [2012, 2013], sites=10)
+
+    plans = plan.split(100000)
+
+    assert sum(p.rows for p in plans) == plan.rows
+    assert all(p.bytes <= 100000 for p in plans)
+    assert [p.years for p in plans[:2]] == [[2012], [2012]]
+    assert plans[0].start == Timestamp('2012-01-01', tz='UTC')
+    assert plans[1].start == plans[0].end + Timedelta(hours=1)
+    assert plans[-1].end == Timestamp('2013-12-31 23:00', tz='UTC')
+
+    with pytest.raises(AssertionError) as e:
+        plan.split(10)
+
+    assert str(e.value) == 'a single time step (40 bytes) exceeds "max_bytes"'
@@ -0,0 +1,146 @@
+import os
+
+import h5py
+import numpy as np
+import pytest
+from rex import WindX
+from scipy.spatial import cKDTree
+
+from albatross import TESTDATADIR
+from albatross.mirror import (_mirror_file, find_mirror, get_mirror_gids, get_mirror_path,
+                              mirror_wtk_data)
+from albatross.requests import build_wtk_filepath, read_wtk_point_data, request_wtk_point_data
+
+source = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+wtk_file = build_wtk_filepath('conus', 2012)
+lat_lon = (41.96364, -71.79364)
+gid = 57
+gids = [56, 57, 58, 77]
+
+
+@pytest.fixture
+def mirror_dir(tmp_path):
+    """A mirror of part of the test file, standing in for the conus 2012 file."""
+    path = get_mirror_path(wtk_file, str(tmp_path))
+    _mirror_file(source, path, ['windspeed_90m', 'pressure_0m'], gids=gids, hsds=False)
+
+    return str(tmp_path)
+
+
+def test_mirror_wtk_data_invalid_years():
+    """Test invalid `years` inputs for `mirror_wtk_data`."""
+    with pytest.raises(AssertionError) as e:
+        mirror_wtk_data('conus', 2012, ['windspeed_100m'])
+
+    assert str(e.value) == '"years" must be a list, tuple or range'
+
+
+def test_mirror_file(mirror_dir):
+    """Test that a mirrored file holds the requested subset of the source file."""
+    path = get_mirror_path(wtk_file, mirror_dir)
+
+    assert path == os.path.join(mirror_dir, 'nrel', 'wtk', 'conus', 'wtk_conus_2012.h5')
+    assert (get_mirror_gids(path) == gids).all()
+
+    with WindX(source) as f, WindX(path) as m:
+        assert set(m.datasets) >= {'pressure_0m', 'windspeed_100m', 'windspeed_80m'}
+        assert 'windspeed_90m' not in m.datasets
+        assert (m.time_index == f.time_index).all()
+        assert (m.lat_lon == f.lat_lon[gids]).all()
+        assert (m['windspeed_100m'] == f['windspeed_100m', :, gids]).all()
+
+
+def test_mirror_file_gids(mirror_dir):
+    """Test that a mirror can not be extended with different gids."""
+    path = get_mirror_path(wtk_file, mirror_dir)
+
+    with pytest.raises(AssertionError) as e:
+        _mirror_file(source, path, ['pressure_0m'], gids=[1, 2], hsds=False)
+
+    msg = 'mirror of %s holds different gids, use overwrite=True' % source
+    assert str(e.value) == msg
+
+    _mirror_file(source, path, ['pressure_0m'], gids=[1, 2], overwrite=True, hsds=False)
+
+    assert (get_mirror_gids(path) == [1, 2]).all()
+
+
+def test_mirror_file_resume(mirror_dir):
+    """Test that an interrupted mirror resumes from where it left off."""
+    path = get_mirror_path(wtk_file, mirror_dir)
+
+    with h5py.File(path, 'a') as h:
+        h['pressure_0m'][2000:] = 0
+        h['pressure_0m'].attrs['mirrored_rows'] = 2000
+
+    assert find_mirror(wtk_file, gid, ['pressure_0m'], mirror_dir) is None
+
+    _mirror_file(source, path, ['pressure_0m'], gids=gids, hsds=False)
+
+    assert find_mirror(wtk_file, gid, ['pressure_0m'], mirror_dir) == path
+
+    with WindX(source, unscale=False) as f, h5py.File(path, 'r') as h:
+        assert (h['pressure_0m'][...] == f['pressure_0m', :, gids]).all()
+
+
+def test_find_mirror(mirror_dir):
+    """Test that `find_mirror` only returns mirrors holding the requested data."""
+    path = get_mirror_path(wtk_file, mirror_dir)
+
+    assert find_mirror(wtk_file, gid, ['windspeed_90m', 'pressure_0m'], mirror_dir) == path
+
+    # gid not mirrored
+    assert find_mirror(wtk_file, 0, ['pressure_0m'], mirror_dir) is None
+
+    # dataset not mirrored
+    assert find_mirror(wtk_file, gid, ['pressure_100m'], mirror_dir) is None
+    assert find_mirror(wtk_file, gid, ['temperature_90m'], mirror_dir) is None
+
+    # file not mirrored
+    assert find_mirror(build_wtk_filepath('conus', 2011), gid, ['pressure_0m'],
+                       mirror_dir) is None
+
+
+def test_request_wtk_point_data_mirror(mirror_dir):
+    """Test that `request_wtk_point_data` reads mirrored data without HSDS."""
+    params = ['windspeed_90m', 'pressure_0m']
+
+    with WindX(source) as f:
+        tree = cKDTree(f.lat_lon)
+
+    data, meta = request_wtk_point_data(lat_lon, 2012, params, region='conus', tree=tree,
+                                        mirror=mirror_dir)
+    expected, expected_meta = read_wtk_point_data(source, lat_lon, params)
+
+    assert np.allclose(data.values, expected.values)
+    assert (data.index == expected.index).all()
+    assert list(meta.index) == gids
+    assert meta.loc[gid].equals(expected_meta.loc[gid])
+
+
+def test_request_wtk_point_data_mirror_years(tmp_path):
+    """Test that mirrors holding different gids in each year read the requested site."""
+    params = ['windspeed_100m']
+    subsets = {2012: [0, 57, 150], 2013: [57, 99]}
+
+    for year, year_gids in subsets.items():
+        path = get_mirror_path(build_wtk_filepath('conus', year), str(tmp_path))
+        _mirror_file(source, path, params, gids=year_gids, hsds=False)
+
+    with WindX(source) as f:
+        tree = cKDTree(f.lat_lon)
+
+    expected, _ = read_wtk_point_data(source, lat_lon, params)
+
+    for year in subsets:
+        data, meta = request_wtk_point_data(lat_lon, year, params, region='conus', tree=tree,
+                                            mirror=str(tmp_path))
+
+        assert np.allclose(data.values, expected.values)
+        assert list(meta.index) == subsets[year]
+
+    data, _ = request_wtk_point_data(lat_lon, None, params, years=[2012, 2013],
+                                     region='conus', tree=tree, mirror=str(tmp_path))
+
+    # both years stand in with the same time index, so their rows are interleaved
+    assert np.allclose(data.values, np.repeat(expected.values, 2, axis=0))
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from albatross import TESTDATADIR
+from albatross.pool import HandlePool
+
+path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+
+
+def test_handle_pool_invalid_args():
+    """Test invalid inputs for `HandlePool`."""
+    with pytest.raises(AssertionError) as e:
+        HandlePool(max_size=0)
+
+    assert str(e.value) == '"max_size" must be a positive int'
+
+    with pytest.raises(AssertionError) as e:
+        HandlePool(idle_timeout='bad')
+
+    assert str(e.value) == '"idle_timeout" must be a positive number'
+
+
+def test_handle_pool_reuse():
+    """Test that handles are reused, keyed by path and open arguments."""
+    pool = HandlePool()
+
+    with pool.handle(path, hsds=False) as f:
+        first = f
+
+    with pool.handle(path, hsds=False) as f:
+        assert f is first
+
+    with pool.handle(path, hsds=False, unscale=False) as f:
+        assert f is not first
+
+    assert (pool.hits, pool.misses) == (1, 2)
+    assert len(pool) == 2
+
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_handle_pool_exclusive():
+    """Test that a checked out handle is never handed out twice."""
+    pool = HandlePool()
+
+    with pool.handle(path, hsds=False) as f1:
+        with pool.handle(path, hsds=False) as f2:
+            assert f1 is not f2
+
+    assert len(pool) == 2
+
+
+def test_handle_pool_limits():
+    """Test that idle handles are closed beyond `max_size` or after `idle_timeout`."""
+    pool = HandlePool(max_size=1, idle_timeout=0.05)
+
+    with pool.handle(path, hsds=False):
+        with pool.handle(path, hsds=False):
+            pass
+
+    assert len(pool) == 1
+
+    time.sleep(0.1)
+
+    with pool.handle(path, hsds=False, unscale=False):
+        pass
+
+    assert len(pool) == 1
+    assert pool.misses == 3
+
+
+def test_handle_pool_reaper():
+    """Test that idle handles expire even if the pool isn't used again."""
+    pool = HandlePool(idle_timeout=0.05)
+
+    with pool.handle(path, hsds=False) as f:
+        pass
+
+    closed = []
+    close = f.close
+    f.close = lambda: closed.append(f) or close()
+
+    time.sleep(0.3)
+
+    assert closed == [f]
+    assert pool._idle == []
+
+    pool.close()
+
+
+def test_handle_pool_error():
+    """Test that a handle is discarded if an error is raised while it is in use."""
+    pool = HandlePool()
+
+    with pytest.raises(RuntimeError):
+        with pool.handle(path, hsds=False):
+            raise RuntimeError('bad read')
+
+    assert len(pool) == 0
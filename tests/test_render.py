@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from matplotlib import pyplot as plt
+
+from albatross import TESTDATADIR
+from albatross import render
+from albatross.render import render_plots
+from albatross.requests import read_wtk_point_data
+
+
+@pytest.fixture
+def sites():
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m', 'winddirection_100m']
+
+    data, _ = read_wtk_point_data(path, lat_lon, params)
+
+    return {'site_a': data, 'site_b': data.iloc[:4392]}
+
+
+def test_render_plots_invalid(sites, tmp_path):
+    """Test invalid `render_plots` inputs."""
+    with pytest.raises(AssertionError) as e:
+        render_plots([], str(tmp_path))
+
+    assert str(e.value) == '"sites" must be a dict'
+
+    with pytest.raises(AssertionError) as e:
+        render_plots(sites, str(tmp_path), plots=['bad'])
+
+    assert str(e.value) == 'plot "bad" not found'
+
+    with pytest.raises(AssertionError) as e:
+        render_plots(sites, str(tmp_path), fmt='jpg')
+
+    assert str(e.value) == '"fmt" must be one of (\'png\', \'svg\')'
+
+    with pytest.raises(AssertionError) as e:
+        render_plots({'../site_a': sites['site_a']}, str(tmp_path))
+
+    assert str(e.value) == "site name must be a file name, without path separators: '../site_a'"
+
+
+def test_render_plots(sites, tmp_path):
+    """Test that `render_plots` writes every plot without leaking pyplot figures."""
+    figures = plt.get_fignums()
+
+    paths = render_plots(sites, str(tmp_path), plots=['boxplot', 'windrose', 'pdf', 'diurnal'],
+                         max_workers=1)
+
+    assert list(paths) == ['site_a', 'site_b']
+    assert paths['site_a']['pdf'] == os.path.join(str(tmp_path), 'site_a_pdf.png')
+
+    for site in paths.values():
+        for path in site.values():
+            with open(path, 'rb') as f:
+                assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    assert plt.get_fignums() == figures
+
+
+def test_render_plots_error(sites, tmp_path):
+    """Test that a failed plot doesn't leave its artists on the reused figure."""
+    bad = sites['site_a'].rename(columns={'windspeed_100m': 'speed'})
+
+    with pytest.raises(AssertionError):
+        render_plots({'bad': bad}, str(tmp_path), plots=['diurnal'], max_workers=1)
+
+    assert render._FIGURES['diurnal'].axes == []
+
+    paths = render_plots(sites, str(tmp_path), plots=['diurnal'], max_workers=1)
+
+    assert os.path.exists(paths['site_a']['diurnal'])
+
+
+def test_render_plots_pool(sites, tmp_path):
+    """Test rendering SVGs on a process pool."""
+    paths = render_plots(sites, str(tmp_path), plots=['diurnal'], fmt='svg', max_workers=2)
+
+    assert sorted(os.listdir(str(tmp_path))) == ['site_a_diurnal.svg', 'site_b_diurnal.svg']
+    assert paths['site_b']['diurnal'].endswith('.svg')
@@ -1,12 +1,27 @@
 import os
+import shutil
+from datetime import datetime
 
+import numpy as np
 import pytest
-from pandas import DataFrame
+import pandas as pd
+from pandas import DataFrame, Timestamp
+from rex import WindX
+from scipy.spatial import cKDTree
 
 from albatross import TESTDATADIR
+from albatross.cache import (PointCache, get_coordinates_path, get_tree_path, save_array,
+                             save_tree)
+from albatross.classes import RequestPlan
+from albatross.pool import HandlePool
 from albatross.requests import (request_wtk_point_data, get_regions,
                                 build_wtk_filepath, read_wtk_point_data,
-                                identify_regions)
+                                identify_regions, read_wtk_multi_point_data,
+                                request_wtk_multi_point_data, build_wtk_tree,
+                                read_wtk_box_data, request_wtk_box_data,
+                                iter_wtk_point_data, _iter_point_data, _read_point_data,
+                                identify_regions_many, build_wtk_coordinates,
+                                _height_sources, _interpolate_height, _iter_columns)
 
 from albatross.utils import _load_wtk
 
@@ -79,6 +94,36 @@ def test_identify_regions():
         assert region in identify_regions((mid_lat, mid_lon))
 
 
+def test_identify_regions_many_invalid_lat_lons():
+    """Test invalid `lat_lons` inputs for `identify_regions_many`."""
+    with pytest.raises(AssertionError) as e:
+        identify_regions_many(np.zeros((3, 3)))
+
+    assert str(e.value) == 'lat_lons must have a shape of (N, 2)'
+
+
+def test_identify_regions_many():
+    """Test that `identify_regions_many` matches `identify_regions` for every point."""
+    wtk = _load_wtk()
+    lat_lons = [lat_lon, (49.3556, -65.7146), (1000.0, 1000.0)]
+
+    for region in wtk:
+        (lat_min, lat_max), (lon_min, lon_max) = wtk[region]['lat_lon_range']
+        lat_lons += [(float(lat_min), float(lon_min)), (float(lat_max), float(lon_max))]
+
+    membership = identify_regions_many(lat_lons)
+
+    assert membership.shape == (len(lat_lons), len(wtk))
+    assert list(membership.columns) == list(wtk)
+    assert not membership.iloc[2].any()
+
+    for i, point in enumerate(lat_lons):
+        regions = list(membership.columns[membership.iloc[i]])
+
+        if regions:
+            assert regions == identify_regions(point)
+
+
 # Test `build_wtk_filepath` #
 
 
@@ -228,6 +273,47 @@ def test_request_wtk_point_data_invalid_params():
     assert str(e.value) == msg
 
 
+def test_request_wtk_point_data_invalid_years():
+    """Test invalid `year`/`years` inputs for `request_wtk_point_data`."""
+    msg = 'exactly one of "year" or "years" must be provided'
+
+    # both provided
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, 2010, params, years=[2010, 2011])
+
+    assert str(e.value) == msg
+
+    # neither provided
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, None, params)
+
+    assert str(e.value) == msg
+
+    # wrong type
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, None, params, years=2010)
+
+    assert str(e.value) == '"years" must be a list, tuple or range'
+
+    # empty
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, None, params, years=[])
+
+    assert str(e.value) == '"years" must not be empty'
+
+    # no years inside of the time window
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, None, params, years=[2010, 2011], start='2013-01-01')
+
+    assert str(e.value) == 'none of "years" fall between "start" and "end"'
+
+    # a year outside of the region's range
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, None, params, years=range(2013, 2016))
+
+    assert str(e.value) == 'year 2015 not available for region: conus'
+
+
 def test_request_wtk_point_data_multi_region():
     """
     Test that `request_wtk_point_data` requires user to explicitly specify `region`
@@ -245,6 +331,14 @@ def test_request_wtk_point_data_multi_region():
     assert str(e.value) == msg
 
 
+def test_request_wtk_point_data_invalid_pool():
+    """Test invalid `pool` inputs for `request_wtk_point_data`."""
+    with pytest.raises(AssertionError) as e:
+        request_wtk_point_data(lat_lon, 2012, params, pool='bad')
+
+    assert str(e.value) == '"pool" must be a HandlePool or bool'
+
+
 # Test `read_wtk_point_data` #
 
 
@@ -328,3 +422,641 @@ def test_read_wtk_point_data():
     assert data.loc['2012-01-01 00:00:00']['windspeed_100m'] == 7.25
     assert len(meta) == 200
     assert len(meta.columns[:]) == 8
+
+
+def test_read_wtk_point_data_multiple_params():
+    """Tests `read_wtk_point_data` with several params read in a single pass."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m', 'winddirection_100m', 'windspeed_90m', 'pressure_0m']
+
+    data, meta = read_wtk_point_data(path, lat_lon, params)
+
+    assert list(data.columns) == params
+    assert len(meta) == 200
+
+    for param in params:
+        single, _ = read_wtk_point_data(path, lat_lon, [param])
+        assert (data[param] == single[param]).all()
+
+    # raw values are returned as integers when not unscaled
+    data, _ = read_wtk_point_data(path, lat_lon, params[:2], unscale=False)
+
+    assert data['windspeed_100m'].dtype.kind == 'i'
+
+
+def test_height_sources():
+    """Tests that only the stored heights nearest to a param are read."""
+    datasets = ['windspeed_80m', 'windspeed_100m', 'pressure_0m', 'pressure_100m',
+                'pressure_200m', 'meta']
+
+    assert _height_sources('windspeed_100m', datasets) == [('windspeed_100m', None)]
+    assert _height_sources('windspeed_90m', datasets) == [('windspeed_80m', 80),
+                                                          ('windspeed_100m', 100)]
+    assert _height_sources('pressure_150m', datasets) == [('pressure_100m', 100),
+                                                          ('pressure_200m', 200)]
+
+    # extrapolated from the two nearest heights
+    assert _height_sources('pressure_300m', datasets) == [('pressure_100m', 100),
+                                                          ('pressure_200m', 200)]
+    assert _height_sources('windspeed_40m', datasets) == [('windspeed_80m', 80),
+                                                          ('windspeed_100m', 100)]
+
+    assert _height_sources('temperature_90m', datasets) is None
+    assert _height_sources('windspeed', datasets) is None
+
+    # a single stored height is never substituted for another
+    assert _height_sources('temperature_90m', ['temperature_100m']) is None
+
+
+def test_interpolate_height():
+    """Tests `_interpolate_height` for each kind of variable."""
+    ws_80, ws_100 = np.array([5.0, 8.0]), np.array([6.0, 8.0])
+    alpha = np.log(6 / 5) / np.log(100 / 80)
+
+    ws_90 = _interpolate_height('windspeed', ws_80, 80, ws_100, 100, 90)
+    assert np.allclose(ws_90, [5 * (90 / 80) ** alpha, 8])
+
+    # extrapolated shear is limited, from the nearer height
+    ws_200 = _interpolate_height('windspeed', np.array([5.0]), 80, np.array([10.0]), 100, 200)
+    assert np.allclose(ws_200, 10 * (200 / 100) ** 0.6)
+
+    ws_40 = _interpolate_height('windspeed', np.array([5.0]), 80, np.array([10.0]), 100, 40)
+    assert np.allclose(ws_40, 5 * (40 / 80) ** 0.6)
+
+    # which stays continuous at the stored heights
+    ws_100 = _interpolate_height('windspeed', np.array([5.0]), 80, np.array([10.0]), 100,
+                                 100 + 1e-9)
+    assert np.allclose(ws_100, 10)
+
+    p_50 = _interpolate_height('pressure', np.array([100000.0]), 0, np.array([98000.0]), 100,
+                               50)
+    assert np.allclose(p_50, np.sqrt(100000.0 * 98000.0))
+
+    wd_90 = _interpolate_height('winddirection', np.array([350.0, 10.0]), 80,
+                                np.array([20.0, 30.0]), 100, 90)
+    assert np.allclose(wd_90, [5, 20])
+
+    t_90 = _interpolate_height('temperature', np.array([10.0]), 80, np.array([12.0]), 100, 90)
+    assert np.allclose(t_90, 11)
+
+
+def test_read_wtk_point_data_interpolated():
+    """Tests that interpolated heights only read their two nearest stored heights."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_90m', 'winddirection_90m', 'pressure_150m']
+
+    data, _ = read_wtk_point_data(path, lat_lon, params)
+
+    with WindX(path) as f:
+        p_100, p_200 = f['pressure_100m', :, 57], f['pressure_200m', :, 57]
+        ws_80, ws_100 = f['windspeed_80m', :, 57], f['windspeed_100m', :, 57]
+
+    assert np.allclose(data['pressure_150m'], np.sqrt(p_100 * p_200))
+
+    # bounded by the stored heights
+    assert (data['windspeed_90m'] >= np.minimum(ws_80, ws_100) - 1e-6).all()
+    assert (data['windspeed_90m'] <= np.maximum(ws_80, ws_100) + 1e-6).all()
+    assert ((data['winddirection_90m'] >= 0) & (data['winddirection_90m'] < 360)).all()
+
+    # raw values are interpolated in physical units, and scaled back
+    raw, _ = read_wtk_point_data(path, lat_lon, ['pressure_150m'], unscale=False)
+    assert np.allclose(raw['pressure_150m'] / 0.1, data['pressure_150m'])
+
+
+def test_iter_columns():
+    """Tests that each stored dataset is read once, and only held while it is needed."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    params = ['windspeed_100m', 'windspeed_90m', 'temperature_80m']
+
+    class Spy:
+        """Records the datasets read from a `WindX` handle."""
+        def __init__(self, f):
+            self.f, self.datasets, self.reads = f, f.datasets, []
+
+        def __getitem__(self, keys):
+            self.reads.append(keys[0])
+
+            return self.f[keys]
+
+    with WindX(path) as f:
+        spy = Spy(f)
+        columns = _iter_columns(spy, params, slice(None), 57)
+
+        param, values = next(columns)
+        assert param == 'windspeed_100m'
+        assert spy.reads == ['windspeed_100m']
+        assert np.allclose(values, f['windspeed_100m', :, 57])
+
+        assert next(columns)[0] == 'windspeed_90m'
+        assert next(columns)[0] == 'temperature_80m'
+        assert spy.reads == ['windspeed_100m', 'windspeed_80m', 'temperature_80m']
+
+
+def test_read_wtk_point_data_single_height(tmp_path):
+    """Tests that a variable with one stored height is not interpolated from it."""
+    import h5py
+
+    path = str(tmp_path / 'wtk.h5')
+    shutil.copy(os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5'), path)
+
+    with h5py.File(path, 'a') as h5:
+        del h5['temperature_80m']
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, (41.96364, -71.79364), ['temperature_90m'])
+
+    msg = 'unable to interpolate temperature_90m: only one height of temperature is stored'
+    assert str(e.value) == msg
+
+
+def test_read_wtk_point_data_invalid_time_window():
+    """Test invalid `start`/`end` inputs for `read_wtk_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, lat_lon, params, start=2012)
+
+    msg = '"start" must be a datetime or string'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, lat_lon, params, end=2012)
+
+    msg = '"end" must be a datetime or string'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, lat_lon, params, start='2012-02-01', end='2012-01-01')
+
+    msg = '"start" must not be after "end"'
+    assert str(e.value) == msg
+
+
+def test_read_wtk_point_data_time_window():
+    """Tests `read_wtk_point_data` with a `start`/`end` time window."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m']
+
+    data, _ = read_wtk_point_data(path, lat_lon, params)
+
+    start, end = datetime(2012, 3, 1), datetime(2012, 3, 7, 23)
+    window, _ = read_wtk_point_data(path, lat_lon, params, start=start, end=end)
+
+    assert len(window) == 7 * 24
+    assert window.index[0] == Timestamp(start, tz='UTC')
+    assert window.index[-1] == Timestamp(end, tz='UTC')
+    assert window.equals(data.loc[window.index])
+
+    # open ended windows
+    window, _ = read_wtk_point_data(path, lat_lon, params, start='2012-12-31')
+    assert len(window) == 24
+
+    window, _ = read_wtk_point_data(path, lat_lon, params, end='2012-01-01 23:00')
+    assert len(window) == 24
+
+    # multi-point reads
+    window, _ = read_wtk_multi_point_data(path, [lat_lon], params, start=start, end=end)
+    assert len(window) == 7 * 24
+
+
+def test_read_wtk_point_data_invalid_cache():
+    """Test invalid `cache` inputs for `read_wtk_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, lat_lon, params, cache='bad')
+
+    msg = '"cache" must be a PointCache or bool'
+    assert str(e.value) == msg
+
+
+def test_read_wtk_point_data_cache(tmp_path):
+    """Tests `read_wtk_point_data` with a `PointCache`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m', 'winddirection_100m']
+    cache = PointCache(str(tmp_path))
+
+    data, meta = read_wtk_point_data(path, lat_lon, params)
+
+    # gid, meta, time index and each param
+    cached_data, cached_meta = read_wtk_point_data(path, lat_lon, params, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 5)
+
+    cached_data, cached_meta = read_wtk_point_data(path, lat_lon, params, cache=cache)
+    assert (cache.hits, cache.misses) == (5, 5)
+
+    assert cached_data.equals(data)
+    assert cached_meta.equals(meta)
+
+
+def test_read_point_data_pool():
+    """Test that pooled point reads reuse one handle and return the same data."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m']
+    pool = HandlePool()
+
+    expected, expected_meta = read_wtk_point_data(path, lat_lon, params)
+
+    for _ in range(2):
+        data, meta = _read_point_data(path, lat_lon, params, pool=pool, hsds=False)
+        assert data.equals(expected)
+        assert meta.equals(expected_meta)
+
+        # modifying the returned meta must not affect the pooled handle
+        meta['latitude'] = 0.0
+
+    assert (pool.hits, pool.misses) == (1, 1)
+
+
+def test_read_wtk_point_data_invalid_dtype():
+    """Test invalid `dtype` inputs for `read_wtk_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+
+    for dtype in ['bad', 'U10']:
+        with pytest.raises(AssertionError) as e:
+            read_wtk_point_data(path, (41.96364, -71.79364), params, dtype=dtype)
+
+        assert str(e.value) == '"dtype" must be a numeric dtype'
+
+    # unscaled values would be truncated
+    with pytest.raises(AssertionError) as e:
+        read_wtk_point_data(path, (41.96364, -71.79364), params, dtype='int16')
+
+    assert str(e.value) == 'an integer "dtype" requires keep_scaled=True (or unscale=False)'
+
+    data, _ = read_wtk_point_data(path, (41.96364, -71.79364), ['windspeed_100m'],
+                                  dtype='int32', keep_scaled=True)
+
+    assert data['windspeed_100m'].dtype == np.int32
+
+
+def test_read_wtk_point_data_compact(tmp_path):
+    """Test the `dtype` and `keep_scaled` options of `read_wtk_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m', 'windspeed_90m', 'pressure_0m']
+
+    expected, _ = read_wtk_point_data(path, lat_lon, params)
+
+    data, _ = read_wtk_point_data(path, lat_lon, params, dtype='float32')
+
+    assert (data.dtypes == np.float32).all()
+    assert np.allclose(data.values, expected.values, rtol=1e-6)
+
+    for cache in [None, PointCache(str(tmp_path))]:
+        data, _ = read_wtk_point_data(path, lat_lon, params, keep_scaled=True, cache=cache)
+
+        assert data['windspeed_100m'].dtype == np.int16
+        assert data.attrs['scale_factors'] == {
+            'windspeed_100m': 100.0, 'windspeed_90m': 100.0, 'pressure_0m': 0.1
+        }
+
+        for param, factor in data.attrs['scale_factors'].items():
+            assert np.allclose(data[param] / factor, expected[param])
+
+
+# Test `read_wtk_multi_point_data` #
+
+
+def test_read_wtk_multi_point_data_invalid_lat_lons():
+    """Test invalid `lat_lons` inputs for `read_wtk_multi_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_multi_point_data(path, 'bad', params)
+
+    msg = 'lat_lons must be a list, tuple or ndarray'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_multi_point_data(path, [], params)
+
+    msg = 'lat_lons must not be empty'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_multi_point_data(path, [(1.0, 2.0), (1.0,)], params)
+
+    msg = 'lat_lons must have a shape of (N, 2)'
+    assert str(e.value) == msg
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_multi_point_data(path, [('bad', 'bad')], params)
+
+    msg = 'lat/lon points must be floats'
+    assert str(e.value) == msg
+
+
+def test_read_wtk_multi_point_data():
+    """Tests `read_wtk_multi_point_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lons = [(41.96364, -71.79364), (41.6, -71.9), (41.96364, -71.79364)]
+    params = ['windspeed_100m', 'winddirection_100m']
+
+    data, meta = read_wtk_multi_point_data(path, lat_lons, params)
+
+    assert isinstance(data, DataFrame)
+    assert len(data) == 8784
+    assert list(data.columns.names) == ['site', 'param']
+    assert len(data.columns) == len(lat_lons) * len(params)
+    assert data.loc['2012-01-01 00:00:00'][(0, 'windspeed_100m')] == 7.25
+
+    assert len(meta) == len(lat_lons)
+    assert meta['gid'][0] == meta['gid'][2]
+
+    # each site matches a single point read
+    for site, lat_lon in enumerate(lat_lons):
+        point, _ = read_wtk_point_data(path, lat_lon, params)
+        assert (data[site].values == point.values).all()
+
+
+def test_request_wtk_multi_point_data_multi_region():
+    """
+    Test that `request_wtk_multi_point_data` requires a `region` if the points share
+    more than one region.
+    """
+    lat_lons = [(49.3556, -65.7146), (49.3556, -65.7146)]
+
+    with pytest.raises(AssertionError) as e:
+        request_wtk_multi_point_data(lat_lons, 2010, params, resolution='5min')
+
+    msg = (
+        'Multiple regions identified for the given lat/lon points: %s.\n'
+        'Please specify one using the `region` arg.'
+    ) % (['canada', 'conus'],)
+    assert str(e.value) == msg
+
+
+# Test streaming point data #
+
+
+def test_iter_wtk_point_data_invalid_freq():
+    """Test invalid `freq` inputs for `iter_wtk_point_data`."""
+    with pytest.raises(AssertionError) as e:
+        iter_wtk_point_data(lat_lon, 2012, params, freq=1)
+
+    assert str(e.value) == '"freq" must be a string'
+
+
+def test_iter_wtk_point_data_eager():
+    """Test that `iter_wtk_point_data` validates its arguments when it is called."""
+    with pytest.raises(AssertionError) as e:
+        iter_wtk_point_data(lat_lon, 2020, params, region='conus')
+
+    assert str(e.value) == 'year 2020 not available for region: conus'
+
+
+def test_iter_point_data():
+    """Test that streamed chunks are time ordered and match a single point read."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m', 'winddirection_100m']
+    start = Timestamp('2012-01-15 00:00', tz='UTC')
+
+    chunks = list(_iter_point_data([path], lat_lon, params, start=start))
+
+    # mid-January through December
+    assert len(chunks) == 12
+    assert all(data.index[0].day == 1 for data, _ in chunks[1:])
+
+    data = pd.concat([data for data, _ in chunks])
+    point, meta = read_wtk_point_data(path, lat_lon, params, start=start)
+
+    assert data.index.is_monotonic_increasing
+    assert data.equals(point)
+    assert chunks[0][1].equals(meta)
+
+
+def test_iter_point_data_close_early():
+    """Test that a partially consumed stream can be closed."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    stream = _iter_point_data([path], (41.96364, -71.79364), ['windspeed_100m'], freq='D')
+
+    data, _ = next(stream)
+    assert len(data) == 24
+
+    stream.close()
+
+
+# Test box data #
+
+
+def test_read_wtk_box_data_invalid_bbox():
+    """Test invalid `bbox` inputs for `read_wtk_box_data`."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+
+    for bbox in ['bad', [(41.6, -71.9)]]:
+        with pytest.raises(AssertionError) as e:
+            read_wtk_box_data(path, bbox, params)
+
+        assert str(e.value) == '"bbox" must be a pair of (lat, lon) corners'
+
+    with pytest.raises(AssertionError) as e:
+        read_wtk_box_data(path, [('bad', 'bad'), (41.6, -71.9)], params)
+
+    assert str(e.value) == 'lat/lon points must be floats'
+
+
+def test_read_wtk_box_data(tmp_path):
+    """Tests `read_wtk_box_data`, both in memory and memory-mapped."""
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    bbox = ((41.6, -71.9), (41.8, -71.7))
+    params = ['windspeed_100m', 'pressure_0m']
+
+    data, time_index, meta = read_wtk_box_data(path, bbox, params, start='2012-01-01 05:00')
+
+    assert data.shape == (len(time_index), len(meta), len(params))
+    assert len(time_index) == 8784 - 5
+    assert len(meta) > 1
+
+    with WindX(path) as f:
+        for i, param in enumerate(params):
+            assert np.allclose(data[:, :, i], f[param, 5:, list(meta.index)])
+
+    out = str(tmp_path / 'box.npy')
+    mapped, _, _ = read_wtk_box_data(path, bbox, params, out=out, start='2012-01-01 05:00')
+
+    assert isinstance(mapped, np.memmap)
+    assert (np.load(out, mmap_mode='r') == data).all()
+
+
+def test_request_wtk_box_data_multi_region():
+    """
+    Test that `request_wtk_box_data` requires a `region` if the bbox lies in more than
+    one region.
+    """
+    bbox = ((49.3556, -65.7146), (49.3556, -65.7146))
+
+    with pytest.raises(AssertionError) as e:
+        request_wtk_box_data(bbox, 2010, params, resolution='5min')
+
+    msg = (
+        'Multiple regions identified for the given bbox: %s.\n'
+        'Please specify one using the `region` arg.'
+    ) % (['canada', 'conus'],)
+    assert str(e.value) == msg
+
+
+def test_request_wtk_data_dry_run(tmp_path, monkeypatch):
+    """Test that dry runs return a `RequestPlan` without reading anything."""
+    monkeypatch.setenv('ALBATROSS_CACHE_DIR', str(tmp_path))
+
+    plan = request_wtk_point_data(lat_lon, None, ['windspeed_90m', 'windspeed_90m'],
+                                  region='conus', years=range(2007, 2015),
+                                  start='2012-01-01', dry_run=True)
+
+    assert type(plan) == RequestPlan
+    assert plan.years == [2012, 2013, 2014]
+    assert plan.params == ['windspeed_90m']
+    assert plan.sites == 1
+
+    lat_lons = [(41.96, -71.79), (41.96, -71.79), (41.5, -71.5)]
+    plan = request_wtk_multi_point_data(lat_lons, 2012, params, region='conus',
+                                        dry_run=True)
+
+    assert plan.sites == 2
+
+    with WindX(os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')) as f:
+        coordinates = f.lat_lon
+        gids = f.box_gids((41.8, -71.9), (42.0, -71.5))
+
+    save_array(coordinates, get_coordinates_path('conus'))
+
+    plan = request_wtk_box_data(((42.0, -71.5), (41.8, -71.9)), 2012, params,
+                                region='conus', dry_run=True)
+
+    assert plan.sites == len(gids)
+    assert plan.bytes == 8784 * len(gids) * 2 * 2
+
+
+# Test `build_wtk_tree` #
+
+
+def test_build_wtk_tree_invalid_region():
+    """Test invalid `region` inputs for `build_wtk_tree`."""
+    with pytest.raises(AssertionError) as e:
+        build_wtk_tree('namek')
+
+    assert str(e.value) == 'region not found: namek'
+
+
+def test_build_wtk_tree_cached(tmp_path, monkeypatch):
+    """Test that `build_wtk_tree` reuses a tree that is already cached."""
+    monkeypatch.setenv('ALBATROSS_CACHE_DIR', str(tmp_path))
+
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    with WindX(path) as f:
+        tree = cKDTree(f.lat_lon)
+
+    save_tree(tree, get_tree_path('conus-5min'))
+
+    tree_path = build_wtk_tree('conus', resolution='5min')
+
+    assert tree_path == os.path.join(str(tmp_path), 'trees', 'conus-5min_tree.pkl')
+
+    # the cached tree can be used to read data
+    data, _ = read_wtk_point_data(path, lat_lon, params, tree=tree_path)
+    expected, _ = read_wtk_point_data(path, lat_lon, params)
+
+    assert data.equals(expected)
+
+
+# Test `build_wtk_coordinates` #
+
+
+def test_build_wtk_coordinates_invalid_region():
+    """Test invalid `region` inputs for `build_wtk_coordinates`."""
+    with pytest.raises(AssertionError) as e:
+        build_wtk_coordinates('namek')
+
+    assert str(e.value) == 'region not found: namek'
+
+
+def test_identify_regions_cached_coordinates(tmp_path, monkeypatch):
+    """Test that `identify_regions` memory-maps coordinates that are already cached."""
+    monkeypatch.setenv('ALBATROSS_CACHE_DIR', str(tmp_path))
+
+    with WindX(os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')) as f:
+        coordinates = f.lat_lon
+
+    save_array(coordinates, get_coordinates_path('conus'))
+
+    assert build_wtk_coordinates('conus') == os.path.join(
+        str(tmp_path), 'coordinates', 'conus.npy')
+
+    regions = identify_regions(lat_lon, coordinates=True)
+
+    assert list(regions[0]) == ['conus']
+    assert isinstance(regions[0]['conus'], np.memmap)
+    assert (regions[0]['conus'] == coordinates).all()
+
+
+@pytest.fixture
+def local_region(tmp_path, monkeypatch):
+    """Registers `ri_local`, a region of local copies of the fixture for 2012 and 2013."""
+    from albatross.utils import clear_catalogs, register_catalog
+
+    monkeypatch.setenv('ALBATROSS_CACHE_DIR', str(tmp_path / 'cache'))
+
+    root = tmp_path / 'wtk'
+    (root / 'ri_local').mkdir(parents=True)
+
+    for year in (2012, 2013):
+        shutil.copy(os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5'),
+                    root / 'ri_local' / ('ri_%s.h5' % year))
+
+    register_catalog({
+        'ri_local': {
+            'year_range': [2012, 2013],
+            'resolutions': ['hourly'],
+            'lat_lon_range': [[41.0, 42.5], [-72.0, -71.0]],
+            'base': 'ri',
+            'root': str(root) + '/',
+            'hsds': False,
+        },
+    })
+
+    yield 'ri_local'
+
+    clear_catalogs()
+
+
+def test_request_wtk_point_data_local_region(local_region):
+    """Tests requesting point data from a registered region of local files."""
+    lat_lon = (41.96364, -71.79364)
+    expected, _ = read_wtk_point_data(os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5'),
+                                      lat_lon, ['windspeed_100m'])
+
+    data, meta = request_wtk_point_data(lat_lon, 2012, ['windspeed_100m'],
+                                        region=local_region, pool=False, mirror=False)
+
+    pd.testing.assert_frame_equal(data, expected)
+
+
+def test_request_wtk_data_explicit_pool(local_region):
+    """Tests that the public request functions use an explicit (empty) `HandlePool`."""
+    lat_lon = (41.96364, -71.79364)
+    params = ['windspeed_100m']
+    pool = HandlePool()
+
+    for _ in range(2):
+        request_wtk_point_data(lat_lon, 2012, params, region=local_region, pool=pool,
+                               mirror=False)
+
+    assert (pool.hits, pool.misses) == (1, 1)
+
+    request_wtk_multi_point_data([lat_lon], 2012, params, region=local_region, pool=pool)
+    list(iter_wtk_point_data(lat_lon, 2012, params, region=local_region, pool=pool))
+
+    assert (pool.hits, pool.misses) == (3, 1)
+
+    pool.close()
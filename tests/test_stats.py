@@ -0,0 +1,102 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from pandas import DataFrame, date_range
+from pandas.testing import assert_frame_equal
+
+from albatross import TESTDATADIR
+from albatross.analysis import get_diurnal_stats, get_diurnal_stats_many
+from albatross.requests import read_wtk_point_data
+from albatross.stats import DiurnalAccumulator
+
+
+@pytest.fixture
+def data():
+    path = os.path.join(TESTDATADIR, 'ri_100_wtk_2012.h5')
+    lat_lon = (41.96364, -71.79364)
+
+    res, meta = read_wtk_point_data(path, lat_lon, ['windspeed_80m', 'windspeed_100m'])
+
+    return res
+
+
+def test_DiurnalAccumulator_invalid(data):
+    """Test invalid `DiurnalAccumulator` inputs."""
+    with pytest.raises(AssertionError) as e:
+        DiurnalAccumulator(compression=10)
+
+    assert str(e.value) == '"compression" must be an int of at least 20'
+
+    acc = DiurnalAccumulator(fields=['bad'])
+
+    with pytest.raises(AssertionError) as e:
+        acc.update(data)
+
+    assert str(e.value) == 'column not found: bad'
+
+    with pytest.raises(AssertionError) as e:
+        DiurnalAccumulator().result()
+
+    assert str(e.value) == 'no data has been accumulated'
+
+    acc = DiurnalAccumulator()
+    acc.update(data)
+
+    with pytest.raises(AssertionError) as e:
+        acc.merge(DiurnalAccumulator(by_month=True).merge(acc))
+
+    msg = 'accumulators must have the same "fields" and "by_month"'
+    assert str(e.value) == msg
+
+
+def test_DiurnalAccumulator_chunks(data):
+    """Test that chunk by chunk statistics match `get_diurnal_stats` while exact."""
+    acc = DiurnalAccumulator()
+
+    for _, chunk in data.groupby(data.index.month):
+        acc.update(chunk)
+
+    assert acc.fields == ['windspeed_80m', 'windspeed_100m']
+    assert_frame_equal(acc.result('windspeed_100m'),
+                       get_diurnal_stats(data, speed='windspeed_100m'))
+    assert_frame_equal(acc.result(), get_diurnal_stats_many(data))
+
+
+def test_DiurnalAccumulator_merge(data):
+    """Test that accumulators merge across (pickled) workers."""
+    first, second = DiurnalAccumulator(), DiurnalAccumulator()
+
+    first.update(data.iloc[:4000])
+    second.update(data.iloc[4000:])
+
+    acc = pickle.loads(pickle.dumps(first)).merge(pickle.loads(pickle.dumps(second)))
+
+    assert_frame_equal(acc.result(), get_diurnal_stats_many(data))
+
+    acc = DiurnalAccumulator(by_month=True)
+    acc.update(data)
+
+    assert_frame_equal(acc.result(), get_diurnal_stats_many(data, by_month=True))
+
+
+def test_DiurnalAccumulator_bounded():
+    """Test that digests stay bounded and accurate over many chunks."""
+    index = date_range('2000', '2004', freq='5min', tz='UTC', inclusive='left')
+    rng = np.random.default_rng(0)
+    data = DataFrame({'windspeed_100m': rng.weibull(2, len(index)) * 8}, index=index)
+
+    acc = DiurnalAccumulator(compression=200)
+
+    for _, chunk in data.groupby([data.index.year, data.index.month]):
+        acc.update(chunk)
+
+    assert max(len(means) for digests in acc._digests for means, _ in digests) <= 200
+
+    result, expected = acc.result('windspeed_100m'), get_diurnal_stats(data)
+
+    assert np.allclose(result['Mean'], expected['Mean'])
+    assert np.allclose(result['Mean+Std'], expected['Mean+Std'])
+    assert np.allclose(result['Median'], expected['Median'], atol=0.1)
+    assert np.allclose(result['90th Percentile'], expected['90th Percentile'], atol=0.1)
@@ -0,0 +1,88 @@
+import pytest
+
+from albatross.requests import build_wtk_filepath, identify_regions, get_regions
+from albatross.utils import (Region, _load_wtk, clear_catalogs, get_catalog,
+                             register_catalog)
+
+
+def test_get_catalog():
+    """Test that the catalog is loaded once and matches `wtk.yml`."""
+    catalog = get_catalog()
+
+    assert get_catalog() is catalog
+    assert catalog.to_dict() == _load_wtk()
+    assert catalog.bounds.shape == (len(catalog), 4)
+
+    conus = catalog['conus']
+    assert isinstance(conus, Region)
+    assert conus.years == range(2007, 2015)
+    assert conus.base == 'wtk_conus'
+    assert catalog['hawaii'].base == 'Hawaii'
+
+    with pytest.raises(TypeError):
+        catalog['conus'] = conus
+
+    with pytest.raises(ValueError):
+        catalog.bounds[0, 0] = 0
+
+
+def test_register_catalog_invalid():
+    """Test invalid inputs for `register_catalog`."""
+    with pytest.raises(AssertionError) as e:
+        register_catalog(['bad'])
+
+    assert str(e.value) == '"catalog" must be a dict or a path to a YAML file'
+
+    with pytest.raises(AssertionError) as e:
+        register_catalog({'mirror': {'year_range': [2012, 2012]}})
+
+    assert str(e.value) == 'region "mirror" is missing "resolutions"'
+
+
+def test_register_catalog(tmp_path):
+    """Test that registered catalogs add regions, and can be cleared."""
+    path = tmp_path / 'mirror.yml'
+    path.write_text(
+        'ri_mirror:\n'
+        '  year_range: [2012, 2013]\n'
+        '  resolutions: ["hourly"]\n'
+        '  lat_lon_range: [[41.0, 42.5], [-72.0, -71.0]]\n'
+        '  base: "ri"\n'
+        '  root: "/data/wtk/"\n'
+    )
+
+    try:
+        register_catalog(str(path))
+
+        assert build_wtk_filepath('ri_mirror', 2013) == '/data/wtk/ri_mirror/ri_2013.h5'
+        assert identify_regions((41.5, -71.5))[-1] == 'ri_mirror'
+        assert get_regions()['ri_mirror']['root'] == '/data/wtk/'
+    finally:
+        clear_catalogs()
+
+    assert 'ri_mirror' not in get_catalog()
+
+
+def test_register_catalog_copy():
+    """Test that a registered catalog is copied, and can read files without HSDS."""
+    catalog = {
+        'ri_local': {
+            'year_range': [2012, 2012],
+            'resolutions': ['hourly'],
+            'lat_lon_range': [[41.0, 42.5], [-72.0, -71.0]],
+            'root': '/data/wtk/',
+            'hsds': False,
+        },
+    }
+
+    try:
+        register_catalog(catalog)
+        catalog['ri_local']['root'] = '/changed/'
+
+        assert get_catalog()['ri_local'].root == '/data/wtk/'
+        assert get_catalog()['ri_local'].hsds is False
+        assert get_catalog()['conus'].hsds is True
+        assert get_regions()['ri_local']['hsds'] is False
+        assert 'hsds' not in get_regions()['conus']
+    finally:
+        clear_catalogs()